@@ -22,6 +22,11 @@ except ImportError:  # pragma: no cover - compatibility for older wheels
     except ImportError:
         QWebEnginePage = None  # type: ignore[assignment]
 
+try:  # pragma: no cover - optional dependency
+    from PyQt6.QtWebEngineCore import QWebEngineScript
+except ImportError:  # pragma: no cover - optional dependency
+    QWebEngineScript = None  # type: ignore[assignment]
+
 try:  # pragma: no cover - optional dependency
     from yt_dlp import YoutubeDL
 except ImportError:  # pragma: no cover - optional dependency
@@ -140,6 +145,67 @@ def _trim_description(description: str, limit: int = 200) -> str:
         return collapsed
     return f"{collapsed[: limit - 1]}…"
 
+_WATCH_STYLE_SCRIPT = "puddle-tube-watch-style"
+# Only applies on youtube.com/watch; the embed player runs on youtube-nocookie.com
+_WATCH_STYLE_JS = """
+(function() {
+  if (!location.hostname.endsWith('youtube.com') || location.pathname !== '/watch') {
+    return;
+  }
+  const styleId = "puddle-tube-watch-style";
+  if (!document.getElementById(styleId)) {
+    const style = document.createElement('style');
+    style.id = styleId;
+    style.textContent = `
+body, html {
+  background: transparent !important;
+  overflow: hidden !important;
+}
+ytd-app, #content, #page-manager {
+  background: transparent !important;
+}
+#masthead-container,
+#guide,
+#secondary,
+#guide-content,
+#header,
+#footer,
+#chat,
+#comments,
+tp-yt-paper-toast,
+ytd-mini-guide-renderer {
+  display: none !important;
+}
+#primary {
+  margin: 0 !important;
+  width: 100% !important;
+}
+ytd-watch-flexy {
+  --ytd-watch-flexy-sidebar-width: 0px !important;
+  --ytd-watch-flexy-masthead-height: 0px !important;
+  background: transparent !important;
+}
+#player-theater-container,
+#player-container {
+  max-width: 100% !important;
+  margin: 0 auto !important;
+  box-shadow: none !important;
+}
+`;
+    document.head.appendChild(style);
+  }
+  function applyTheater() {
+    const app = document.querySelector('ytd-watch-flexy');
+    if (app) {
+      app.setAttribute('theater', '');
+      app.setAttribute('fullscreen', '');
+    }
+  }
+  applyTheater();
+  document.addEventListener('yt-navigate-finish', applyTheater);
+})();
+"""
+
 if QWebEnginePage is not None:
 
     class _PuddleTubeWebPage(QWebEnginePage):
@@ -296,7 +362,6 @@ class PuddleTubeView(QtWidgets.QWidget):
         self._current_video_id: Optional[str] = None
         self._follow_now_playing = False
         self._player_mode: str = "placeholder"
-        self._needs_watch_styling = False
         self._manual_video_active = False
 
         self._build_ui()
@@ -389,8 +454,8 @@ class PuddleTubeView(QtWidgets.QWidget):
                 self.webPage = _PuddleTubeWebPage(web)
                 self.webPage.configurationError.connect(self._on_embed_configuration_error)
                 web.setPage(self.webPage)
+                self._install_watch_styles(self.webPage)
             web.setUrl(QUrl("about:blank"))
-            web.loadFinished.connect(self._on_web_load_finished)
             self.webView = web
         else:
             fallback = QtWidgets.QTextBrowser(self.videoStack)
@@ -582,7 +647,6 @@ class PuddleTubeView(QtWidgets.QWidget):
         if not self._web_engine_available:
             return
         self._player_mode = "embed"
-        self._needs_watch_styling = False
         iframe_url = (
             "https://www.youtube-nocookie.com/embed/"
             f"{video_id}?autoplay=1&modestbranding=1&rel=0&playsinline=1"
@@ -633,7 +697,6 @@ class PuddleTubeView(QtWidgets.QWidget):
             self._load_watch_placeholder(video_id)
             return
         self._player_mode = "watch"
-        self._needs_watch_styling = True
         watch_url = QUrl(
             f"https://www.youtube.com/watch?v={video_id}&bpctr=9999999999&has_verified=1"
         )
@@ -656,71 +719,21 @@ class PuddleTubeView(QtWidgets.QWidget):
         self.statusLabel.setText("Embedded playback blocked; loading full YouTube player.")
         self._load_watch_mode(self._current_video_id)
 
-    def _on_web_load_finished(self, ok: bool) -> None:
-        if not ok or not self._web_engine_available:
+    def _install_watch_styles(self, page: QWebEnginePage) -> None:
+        """Install the watch-page styling once; WebEngine reapplies it on every load."""
+        if QWebEngineScript is None:
             return
-        if self._player_mode == "watch" and self._needs_watch_styling:
-            self._inject_watch_styles()
-            self._needs_watch_styling = False
-
-    def _inject_watch_styles(self) -> None:
-        if not self._web_engine_available or QWebEngineView is None:
+        scripts = page.scripts()
+        if scripts.find(_WATCH_STYLE_SCRIPT):
             return
-        web_view = cast(QWebEngineView, self.webView)
-        css_rules = """
-body, html {
-  background: transparent !important;
-  overflow: hidden !important;
-}
-ytd-app, #content, #page-manager {
-  background: transparent !important;
-}
-#masthead-container,
-#guide,
-#secondary,
-#guide-content,
-#header,
-#footer,
-#chat,
-#comments,
-tp-yt-paper-toast,
-ytd-mini-guide-renderer {
-  display: none !important;
-}
-#primary {
-  margin: 0 !important;
-  width: 100% !important;
-}
-ytd-watch-flexy {
-  --ytd-watch-flexy-sidebar-width: 0px !important;
-  --ytd-watch-flexy-masthead-height: 0px !important;
-  background: transparent !important;
-}
-#player-theater-container,
-#player-container {
-  max-width: 100% !important;
-  margin: 0 auto !important;
-  box-shadow: none !important;
-}
-"""
-        js = f"""
-(function() {{
-  const styleId = "puddle-tube-watch-style";
-  let style = document.getElementById(styleId);
-  if (!style) {{
-    style = document.createElement('style');
-    style.id = styleId;
-    style.textContent = `{css_rules}`;
-    document.head.appendChild(style);
-  }}
-  const app = document.querySelector('ytd-watch-flexy');
-  if (app) {{
-    app.setAttribute('theater', '');
-    app.setAttribute('fullscreen', '');
-  }}
-}})();
-"""
-        web_view.page().runJavaScript(js)
+        script = QWebEngineScript()
+        script.setName(_WATCH_STYLE_SCRIPT)
+        script.setSourceCode(_WATCH_STYLE_JS)
+        script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentReady)
+        script.setWorldId(QWebEngineScript.ScriptWorldId.ApplicationWorld)
+        script.setRunsOnSubFrames(False)
+        scripts.insert(script)
+
     def _on_search_results(self, query: str, results: List[SearchResult]) -> None:
         self._search_jobs = [job for job in self._search_jobs if job.query != query]
         if query != self._current_search_query:
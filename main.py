@@ -13,9 +13,9 @@ warnings.filterwarnings("ignore", category=DeprecationWarning)
 # Import all PyQt modules first
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel, 
-    QStackedWidget, QPushButton, QHBoxLayout, QFrame, QGridLayout
+    QStackedWidget, QPushButton, QHBoxLayout, QFrame, QGridLayout, QSizePolicy
 )
-from PyQt5.QtCore import Qt, QRectF, QPoint, QSize, QEvent
+from PyQt5.QtCore import Qt, QRectF, QPoint, QSize, QEvent, QTimer
 from PyQt5.QtGui import QFontDatabase, QFont, QColor, QKeyEvent
 from PyQt5.QtSvg import QSvgRenderer
 from PyQt5.QtGui import QPainter
@@ -37,6 +37,9 @@ else:
 
 # Import custom modules
 from src.speedometer import SpeedometerWidget
+from src.history_chart import HistoryChartWidget
+from src.trip_computer_widget import TripComputerWidget
+from src.alert_banner import AlertBanner
 from src.navbar import navWidget
 from src.web_embed.maps import MapsWidget
 from src.web_embed.youtube import YouTubeWidget
@@ -47,10 +50,29 @@ from src.web_embed.apple_music import AppleMusicWidget
 from src.web_embed.soundcloud import SoundCloudWidget
 from src.web_embed.intellectual_games_widget import IntellectualGamesWidget
 from src.web_embed.mini_map import MiniMapWidget
+from src.web_embed.tile_scheme import register_scheme as register_tile_scheme
+from src.tile_store import close_tile_store
+from src.route_cache import close_route_cache
+from src.tile_prefetch import METERED_RECHECK, tile_prefetcher, stop_tile_prefetcher
 from src.web_embed.manager import web_embed_manager
+from src.web_embed.warmup import prewarm_web_engine
+from src.screen_registry import ScreenRegistry
 from src.boot_animation import BootAnimation
+from src.boot_pipeline import BootPipeline
+from src import icon_cache
+from src.navbar import NAV_ICONS, NAV_ICON_SIZE
 from src.clock_widget import ClockWidget, TimeOnlyWidget, DateOnlyWidget
-from src.ytmusic_mini_player import YouTubeMusicMiniPlayer
+from src.ytmusic_mini_player import YouTubeMusicMiniPlayer, MINI_PLAYER_ICONS, MINI_PLAYER_ICON_SIZE
+from src.telemetry.sources import source_from_spec
+from src.telemetry.engine import TelemetryEngine
+from src.telemetry.feed import TelemetryFeed, PositionFeed
+from src.telemetry.gps import GpsTracker, gps_source_from_spec
+from src.telemetry.recorder import TelemetryRecorder
+from src.telemetry.history import history_store
+from src.telemetry.trip import TripComputer
+from src.telemetry.alerts import AlertMonitor, load_rules
+from src.telemetry.shared import SharedSnapshot, SnapshotPublisher
+from src.cluster import spawn_cluster
 
 class EntertainmentMenu(QWidget):
     def __init__(self, parent=None):
@@ -146,6 +168,10 @@ class MainUI(QWidget):
         
         main_layout.addWidget(date_container)
 
+        # Vehicle alerts; hidden unless one is active
+        self.alert_banner = AlertBanner()
+        main_layout.addWidget(self.alert_banner)
+
         # Content area (middle section)
         content_container = QFrame()
         content_layout = QHBoxLayout(content_container)
@@ -158,7 +184,12 @@ class MainUI(QWidget):
         speedometer_layout = QVBoxLayout(speedometer_container)
         speedometer_layout.setContentsMargins(20, 10, 0, 0)  # Reduced top margin from 20 to 10
         self.speedometer = SpeedometerWidget()
+        self.speedometer.clicked.connect(self.show_charts)
         speedometer_layout.addWidget(self.speedometer)
+        # Trip computer under the gauge; shown once telemetry is running
+        self.trip_computer = TripComputerWidget()
+        self.trip_computer.setFixedWidth(MINIMAP_SIZE)
+        speedometer_layout.addWidget(self.trip_computer)
         speedometer_layout.addStretch(1)
         # The '0' parameter gives this widget a fixed size (stretch factor 0)
         content_layout.addWidget(speedometer_container, 0)
@@ -173,88 +204,47 @@ class MainUI(QWidget):
         # Create stacked widget for content management
         self.content_stack = QStackedWidget()
         
-        # Create all widgets
+        # Menus are cheap and always built; web embeds are registered as
+        # factories and only constructed the first time they are opened
+        self.screens = ScreenRegistry(self.content_stack, self)
         # debug_logger.log_info("Creating entertainment menu", "MainUI")
         self.entertainment_menu = EntertainmentMenu()
-        # debug_logger.log_info("Creating YouTube widget", "MainUI")
-        self.youtube_widget = YouTubeWidget()
-        # debug_logger.log_info("Creating movies widget", "MainUI")
-        self.movies_widget = MoviesWidget()
         # debug_logger.log_info("Creating music menu", "MainUI")
         self.music_menu = MusicMenu()
-        # debug_logger.log_info("Creating YouTube music widget", "MainUI")
-        self.youtube_music_widget = YouTubeMusicWidget()
-        # debug_logger.log_info("Creating Apple music widget", "MainUI")
-        self.apple_music_widget = AppleMusicWidget()
-        # debug_logger.log_info("Creating SoundCloud widget", "MainUI")
-        self.soundcloud_widget = SoundCloudWidget()
-        # debug_logger.log_info("Creating intellectual games widget", "MainUI")
-        self.intellectual_games_widget = IntellectualGamesWidget()
-        
+        self.screens.register("YouTube", YouTubeWidget)
+        self.screens.register("Movies", MoviesWidget)
+        self.screens.register("YouTubeMusic", YouTubeMusicWidget)
+        self.screens.register("AppleMusic", AppleMusicWidget)
+        self.screens.register("SoundCloud", SoundCloudWidget)
+        self.screens.register("IntellectualGames", IntellectualGamesWidget)
+        self.screens.register("Charts", HistoryChartWidget)
         # Google Maps widget (shared for both main map and minimap)
-        # debug_logger.log_info("Creating shared Google Maps widget", "MainUI")
-        try:
-            # Create a container for the maps widget (similar to YouTube widget)
-            self.maps_container = QFrame()
-            maps_container_layout = QVBoxLayout(self.maps_container)
-            # Change these values to modify map container margins
-            # Current: 20px margins (same as YouTube widget)
-            maps_container_layout.setContentsMargins(20, 20, 20, 20)  # Same margins as YouTube
-            maps_container_layout.setSpacing(0)
-            
-            self.maps_widget = MapsWidget()
-            # Change these values to modify map widget size
-            # Current: Uses WIDGET_WIDTH x WIDGET_HEIGHT from configuration
-            # Example: 1600x900 for full HD, 1920x1080 for 1080p
-            self.maps_widget.setMinimumSize(QSize(WIDGET_WIDTH, WIDGET_HEIGHT))
-            self.maps_widget.setMaximumSize(QSize(WIDGET_WIDTH, WIDGET_HEIGHT))
-            # For flexible sizing, remove setMaximumSize and use:
-            # self.maps_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-            self.maps_widget.setSizePolicy(self.youtube_widget.sizePolicy())
-            
-            # Add maps widget to its container
-            maps_container_layout.addWidget(self.maps_widget)
-            
-            # debug_logger.log_info("Google Maps widget sized to match YouTube widget", "MainUI")
-        except Exception as e:
-            # debug_logger.log_error(f"Error creating Google Maps widget: {str(e)}", "MainUI", exc_info=True)
-            print(f"Error creating Google Maps widget: {str(e)}")
-            self.maps_container = QFrame()
-            maps_container_layout = QVBoxLayout(self.maps_container)
-            maps_container_layout.setContentsMargins(20, 20, 20, 20)
-            self.maps_widget = QLabel("Google Maps\nUnavailable")
-            self.maps_widget.setStyleSheet("background:#000;color:#666;text-align:center;padding:50px;font-size:18px;")
-            self.maps_widget.setMinimumSize(QSize(WIDGET_WIDTH, WIDGET_HEIGHT))
-            self.maps_widget.setMaximumSize(QSize(WIDGET_WIDTH, WIDGET_HEIGHT))
-            maps_container_layout.addWidget(self.maps_widget)
-            # debug_logger.log_info("Fallback Google Maps widget created", "MainUI")
+        self.screens.register("Maps", self._create_maps_container)
 
         # Add widgets to stack
         self.content_stack.addWidget(self.entertainment_menu)
-        self.content_stack.addWidget(self.youtube_widget)
-        self.content_stack.addWidget(self.movies_widget)
         self.content_stack.addWidget(self.music_menu)
-        self.content_stack.addWidget(self.youtube_music_widget)
-        self.content_stack.addWidget(self.apple_music_widget)
-        self.content_stack.addWidget(self.soundcloud_widget)
-        self.content_stack.addWidget(self.intellectual_games_widget)
-        self.content_stack.addWidget(self.maps_container) # Changed from self.maps_widget to self.maps_container
         
         center_layout.addWidget(self.content_stack)
         # The '1' parameter gives this widget a stretch factor of 1 (takes remaining space)
         content_layout.addWidget(center_container, 1)
         
-        # Minimap: use the same Google Maps widget, but smaller and repositioned
+        # Minimap: its own small fixed-size map, so the full Google Maps view
+        # is never reparented or resized when switching screens
         self.minimap_container = QFrame()
         self.minimap_container.setFixedSize(MINIMAP_SIZE, MINIMAP_SIZE)
         self.minimap_container.setStyleSheet("background:#000;border:2px solid #444;border-radius:8px;")
         self.minimap_layout = QVBoxLayout(self.minimap_container)
         self.minimap_layout.setContentsMargins(2, 2, 2, 2)
-        # Add the same maps_widget to the minimap container (will be reparented/moved as needed)
+        self.minimap = MiniMapWidget()
+        self.minimap_layout.addWidget(self.minimap)
+        self.minimap.show()
         # By default, show the minimap as hidden
         self.minimap_container.hide()
 
-        self.ytmusic_mini_player = YouTubeMusicMiniPlayer(self.youtube_music_widget)
+        # The mini player attaches to YouTube Music once that screen is built
+        self.ytmusic_mini_player = YouTubeMusicMiniPlayer(None)
+        self.screens.screen_created.connect(self._on_screen_created)
         self.ytmusic_mini_player.setFixedSize(MINIMAP_SIZE, 120)
         speedometer_layout.addWidget(self.ytmusic_mini_player)
         speedometer_layout.addWidget(self.minimap_container)
@@ -269,8 +259,8 @@ class MainUI(QWidget):
         self.music_menu.buttons["Apple Music"].clicked.connect(self.show_apple_music)
         self.music_menu.buttons["SoundCloud"].clicked.connect(self.show_soundcloud)
         
-        # Remove the redundant map widget creation and layout additions
-        # The maps_widget is already created above and will be managed by show_map/show_minimap methods
+        # The maps widget is built on first use by the screen registry and
+        # managed by the show_map/show_minimap methods
 
         main_layout.addWidget(content_container, 1)  # Give content area stretch
 
@@ -283,46 +273,102 @@ class MainUI(QWidget):
         
         # debug_logger.log_function_exit("setup_ui", "MainUI")
 
+    def _create_maps_container(self):
+        # debug_logger.log_info("Creating shared Google Maps widget", "MainUI")
+        try:
+            # Create a container for the maps widget (similar to YouTube widget)
+            self.maps_container = QFrame()
+            self.maps_container.setFixedSize(QSize(WIDGET_WIDTH, WIDGET_HEIGHT))
+            maps_container_layout = QVBoxLayout(self.maps_container)
+            # Change these values to modify map container margins
+            # Current: 20px margins (same as YouTube widget)
+            maps_container_layout.setContentsMargins(20, 20, 20, 20)  # Same margins as YouTube
+            maps_container_layout.setSpacing(0)
+            
+            self.maps_widget = MapsWidget()
+            # Change these values to modify map widget size
+            # Current: Uses WIDGET_WIDTH x WIDGET_HEIGHT from configuration
+            # Example: 1600x900 for full HD, 1920x1080 for 1080p
+            self.maps_widget.setMinimumSize(QSize(WIDGET_WIDTH, WIDGET_HEIGHT))
+            self.maps_widget.setMaximumSize(QSize(WIDGET_WIDTH, WIDGET_HEIGHT))
+            # For flexible sizing, remove setMaximumSize and use:
+            # self.maps_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+            self.maps_widget.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
+            
+            # Add maps widget to its container
+            maps_container_layout.addWidget(self.maps_widget)
+            # Fetch the minimap tiles along a new route while still online
+            self.maps_widget.route_bridge.route_changed.connect(lambda route: tile_prefetcher().set_route(route.path))
+            if tile_prefetcher().enabled:
+                # The metered check is a D-Bus call; it runs here, not on the prefetch workers
+                self._metered_timer = QTimer(self)
+                self._metered_timer.timeout.connect(lambda: tile_prefetcher().refresh_metered())
+                self._metered_timer.start(int(METERED_RECHECK * 1000))
+            
+            # debug_logger.log_info("Google Maps widget sized to match YouTube widget", "MainUI")
+        except Exception as e:
+            # debug_logger.log_error(f"Error creating Google Maps widget: {str(e)}", "MainUI", exc_info=True)
+            print(f"Error creating Google Maps widget: {str(e)}")
+            self.maps_container = QFrame()
+            maps_container_layout = QVBoxLayout(self.maps_container)
+            maps_container_layout.setContentsMargins(20, 20, 20, 20)
+            self.maps_widget = QLabel("Google Maps\nUnavailable")
+            self.maps_widget.setStyleSheet("background:#000;color:#666;text-align:center;padding:50px;font-size:18px;")
+            self.maps_widget.setMinimumSize(QSize(WIDGET_WIDTH, WIDGET_HEIGHT))
+            self.maps_widget.setMaximumSize(QSize(WIDGET_WIDTH, WIDGET_HEIGHT))
+            maps_container_layout.addWidget(self.maps_widget)
+            # debug_logger.log_info("Fallback Google Maps widget created", "MainUI")
+        return self.maps_container
+
+    def _on_screen_created(self, name, widget):
+        if name == "YouTubeMusic":
+            self.ytmusic_mini_player.attach(widget)
+
+    def set_position(self, lat, lng, heading):
+        """Car position for the minimap and, once it has been opened, the big map"""
+        self.minimap.set_position(lat, lng, heading)
+        maps_widget = getattr(self, "maps_widget", None)
+        if isinstance(maps_widget, MapsWidget):
+            maps_widget.set_position(lat, lng, heading)
+
+    def _hide_maps(self):
+        maps_container = self.screens.peek("Maps")
+        if maps_container is not None:
+            maps_container.hide()
+
+    def _open_embed(self, name):
+        self._hide_maps()
+        widget = self.screens.get(name)
+        web_embed_manager.open(name, widget)
+        self.content_stack.setCurrentWidget(widget)
+
     def show_youtube(self):
-        self.maps_container.hide()
-        web_embed_manager.open("YouTube", self.youtube_widget)
-        self.content_stack.setCurrentWidget(self.youtube_widget)
+        self._open_embed("YouTube")
 
     def show_movies(self):
-        self.maps_container.hide()
-        web_embed_manager.open("Movies", self.movies_widget)
-        self.content_stack.setCurrentWidget(self.movies_widget)
+        self._open_embed("Movies")
 
     def show_intellectual_games(self):
-        self.maps_container.hide()
-        web_embed_manager.open("IntellectualGames", self.intellectual_games_widget)
-        self.content_stack.setCurrentWidget(self.intellectual_games_widget)
+        self._open_embed("IntellectualGames")
 
     def show_music_menu(self):
-        self.maps_container.hide()
+        self._hide_maps()
         web_embed_manager.close_current()
         self.content_stack.setCurrentWidget(self.music_menu)
 
+    def show_charts(self):
+        self._hide_maps()
+        web_embed_manager.close_current()
+        self.content_stack.setCurrentWidget(self.screens.get("Charts"))
+
     def show_youtube_music(self):
-        self.maps_container.hide()
-        self.apple_music_widget.hide()
-        self.soundcloud_widget.hide()
-        web_embed_manager.open("YouTubeMusic", self.youtube_music_widget)
-        self.content_stack.setCurrentWidget(self.youtube_music_widget)
+        self._open_embed("YouTubeMusic")
 
     def show_apple_music(self):
-        self.maps_container.hide()
-        self.youtube_music_widget.hide()
-        self.soundcloud_widget.hide()
-        web_embed_manager.open("AppleMusic", self.apple_music_widget)
-        self.content_stack.setCurrentWidget(self.apple_music_widget)
+        self._open_embed("AppleMusic")
 
     def show_soundcloud(self):
-        self.maps_container.hide()
-        self.youtube_music_widget.hide()
-        self.apple_music_widget.hide()
-        web_embed_manager.open("SoundCloud", self.soundcloud_widget)
-        self.content_stack.setCurrentWidget(self.soundcloud_widget)
+        self._open_embed("SoundCloud")
 
     def handle_nav_button(self, button_name):
         self.hide_minimap()
@@ -339,73 +385,44 @@ class MainUI(QWidget):
             self.show_minimap()
 
     def show_map(self):
-        # Show the main Google Maps window (full size)
+        # Show the main Google Maps window (full size). It is built once at
+        # WIDGET_WIDTH x WIDGET_HEIGHT and stays in the content stack, so
+        # switching to it is only a page flip.
         self.minimap_container.hide()
-        
-        print(f"Setting map widget size to {WIDGET_WIDTH}x{WIDGET_HEIGHT}")
-        
-        # Debug: Log current sizes
-        # debug_logger.log_info(f"YouTube widget size: {self.youtube_widget.size()}", "MainUI")
-        # debug_logger.log_info(f"Maps container size before resize: {self.maps_container.size()}", "MainUI")
-        
-        # Restore the maps_widget to its container if it was moved to minimap
-        if self.maps_widget.parent() != self.maps_container:
-            self.maps_widget.setParent(self.maps_container)
-            # Re-add to the container layout
-            self.maps_container.layout().addWidget(self.maps_widget)
-        
-        # Resize the maps_widget to match the size set in setup_ui
-        # Change WIDGET_WIDTH and WIDGET_HEIGHT at the top of this file to modify the main map size
-        self.maps_widget.setMinimumSize(QSize(WIDGET_WIDTH, WIDGET_HEIGHT))
-        self.maps_widget.setMaximumSize(QSize(WIDGET_WIDTH, WIDGET_HEIGHT))
-        self.maps_widget.resize(QSize(WIDGET_WIDTH, WIDGET_HEIGHT))
-        
-        # Ensure the maps_container is properly parented and sized
-        self.maps_container.setParent(self.content_stack)
-        self.maps_container.setMinimumSize(QSize(WIDGET_WIDTH, WIDGET_HEIGHT))
-        self.maps_container.setMaximumSize(QSize(WIDGET_WIDTH, WIDGET_HEIGHT))
-        
-        # Ensure the widget is properly added to the content stack
-        # The widget should already be in the stack from setup_ui, but let's make sure
-        if self.maps_container not in [self.content_stack.widget(i) for i in range(self.content_stack.count())]:
-            self.content_stack.addWidget(self.maps_container)
-        
-        # Make sure it's the current widget in the stack
-        self.content_stack.setCurrentWidget(self.maps_container)
-        self.maps_container.show()
-        
-        # Force update
-        self.maps_container.update()
-        self.content_stack.update()
-        
-        print(f"Map widget actual size: {self.maps_widget.size()}")
-        print(f"Map container actual size: {self.maps_container.size()}")
-        
-        # Debug: Log final sizes
-        # debug_logger.log_info(f"Maps container size after resize: {self.maps_container.size()}", "MainUI")
-        # debug_logger.log_info(f"Content stack size: {self.content_stack.size()}", "MainUI")
-        
+        maps_container = self.screens.get("Maps")
+        self.content_stack.setCurrentWidget(maps_container)
+        maps_container.show()
         # debug_logger.log_info("Main Google Maps window shown (full size)", "MainUI")
 
     def show_minimap(self):
-        # Show the minimap (same Google Maps widget, but smaller and repositioned)
-        # Remove the maps_widget from its container for minimap use
-        self.maps_widget.setParent(self.minimap_container)
-        # Set minimap size using configuration
-        self.maps_widget.setMinimumSize(QSize(MINIMAP_SIZE, MINIMAP_SIZE))
-        self.maps_widget.setMaximumSize(QSize(MINIMAP_SIZE, MINIMAP_SIZE))
-        self.maps_widget.resize(QSize(MINIMAP_SIZE, MINIMAP_SIZE))
-        self.minimap_layout.addWidget(self.maps_widget)
         self.minimap_container.show()
-        self.maps_widget.show()
-        # debug_logger.log_info("Minimap shown (Google Maps widget resized and moved)", "MainUI")
+        # debug_logger.log_info("Minimap shown", "MainUI")
 
     def hide_minimap(self):
         self.minimap_container.hide()
         # debug_logger.log_info("Minimap hidden", "MainUI")
 
+def read_font_files(font_dir="Fonts"):
+    """Read every .ttf in font_dir. Runs on a boot worker thread."""
+    fonts = []
+    if os.path.exists(font_dir):
+        for font_file in sorted(os.listdir(font_dir)):
+            if font_file.endswith(".ttf"):
+                with open(os.path.join(font_dir, font_file), "rb") as f:
+                    fonts.append(f.read())
+    else:
+        # debug_logger.log_warning(f"Font directory not found: {font_dir}", "main")
+        pass
+    return fonts
+
+
+def register_fonts(fonts):
+    for data in fonts or []:
+        QFontDatabase.addApplicationFontFromData(data)
+
+
 class CarInterface(QMainWindow):
-    def __init__(self):
+    def __init__(self, skip_boot=False, cluster=False):
         # debug_logger.log_function_entry("__init__", "CarInterface")
         super().__init__()
         self.setWindowTitle("Puddle")
@@ -426,6 +443,159 @@ class CarInterface(QMainWindow):
         # Connect boot animation complete signal
         self.boot_animation.boot_complete.connect(self.show_main_ui)
 
+        # Heavy start-up work runs in stages behind the splash; the main
+        # screen is the last stage and the splash ends when it is built
+        self.main_screen = None
+        self.telemetry = None
+        self.telemetry_feed = None
+        self.trip = None
+        self.telemetry_recorder = None
+        self.alerts = None
+        self.gps = None
+        self.position_feed = None
+        # Instrument cluster process (--cluster) and the snapshot it reads
+        self.cluster = cluster
+        self.cluster_process = None
+        self.cluster_snapshot = None
+        self.boot_pipeline = BootPipeline(self)
+        self.setup_boot_stages()
+
+        if skip_boot:
+            self.boot_pipeline.run_blocking()
+            return
+
+        # Show boot animation first
+        self.stacked_widget.setCurrentWidget(self.boot_animation)
+        # debug_logger.log_info("Boot animation shown first", "CarInterface")
+        
+        # Start the boot sequence
+        self.boot_animation.hold_until(self.boot_pipeline.finished)
+        self.boot_animation.start_boot_sequence()
+        self.boot_pipeline.start()
+
+    def setup_boot_stages(self):
+        dpr = self.devicePixelRatioF()
+        icons = [(path, NAV_ICON_SIZE, None) for path in NAV_ICONS]
+        icons += [(path, MINI_PLAYER_ICON_SIZE, QColor(255, 255, 255)) for path in MINI_PLAYER_ICONS]
+
+        def rasterize_icons():
+            return [(path, size, color, icon_cache.rasterize_svg(path, size, color, dpr))
+                    for path, size, color in icons if os.path.exists(path)]
+
+        def store_icons(images):
+            for path, size, color, image in images or []:
+                icon_cache.store(path, size, image, color)
+
+        # Lower priority runs first
+        self.boot_pipeline.add_stage("fonts", register_fonts, priority=0, worker=read_font_files)
+        self.boot_pipeline.add_stage("icons", store_icons, priority=1, worker=rasterize_icons)
+        self.boot_pipeline.add_stage("webengine", prewarm_web_engine, priority=2)
+        self.boot_pipeline.add_stage("main_ui", self.create_main_screen, priority=3)
+        self.boot_pipeline.add_stage("telemetry", self.start_telemetry, priority=4)
+        self.boot_pipeline.add_stage("gps", self.start_gps, priority=5)
+
+    def start_telemetry(self):
+        """Feed the speedometer from the vehicle, if PUDDLE_TELEMETRY names a source"""
+        try:
+            source = source_from_spec(os.getenv("PUDDLE_TELEMETRY", ""))
+        except (ValueError, OSError) as e:
+            print(f"Telemetry disabled: {e}")
+            return
+        if source is None or not isinstance(self.main_screen, MainUI):
+            return
+        self.telemetry = TelemetryEngine(source)
+        self.telemetry_feed = TelemetryFeed(self.telemetry, self)
+        speedometer = self.main_screen.speedometer
+        self.telemetry_feed.bind("speed", speedometer.set_speed)
+        self.telemetry_feed.bind("power", speedometer.set_power)
+        self.trip = TripComputer()
+        self.trip.attach(self.telemetry)
+        self.main_screen.trip_computer.bind(self.trip)
+        # Record the raw feed for later replay with PUDDLE_TELEMETRY=replay:<file>.ptlog
+        record_path = os.getenv("PUDDLE_TELEMETRY_RECORD")
+        if record_path:
+            try:
+                self.telemetry_recorder = TelemetryRecorder(os.path.expanduser(record_path))
+                self.telemetry.add_batch_listener(self.telemetry_recorder.write)
+            except (ValueError, OSError) as e:
+                print(f"Telemetry recording disabled: {e}")
+        # Trip history for charts; PUDDLE_TELEMETRY_HISTORY=0 turns it off
+        if os.getenv("PUDDLE_TELEMETRY_HISTORY", "1") != "0":
+            self.telemetry.add_channel_listener(history_store().append)
+        # Alert rules from $PUDDLE_ALERTS or the bundled alerts.json
+        try:
+            self.alerts = AlertMonitor(self.telemetry, load_rules(), parent=self)
+            self.alerts.changed.connect(self.main_screen.alert_banner.on_alerts)
+        except (ValueError, OSError) as e:
+            print(f"Vehicle alerts disabled: {e}")
+        if self.cluster:
+            self.start_cluster()
+        self.telemetry.start()
+        self.telemetry_feed.start()
+        if self.alerts is not None:
+            self.alerts.start()
+        QApplication.instance().aboutToQuit.connect(self.stop_telemetry)
+
+    def start_gps(self):
+        """Move the map markers with the car, if PUDDLE_GPS names a receiver"""
+        try:
+            source = gps_source_from_spec(os.getenv("PUDDLE_GPS", ""))
+        except (ValueError, OSError) as e:
+            print(f"GPS disabled: {e}")
+            return
+        if source is None or not isinstance(self.main_screen, MainUI):
+            return
+        self.gps = GpsTracker(source)
+        self.position_feed = PositionFeed(self.gps, self)
+        self.position_feed.bind(self.main_screen.set_position)
+        self.gps.start()
+        self.position_feed.start()
+        QApplication.instance().aboutToQuit.connect(self.stop_gps)
+
+    def stop_gps(self):
+        self.position_feed.stop()
+        self.gps.stop()
+
+    def stop_telemetry(self):
+        self.telemetry_feed.stop()
+        if self.alerts is not None:
+            self.alerts.stop()
+        self.telemetry.stop()
+        self.stop_cluster()
+        history_store().flush()
+        if self.telemetry_recorder is not None:
+            self.telemetry_recorder.close()
+            print(f"Recorded {self.telemetry_recorder.frames_written} telemetry frames "
+                  f"to {self.telemetry_recorder.path}")
+        feed = self.telemetry_feed
+        if feed.polls:
+            print(f"Telemetry: {self.telemetry.frames.written} frames, "
+                  f"{feed.poll_seconds / feed.polls * 1000:.3f} ms per UI update")
+
+    def start_cluster(self):
+        """Run the gauges in their own process, fed through shared memory"""
+        try:
+            self.cluster_snapshot = SharedSnapshot(f"puddle-cluster-{os.getpid()}", create=True)
+        except OSError as e:
+            print(f"Cluster disabled: {e}")
+            return
+        SnapshotPublisher(self.cluster_snapshot).attach(self.telemetry)
+        screen = os.getenv("PUDDLE_CLUSTER_SCREEN")
+        self.cluster_process = spawn_cluster(self.cluster_snapshot.name, int(screen) if screen else None)
+
+    def stop_cluster(self):
+        if self.cluster_process is not None:
+            self.cluster_process.terminate()
+            try:
+                self.cluster_process.wait(2)
+            except Exception:
+                self.cluster_process.kill()
+            self.cluster_process = None
+        if self.cluster_snapshot is not None:
+            self.cluster_snapshot.close()
+            self.cluster_snapshot = None
+
+    def create_main_screen(self):
         # Create and add main screen (initially hidden)
         # debug_logger.log_info("Creating main screen", "CarInterface")
         try:
@@ -442,16 +612,11 @@ class CarInterface(QMainWindow):
             self.main_screen.hide()  # Hide initially
             # debug_logger.log_info("Fallback main screen created", "CarInterface")
 
-        # Show boot animation first
-        self.stacked_widget.setCurrentWidget(self.boot_animation)
-        # debug_logger.log_info("Boot animation shown first", "CarInterface")
-        
-        # Start the boot sequence
-        self.boot_animation.start_boot_sequence()
-
     def show_main_ui(self):
         """Show the main UI after boot animation is complete"""
         # debug_logger.log_info("Showing main UI after boot", "CarInterface")
+        if self.main_screen is None:
+            self.boot_pipeline.run_blocking()
         self.main_screen.show()
         self.stacked_widget.setCurrentWidget(self.main_screen)
         # debug_logger.log_info("Main UI shown after boot", "CarInterface")
@@ -469,33 +634,28 @@ class CarInterface(QMainWindow):
 
 if __name__ == "__main__":
     # debug_logger.log_info("Starting Puddle application", "main")
+    # Custom URL schemes have to be known before the application starts
+    register_tile_scheme()
     app = QApplication(sys.argv)
+    app.aboutToQuit.connect(stop_tile_prefetcher)
+    app.aboutToQuit.connect(close_tile_store)
+    app.aboutToQuit.connect(close_route_cache)
 
     # Check for command line arguments
     skip_boot = "--skip-boot" in sys.argv
+    # Gauges in a separate process, full screen on $PUDDLE_CLUSTER_SCREEN if set
+    cluster = "--cluster" in sys.argv
 
-    # Load custom fonts
-    # debug_logger.log_info("Loading custom fonts", "main")
-    font_dir = "Fonts"
-    try:
-        if os.path.exists(font_dir):
-            for font_file in os.listdir(font_dir):
-                if font_file.endswith(".ttf"):
-                    font_path = os.path.join(font_dir, font_file)
-                    # debug_logger.log_debug(f"Loading font: {font_path}", "main")
-                    QFontDatabase.addApplicationFont(font_path)
-            # debug_logger.log_info("Fonts loaded successfully", "main")
-        else:
-            # debug_logger.log_warning(f"Font directory not found: {font_dir}", "main")
-            pass
-    except Exception as e:
-        # debug_logger.log_error(f"Error loading fonts: {str(e)}", "main", exc_info=True)
-        pass
+    # Suspended web embeds: how many renderers stay alive and their memory budget
+    web_embed_manager.configure(
+        max_live=int(os.getenv("PUDDLE_MAX_LIVE_EMBEDS", "3")),
+        memory_budget_mb=float(os.getenv("PUDDLE_EMBED_MEMORY_MB", "1024")),
+    )
 
     # Create and show main interface
     # debug_logger.log_info("Creating main interface", "main")
     try:
-        interface = CarInterface()
+        interface = CarInterface(skip_boot=skip_boot, cluster=cluster)
         
         # If skip_boot is True, show main UI immediately
         if skip_boot:
@@ -0,0 +1,38 @@
+from PyQt5.QtWidgets import QLabel
+from PyQt5.QtCore import Qt
+from src.style import theme
+
+SEVERITY_COLORS = {'info': theme.COLOR_TEXT_MUTED, 'warning': '#ffcc00', 'critical': '#ff3b30'}
+SEVERITY_RANK = {'info': 0, 'warning': 1, 'critical': 2}
+
+
+class AlertBanner(QLabel):
+    """Shows the most severe active vehicle alert; hidden while there is none.
+
+    Connect ``AlertMonitor.changed`` to ``on_alerts``.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.active = {}
+        self.setAlignment(Qt.AlignCenter)
+        self.setFixedHeight(30)
+        self.hide()
+
+    def on_alerts(self, events):
+        for event in events:
+            if event.active:
+                self.active[event.rule.name] = event
+            else:
+                self.active.pop(event.rule.name, None)
+        if not self.active:
+            self.hide()
+            return
+        # Most severe first, then most recent
+        top = max(self.active.values(), key=lambda e: (SEVERITY_RANK[e.rule.severity], e.t))
+        color = SEVERITY_COLORS[top.rule.severity]
+        more = f"  (+{len(self.active) - 1})" if len(self.active) > 1 else ""
+        self.setText(f"{top.rule.message}{more}")
+        self.setStyleSheet(f"color: {color}; border: 1px solid {color}; border-radius: 8px; "
+                           f"font-family: {theme.FONT_FAMILY_BOLD}; font-size: 14px;")
+        self.show()
@@ -0,0 +1,20 @@
+import os
+
+# Writable locations for caches and recorded data. Both can be overridden
+# from the environment (or .env) on the head unit.
+CACHE_DIR = os.getenv("PUDDLE_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "puddle")
+DATA_DIR = os.getenv("PUDDLE_DATA_DIR") or os.path.join(os.path.expanduser("~"), ".local", "share", "puddle")
+
+
+def cache_path(*parts: str) -> str:
+    """Return a path inside the cache directory, creating its parent directory."""
+    path = os.path.join(CACHE_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def data_path(*parts: str) -> str:
+    """Return a path inside the data directory, creating its parent directory."""
+    path = os.path.join(DATA_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
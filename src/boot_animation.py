@@ -1,5 +1,5 @@
 from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout
-from PyQt5.QtCore import QTimer, QPropertyAnimation, QEasingCurve, pyqtProperty, Qt, QUrl, pyqtSignal
+from PyQt5.QtCore import QPropertyAnimation, QEasingCurve, pyqtProperty, Qt, QUrl, pyqtSignal
 from PyQt5.QtGui import QPixmap, QPainter, QColor, QFont
 from PyQt5.QtMultimedia import QSoundEffect
 import os
@@ -10,6 +10,9 @@ class BootAnimation(QWidget):
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        # The splash fades out as soon as it is both faded in and ready
+        self._ready = True
+        self._fade_in_done = False
         self.setup_ui()
         self.setup_audio()
         
@@ -108,11 +111,26 @@ class BootAnimation(QWidget):
         # Start the animation
         self.fade_in_animation.start()
         
+    def hold_until(self, signal):
+        """Keep the splash up until ``signal`` fires instead of fading out right after fade in."""
+        self._ready = False
+        signal.connect(self.set_ready)
+
+    def set_ready(self):
+        """Mark start-up work as done; fades out now if the fade in has finished."""
+        if self._ready:
+            return
+        self._ready = True
+        if self._fade_in_done:
+            self.start_fade_out()
+
     def on_fade_in_complete(self):
         """Called when fade in animation is complete"""
-        print("Fade in complete, waiting before fade out...")
-        # Wait 2 seconds before starting fade out
-        QTimer.singleShot(2000, self.start_fade_out)
+        self._fade_in_done = True
+        if self._ready:
+            self.start_fade_out()
+        else:
+            print("Fade in complete, waiting for start-up work...")
         
     def start_fade_out(self):
         """Start the fade out animation"""
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, List, Optional
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+
+class BootStage:
+    """One unit of start-up work.
+
+    ``run`` always executes on the UI thread, in its own event-loop slice so
+    the splash keeps animating between stages. If ``worker`` is given it is
+    started on a thread pool as soon as the pipeline starts, and its return
+    value is passed to ``run`` once it is ready.
+    """
+
+    def __init__(self, name: str, run: Callable[..., Any], priority: int = 0,
+                 worker: Optional[Callable[[], Any]] = None) -> None:
+        self.name = name
+        self.run = run
+        self.priority = priority
+        self.worker = worker
+        self.result: Any = None
+        self.worker_done = worker is None
+        self.worker_ms = 0.0
+        self.ui_ms = 0.0
+        self.finished_at_ms = 0.0
+
+
+class _WorkerSignals(QObject):
+    done = pyqtSignal(object, object, float)
+
+
+class _WorkerTask(QRunnable):
+    def __init__(self, stage: BootStage, signals: _WorkerSignals) -> None:
+        super().__init__()
+        self.stage = stage
+        self.signals = signals
+
+    def run(self) -> None:
+        start = time.perf_counter()
+        try:
+            result = self.stage.worker()
+        except Exception as e:
+            print(f"Boot stage '{self.stage.name}' worker failed: {e}")
+            result = None
+        elapsed = (time.perf_counter() - start) * 1000.0
+        self.signals.done.emit(self.stage, result, elapsed)
+
+
+class BootPipeline(QObject):
+    """Runs start-up stages in priority order while the splash is showing.
+
+    Worker parts of all stages start in parallel right away; the UI parts
+    run one per event-loop slice, lowest priority value first, each waiting
+    for its own worker. ``finished`` is emitted after the last stage, and
+    per-stage timings are printed so slow stages on the head unit are easy
+    to spot.
+    """
+
+    stage_finished = pyqtSignal(str, float)
+    finished = pyqtSignal()
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._stages: List[BootStage] = []
+        self._next = 0
+        self._started_at = 0.0
+        self._running = False
+        self._done = False
+        self._signals = _WorkerSignals(self)
+        self._signals.done.connect(self._on_worker_done)
+        self._pool = QThreadPool(self)
+
+    def add_stage(self, name: str, run: Callable[..., Any], priority: int = 0,
+                  worker: Optional[Callable[[], Any]] = None) -> None:
+        self._stages.append(BootStage(name, run, priority, worker))
+
+    @property
+    def is_finished(self) -> bool:
+        return self._done
+
+    def timings(self) -> List[tuple]:
+        """Return ``(name, worker_ms, ui_ms, finished_at_ms)`` for every completed stage."""
+        return [(s.name, s.worker_ms, s.ui_ms, s.finished_at_ms)
+                for s in self._stages[:self._next]]
+
+    def start(self) -> None:
+        if self._running or self._done:
+            return
+        self._running = True
+        self._started_at = time.perf_counter()
+        self._stages.sort(key=lambda s: s.priority)
+        for stage in self._stages:
+            if stage.worker is not None:
+                self._pool.start(_WorkerTask(stage, self._signals))
+        QTimer.singleShot(0, self._run_next)
+
+    def run_blocking(self) -> None:
+        """Run every stage immediately on the calling thread (used with --skip-boot)."""
+        if self._done:
+            return
+        self._started_at = time.perf_counter()
+        self._stages.sort(key=lambda s: s.priority)
+        for stage in self._stages:
+            if stage.worker is not None and not stage.worker_done:
+                start = time.perf_counter()
+                stage.result = stage.worker()
+                stage.worker_ms = (time.perf_counter() - start) * 1000.0
+                stage.worker_done = True
+        while self._next < len(self._stages):
+            self._run_stage(self._stages[self._next])
+        self._finish()
+
+    def _on_worker_done(self, stage: BootStage, result: Any, elapsed_ms: float) -> None:
+        stage.result = result
+        stage.worker_ms = elapsed_ms
+        stage.worker_done = True
+        if self._running and self._stages[self._next] is stage:
+            QTimer.singleShot(0, self._run_next)
+
+    def _run_next(self) -> None:
+        if self._done or self._next >= len(self._stages):
+            return
+        stage = self._stages[self._next]
+        if not stage.worker_done:
+            # _on_worker_done schedules us again when the result arrives
+            return
+        self._run_stage(stage)
+        if self._next < len(self._stages):
+            QTimer.singleShot(0, self._run_next)
+        else:
+            self._finish()
+
+    def _run_stage(self, stage: BootStage) -> None:
+        start = time.perf_counter()
+        try:
+            if stage.worker is not None:
+                stage.run(stage.result)
+            else:
+                stage.run()
+        except Exception as e:
+            print(f"Boot stage '{stage.name}' failed: {e}")
+        now = time.perf_counter()
+        stage.ui_ms = (now - start) * 1000.0
+        stage.finished_at_ms = (now - self._started_at) * 1000.0
+        self._next += 1
+        self.stage_finished.emit(stage.name, stage.ui_ms + stage.worker_ms)
+
+    def _finish(self) -> None:
+        self._running = False
+        self._done = True
+        total = (time.perf_counter() - self._started_at) * 1000.0
+        print(f"Boot pipeline finished in {total:.1f} ms")
+        for name, worker_ms, ui_ms, at_ms in self.timings():
+            print(f"  {name:<12} worker {worker_ms:7.1f} ms  ui {ui_ms:7.1f} ms  done at {at_ms:7.1f} ms")
+        self.finished.emit()
@@ -0,0 +1,153 @@
+import ctypes
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QSocketNotifier, QTimer, Qt
+from PyQt5.QtWidgets import QApplication
+
+# Fire a little after the minute turns so strftime already sees the new minute
+_SLACK_MS = 20
+
+_CLOCK_REALTIME = 0
+_TFD_NONBLOCK = 0o4000
+_TFD_CLOEXEC = 0o2000000
+_TFD_TIMER_ABSTIME = 1
+_TFD_TIMER_CANCEL_ON_SET = 2
+
+
+class _timespec(ctypes.Structure):
+    _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+
+class _itimerspec(ctypes.Structure):
+    _fields_ = [('it_interval', _timespec), ('it_value', _timespec)]
+
+
+class _WallClockAlarm(QObject):
+    """Calls ``callback`` at a wall-clock time.
+
+    On Linux this is a CLOCK_REALTIME timerfd: it still fires on time after
+    a suspend and is cancelled when the clock is set (NTP, GPS time), so a
+    jump is noticed right away. Elsewhere it falls back to a QTimer.
+    """
+
+    def __init__(self, callback: Callable[[], None], parent=None) -> None:
+        super().__init__(parent)
+        self._callback = callback
+        self._fd = -1
+        self._notifier = None
+        self._timer = None
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            self._settime = libc.timerfd_settime
+            fd = libc.timerfd_create(_CLOCK_REALTIME, _TFD_NONBLOCK | _TFD_CLOEXEC)
+            if fd >= 0:
+                self._fd = fd
+                self._notifier = QSocketNotifier(fd, QSocketNotifier.Read, self)
+                self._notifier.activated.connect(self._on_fd)
+        except (OSError, AttributeError):
+            self._fd = -1
+
+    def arm(self, when: float) -> None:
+        """Fire once at ``when`` (seconds since the epoch)."""
+        if self._fd >= 0:
+            spec = _itimerspec()
+            spec.it_value.tv_sec = int(when)
+            spec.it_value.tv_nsec = int((when - int(when)) * 1e9)
+            flags = _TFD_TIMER_ABSTIME | _TFD_TIMER_CANCEL_ON_SET
+            if self._settime(self._fd, flags, ctypes.byref(spec), None) == 0:
+                return
+        if self._timer is None:
+            self._timer = QTimer(self)
+            self._timer.setSingleShot(True)
+            self._timer.setTimerType(Qt.PreciseTimer)
+            self._timer.timeout.connect(self._callback)
+        self._timer.start(max(0, int((when - time.time()) * 1000)))
+
+    def _on_fd(self) -> None:
+        try:
+            os.read(self._fd, 8)
+        except BlockingIOError:
+            return
+        except OSError:
+            # ECANCELED: the wall clock was set; refresh and re-arm
+            pass
+        self._callback()
+
+
+class ClockService(QObject):
+    """One minute-aligned clock for every clock widget.
+
+    Subscribers register a strftime format and get the formatted text
+    immediately and then only when it changes. The service wakes up once
+    per minute, on the minute, and again straight away if the wall clock
+    jumps or the system resumes from suspend.
+    """
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        # (format, upper) -> [last text, callbacks]
+        self._subscribers: Dict[Tuple[str, bool], list] = {}
+        self._alarm = _WallClockAlarm(self.refresh, self)
+        app = QApplication.instance()
+        if app is not None:
+            app.applicationStateChanged.connect(self._on_app_state)
+
+    def subscribe(self, fmt: str, callback: Callable[[str], None], upper: bool = False,
+                  owner: Optional[QObject] = None) -> None:
+        key = (fmt, upper)
+        entry = self._subscribers.setdefault(key, [None, []])
+        entry[1].append(callback)
+        if entry[0] is None:
+            entry[0] = self._format(datetime.now(), fmt, upper)
+        callback(entry[0])
+        if owner is not None:
+            owner.destroyed.connect(lambda *_: self.unsubscribe(callback))
+        self._schedule()
+
+    def unsubscribe(self, callback: Callable[[str], None]) -> None:
+        for key, entry in list(self._subscribers.items()):
+            if callback in entry[1]:
+                entry[1].remove(callback)
+            if not entry[1]:
+                del self._subscribers[key]
+
+    def refresh(self) -> None:
+        """Re-format every subscription and notify those whose text changed."""
+        now = datetime.now()
+        for (fmt, upper), entry in list(self._subscribers.items()):
+            text = self._format(now, fmt, upper)
+            if text == entry[0]:
+                continue
+            entry[0] = text
+            for callback in list(entry[1]):
+                callback(text)
+        self._schedule()
+
+    def _schedule(self) -> None:
+        if not self._subscribers:
+            return
+        now = time.time()
+        self._alarm.arm(now - now % 60 + 60 + _SLACK_MS / 1000.0)
+
+    def _on_app_state(self, state) -> None:
+        if state == Qt.ApplicationActive:
+            self.refresh()
+
+    @staticmethod
+    def _format(now: datetime, fmt: str, upper: bool) -> str:
+        text = now.strftime(fmt)
+        return text.upper() if upper else text
+
+
+_service: Optional[ClockService] = None
+
+
+def clock_service() -> ClockService:
+    """The shared clock service, created on first use."""
+    global _service
+    if _service is None:
+        _service = ClockService()
+    return _service
@@ -1,7 +1,10 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel
-from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
-from datetime import datetime
+from src.clock_service import clock_service
+
+TIME_FORMAT = "%H:%M"  # e.g. "14:30"
+DATE_FORMAT = "%b %d"  # e.g. "AUG 02", shown upper-case
 
 class ClockWidget(QWidget):
     def __init__(self, parent=None):
@@ -46,25 +49,9 @@ class ClockWidget(QWidget):
         self.setStyleSheet("background-color: transparent;")
         
     def setup_timer(self):
-        # Create timer to update time every second
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_time)
-        self.timer.start(1000)  # Update every 1000ms (1 second)
-        
-        # Update immediately
-        self.update_time()
-        
-    def update_time(self):
-        """Update the displayed time and date"""
-        now = datetime.now()
-        
-        # Format time (e.g., "14:30")
-        time_str = now.strftime("%H:%M")
-        self.time_label.setText(time_str)
-        
-        # Format date (e.g., "AUG 2")
-        date_str = now.strftime("%b %d").upper()
-        self.date_label.setText(date_str)
+        # The shared clock service updates the labels only when the text changes
+        clock_service().subscribe(TIME_FORMAT, self.time_label.setText, owner=self.time_label)
+        clock_service().subscribe(DATE_FORMAT, self.date_label.setText, upper=True, owner=self.date_label)
 
 class TimeOnlyWidget(QWidget):
     """Widget that displays only the time"""
@@ -97,21 +84,8 @@ class TimeOnlyWidget(QWidget):
         self.setStyleSheet("background-color: transparent;")
         
     def setup_timer(self):
-        # Create timer to update time every second
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_time)
-        self.timer.start(1000)  # Update every 1000ms (1 second)
-        
-        # Update immediately
-        self.update_time()
-        
-    def update_time(self):
-        """Update the displayed time"""
-        now = datetime.now()
-        
-        # Format time (e.g., "14:30")
-        time_str = now.strftime("%H:%M")
-        self.time_label.setText(time_str)
+        # The shared clock service updates the label only when the minute changes
+        clock_service().subscribe(TIME_FORMAT, self.time_label.setText, owner=self.time_label)
 
 class DateOnlyWidget(QWidget):
     """Widget that displays only the date"""
@@ -144,18 +118,6 @@ class DateOnlyWidget(QWidget):
         self.setStyleSheet("background-color: transparent;")
         
     def setup_timer(self):
-        # Create timer to update date every minute (in case of midnight change)
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_date)
-        self.timer.start(60000)  # Update every 60000ms (1 minute)
-        
-        # Update immediately
-        self.update_date()
-        
-    def update_date(self):
-        """Update the displayed date"""
-        now = datetime.now()
-        
-        # Format date (e.g., "AUG 2")
-        date_str = now.strftime("%b %d").upper()
-        self.date_label.setText(date_str) 
\ No newline at end of file
+        # The shared clock service updates the label only when the date changes
+        clock_service().subscribe(DATE_FORMAT, self.date_label.setText, upper=True, owner=self.date_label)
+ 
\ No newline at end of file
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Instrument cluster in its own process.
+
+Started by main.py with ``--cluster``; it only imports the gauges, never
+QtWebEngine, and reads telemetry from the shared snapshot written by the
+main process, so the readout keeps its frame rate whatever the web views
+are doing. Can also be run by hand against a running dashboard:
+
+    python -m src.cluster --shm <name> [--screen 1]
+"""
+import argparse
+import math
+import os
+import subprocess
+import sys
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication, QWidget, QHBoxLayout
+from PyQt5.QtCore import Qt, QTimer
+
+from src.gauge import GaugeWidget, SOC_SPEC
+from src.speedometer import SpeedometerWidget
+from src.style import theme
+from src.telemetry.shared import SharedSnapshot
+
+FRAME_INTERVAL_MS = 16
+PARENT_CHECK_MS = 1000
+
+
+class ClusterWindow(QWidget):
+    """Speedometer and battery gauge fed from a ``SharedSnapshot``."""
+
+    def __init__(self, snapshot, parent=None):
+        super().__init__(parent)
+        self.snapshot = snapshot
+        self.setWindowTitle("Puddle Cluster")
+        self.setStyleSheet(f"background-color: {theme.COLOR_BG};")
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        self.speedometer = SpeedometerWidget()
+        self.soc_gauge = GaugeWidget(SOC_SPEC)
+        self.soc_gauge.setMinimumSize(300, 300)
+        self.soc_gauge.setMaximumSize(400, 400)
+        layout.addWidget(self.speedometer)
+        layout.addWidget(self.soc_gauge)
+        self._updates = 0
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self.poll)
+        self._timer.start(FRAME_INTERVAL_MS)
+        # Go away with the dashboard, however it exits
+        self._parent_pid = os.getppid()
+        self._parent_timer = QTimer(self)
+        self._parent_timer.timeout.connect(self._check_parent)
+        self._parent_timer.start(PARENT_CHECK_MS)
+
+    def poll(self):
+        record = self.snapshot.read()
+        if record is None or record['updates'] == self._updates:
+            return
+        self._updates = record['updates']
+        self.speedometer.set_speed(record['speed'])
+        self.speedometer.set_power(record['power'])
+        if not math.isnan(record['soc']):
+            self.soc_gauge.set_value(float(record['soc']))
+
+    def _check_parent(self):
+        if os.getppid() != self._parent_pid:
+            QApplication.instance().quit()
+
+
+def spawn_cluster(shm_name, screen=None):
+    """Start the cluster process for the snapshot ``shm_name``."""
+    args = [sys.executable, "-m", "src.cluster", "--shm", shm_name]
+    if screen is not None:
+        args += ["--screen", str(screen)]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return subprocess.Popen(args, cwd=root)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shm", required=True, help="shared snapshot name")
+    parser.add_argument("--screen", type=int, help="screen index to go full screen on")
+    args = parser.parse_args(argv)
+
+    app = QApplication(sys.argv[:1])
+    snapshot = SharedSnapshot(args.shm)
+    window = ClusterWindow(snapshot)
+    screens = app.screens()
+    if args.screen is not None and args.screen < len(screens):
+        window.setGeometry(screens[args.screen].geometry())
+        window.showFullScreen()
+    else:
+        if args.screen is not None:
+            print(f"Cluster: no screen {args.screen}, opening a window")
+        window.show()
+    code = app.exec()
+    snapshot.close()
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
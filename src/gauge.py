@@ -0,0 +1,302 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Tuple
+import math
+
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt, QRect, QRectF, QPointF
+from PyQt5.QtGui import QFont, QPainter, QColor, QPen, QFontDatabase, QRadialGradient, QBrush, QPixmap
+
+
+@dataclass(frozen=True)
+class GaugeSpec:
+    """Everything about a round gauge except its current value.
+
+    Specs are immutable and hashable: the static layer is cached per
+    (spec, size, device pixel ratio) and shared by every gauge using it.
+    Angles are in degrees, counter-clockwise from 3 o'clock like QPainter.
+    """
+    min_value: float = 0
+    max_value: float = 100
+    start_angle: float = 225
+    span_angle: float = 270
+    # Ticks every tick_step, numbered every label_step (0 = no numbers)
+    tick_step: float = 10
+    tick_length: int = 10
+    label_step: float = 0
+    # Coloured bands drawn inside the track: ((from, to, colour), ...)
+    bands: Tuple[Tuple[float, float, str], ...] = ()
+    track_color: str = '#222'
+    track_width: int = 8
+    tick_color: str = '#444'
+    cutout_lines: bool = False
+    arc_color: str = '#00ffea'
+    arc_width: int = 16
+    # Fade the value arc in as the value rises, like the speedometer
+    fade_with_value: bool = False
+    text_color: str = '#ccc'
+    value_format: str = '{:.0f}'
+    unit: str = ''
+    label: str = ''
+    font_family: str = 'Lexend Thin'
+    font_size: int = 24
+    small_font_size: int = 16
+    tick_font_size: int = 10
+
+
+# Static layers shared between gauges, least recently used first
+_STATIC_CACHE_SIZE = 32
+_static_cache: 'OrderedDict[tuple, QPixmap]' = OrderedDict()
+_pen_cache: 'OrderedDict[tuple, QPen]' = OrderedDict()
+_fonts_loaded = {}
+
+
+def _font_family(family):
+    """``family`` if it is installed or can be loaded from Fonts/, else Arial."""
+    available = _fonts_loaded.get(family)
+    if available is None:
+        path = f"Fonts/{family.replace(' ', '-')}.ttf"
+        available = family in QFontDatabase().families() or QFontDatabase.addApplicationFont(path) != -1
+        _fonts_loaded[family] = available
+    return family if available else "Arial"
+
+
+def clear_static_cache():
+    _static_cache.clear()
+    _pen_cache.clear()
+
+
+def _cache_get(cache, key, build):
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache[key] = value
+        if len(cache) > _STATIC_CACHE_SIZE:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(key)
+    return value
+
+
+class GaugeWidget(QWidget):
+    """A round gauge described by a ``GaugeSpec``.
+
+    The track, ticks, numbers and bands come from a pixmap shared by all
+    gauges with the same spec and size; each frame only draws the value
+    arc and the text. ``set_value`` repaints just the part of the arc that
+    changed, so many gauges on a screen cost little more than one.
+    """
+
+    def __init__(self, spec: GaugeSpec, parent=None):
+        super().__init__(parent)
+        self.spec = spec
+        self.value = spec.min_value
+        self.secondary_text = ''
+        self._geometry = None
+        family = _font_family(spec.font_family)
+        self.value_font = QFont(family, spec.font_size, QFont.Normal)
+        self.small_font = QFont(family, spec.small_font_size, QFont.Normal)
+        self.tick_font = QFont(family, spec.tick_font_size, QFont.Normal)
+
+    def set_value(self, value):
+        spec = self.spec
+        value = max(spec.min_value, min(spec.max_value, value))
+        if value == self.value:
+            return
+        old_value, old_opacity = self.value, self._opacity(self.value)
+        self.value = value
+        if self._geometry is None:
+            self.update()
+            return
+        # Only the arc between the old and new value and the text change,
+        # unless the arc colour changed too
+        if self._opacity(value) != old_opacity:
+            dirty = self._arc_bounds(spec.min_value, max(value, old_value))
+        else:
+            dirty = self._arc_bounds(old_value, value)
+        g = self._geometry
+        self.update(dirty.united(g['text_rect']).intersected(g['rect']))
+
+    def set_secondary_text(self, text):
+        if text == self.secondary_text:
+            return
+        self.secondary_text = text
+        if self._geometry is None:
+            self.update()
+        else:
+            self.update(self._geometry['secondary_rect'])
+
+    def value_text(self):
+        spec = self.spec
+        text = spec.value_format.format(self.value)
+        return f"{text} {spec.unit}" if spec.unit else text
+
+    def _fraction(self, value):
+        spec = self.spec
+        return (value - spec.min_value) / (spec.max_value - spec.min_value)
+
+    def _angle(self, value):
+        return self.spec.start_angle - self._fraction(value) * self.spec.span_angle
+
+    def _opacity(self, value):
+        if not self.spec.fade_with_value:
+            return 255
+        # Opacity increases with the value
+        return int(50 + 205 * self._fraction(value))  # 50-255
+
+    def _layout(self):
+        """Geometry shared by the static layer and the dynamic parts."""
+        rect = self.rect()
+        center = rect.center()
+        radius = min(rect.width(), rect.height()) // 2 - 10
+        self._geometry = {
+            'rect': rect,
+            'center': center,
+            'radius': radius,
+            'text_rect': rect.adjusted(0, -int(radius/1.5), 0, -int(radius/6)),
+            'secondary_rect': rect.adjusted(0, -int(radius/6), 0, -int(radius/3)),
+        }
+        return self._geometry
+
+    def _arc_bounds(self, v0, v1):
+        """Bounding rect of the value arc between two values."""
+        g = self._geometry
+        cx, cy, r = g['center'].x(), g['center'].y(), g['radius']
+        a0, a1 = self._angle(v0), self._angle(v1)
+        a_lo, a_hi = min(a0, a1), max(a0, a1)
+        angles = [a_lo, a_hi] + [a for a in range(-360, 721, 90) if a_lo < a < a_hi]
+        xs = [cx + r * math.cos(math.radians(a)) for a in angles]
+        ys = [cy - r * math.sin(math.radians(a)) for a in angles]
+        pad = self.spec.arc_width // 2 + 2
+        return QRect(int(min(xs)) - pad, int(min(ys)) - pad,
+                     int(max(xs) - min(xs)) + 2 * pad, int(max(ys) - min(ys)) + 2 * pad)
+
+    def _arc_pen(self, opacity):
+        g = self._geometry
+        key = (self.spec, g['radius'], g['center'].x(), g['center'].y(), opacity)
+        return _cache_get(_pen_cache, key, lambda: self._build_arc_pen(opacity))
+
+    def _build_arc_pen(self, opacity):
+        g = self._geometry
+        color = QColor(self.spec.arc_color)
+        if self.spec.fade_with_value:
+            grad = QRadialGradient(QPointF(g['center']), g['radius'])
+            for stop, alpha in ((0.0, 0), (0.7, opacity // 2), (1.0, opacity)):
+                c = QColor(color)
+                c.setAlpha(alpha)
+                grad.setColorAt(stop, c)
+            pen = QPen(QBrush(grad), self.spec.arc_width)
+        else:
+            pen = QPen(color, self.spec.arc_width)
+        pen.setCapStyle(Qt.RoundCap)
+        return pen
+
+    def _static_layer(self):
+        dpr = self.devicePixelRatioF()
+        key = (self.spec, self.width(), self.height(), dpr)
+        return _cache_get(_static_cache, key, lambda: self._render_static(dpr))
+
+    def _render_static(self, dpr):
+        """Track, bands, ticks, numbers and label, rendered once per spec, size and DPR."""
+        spec = self.spec
+        g = self._geometry
+        pixmap = QPixmap(int(self.width() * dpr), int(self.height() * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        center, radius = g['center'], g['radius']
+        box = QRectF(center.x() - radius, center.y() - radius, 2 * radius, 2 * radius)
+
+        # Track (with cutout at the bottom)
+        painter.setPen(QPen(QColor(spec.track_color), spec.track_width))
+        painter.drawArc(box, int(spec.start_angle * 16), int(-spec.span_angle * 16))
+
+        # Coloured bands just inside the track
+        inset = spec.tick_length + 4
+        band_box = box.adjusted(inset, inset, -inset, -inset)
+        for lo, hi, color in spec.bands:
+            pen = QPen(QColor(color), 4)
+            pen.setCapStyle(Qt.FlatCap)
+            painter.setPen(pen)
+            a0 = self._angle(lo)
+            painter.drawArc(band_box, int(a0 * 16), int((self._angle(hi) - a0) * 16))
+
+        # Ticks and numbers
+        painter.setPen(QPen(QColor(spec.tick_color), 2))
+        painter.setFont(self.tick_font)
+        steps = int(round((spec.max_value - spec.min_value) / spec.tick_step)) if spec.tick_step else -1
+        for i in range(steps + 1):
+            value = spec.min_value + i * spec.tick_step
+            rad = math.radians(self._angle(value))
+            cos, sin = math.cos(rad), -math.sin(rad)
+            x1 = center.x() + (radius - spec.tick_length) * cos
+            y1 = center.y() + (radius - spec.tick_length) * sin
+            x2 = center.x() + radius * cos
+            y2 = center.y() + radius * sin
+            painter.drawLine(int(x1), int(y1), int(x2), int(y2))
+            if spec.label_step and _is_multiple(value - spec.min_value, spec.label_step):
+                r = radius - spec.tick_length - 20
+                label = QRectF(center.x() + r * cos - 20, center.y() + r * sin - 10, 40, 20)
+                painter.setPen(QColor(spec.text_color))
+                painter.drawText(label, Qt.AlignCenter, f"{value:g}")
+                painter.setPen(QPen(QColor(spec.tick_color), 2))
+
+        # Cutout lines from the arc ends to the center
+        if spec.cutout_lines:
+            for angle in (spec.start_angle, spec.start_angle - spec.span_angle):
+                rad = math.radians(angle)
+                x = center.x() + radius * math.cos(rad)
+                y = center.y() - radius * math.sin(rad)
+                painter.drawLine(center.x(), center.y(), int(x), int(y))
+
+        if spec.label:
+            painter.setPen(QColor(spec.text_color))
+            painter.setFont(self.small_font)
+            painter.drawText(QRectF(box.left(), center.y() + radius * 0.35, box.width(), 24),
+                             Qt.AlignCenter, spec.label)
+        painter.end()
+        return pixmap
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._geometry = None
+
+    def paintEvent(self, event):
+        g = self._geometry or self._layout()
+        spec = self.spec
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.drawPixmap(0, 0, self._static_layer())
+        center, radius = g['center'], g['radius']
+
+        # Value arc
+        if self.value > spec.min_value:
+            painter.setPen(self._arc_pen(self._opacity(self.value)))
+            span = int(self._fraction(self.value) * spec.span_angle * 16)
+            painter.drawArc(center.x() - radius, center.y() - radius, 2 * radius, 2 * radius,
+                            int(spec.start_angle * 16), -span)
+
+        painter.setPen(QColor(spec.text_color))
+        painter.setFont(self.value_font)
+        painter.drawText(g['text_rect'], Qt.AlignCenter, self.value_text())
+        if self.secondary_text:
+            painter.setFont(self.small_font)
+            painter.drawText(g['secondary_rect'], Qt.AlignCenter, self.secondary_text)
+        painter.end()
+
+
+def _is_multiple(value, step):
+    ratio = value / step
+    return abs(ratio - round(ratio)) < 1e-6
+
+
+# Ready-made instruments
+RPM_SPEC = GaugeSpec(min_value=0, max_value=8000, tick_step=500, label_step=1000,
+                     bands=((6500, 8000, '#ff3b30'),), value_format='{:.0f}', unit='rpm')
+SOC_SPEC = GaugeSpec(min_value=0, max_value=100, tick_step=10, label_step=50,
+                     bands=((0, 15, '#ff3b30'), (15, 30, '#ffcc00')), arc_color='#00FFA3',
+                     value_format='{:.0f}', unit='%', label='BATTERY')
+MOTOR_TEMP_SPEC = GaugeSpec(min_value=-20, max_value=160, tick_step=20, label_step=40,
+                            bands=((120, 160, '#ff3b30'),), arc_color='#ffcc00',
+                            value_format='{:.0f}', unit='°C', label='MOTOR')
@@ -0,0 +1,329 @@
+import time
+
+import numpy as np
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QButtonGroup
+from PyQt5.QtCore import Qt, QTimer, QRectF
+from PyQt5.QtGui import QPainter, QPainterPath, QPen, QColor, QFont, QTransform
+
+from src.style import theme
+from src.telemetry.history import history_store
+from src.telemetry.lttb import lttb
+
+# (label, seconds); None is everything since the dashboard started
+SPANS = [("1 min", 60), ("10 min", 600), ("1 h", 3600), ("Trip", None)]
+# (channel, unit, colour)
+SERIES = [("speed", "mph", QColor(0, 255, 234)), ("power", "W", QColor(theme.COLOR_ACCENT))]
+
+TICK_MS = 250
+GRID_COLOR = QColor('#333')
+LABEL_COLOR = QColor(theme.COLOR_TEXT_MUTED)
+MIN_SPAN = 10.0
+
+_STARTED_AT = time.time()
+
+
+def _chip_style():
+    return f"""
+        QPushButton {{
+            background-color: {theme.COLOR_PANEL};
+            color: {theme.COLOR_TEXT_MUTED};
+            border: 1px solid #333;
+            border-radius: 8px;
+            padding: 6px 14px;
+            font-family: {theme.FONT_FAMILY_BOLD};
+            font-size: 14px;
+        }}
+        QPushButton:checked {{
+            color: {theme.COLOR_ACCENT};
+            border-color: {theme.COLOR_ACCENT};
+        }}
+    """
+
+
+class _Trace:
+    """One series as a path in data coordinates (seconds from ``origin``, value).
+
+    The path covers more than the visible window, so panning only changes
+    the transform it is painted with. New samples are appended to the end
+    of the path; it is rebuilt only when the zoom level changes or the
+    view leaves the covered range.
+    """
+
+    def __init__(self, channel, unit, color):
+        self.channel = channel
+        self.unit = unit
+        # A one pixel cosmetic pen takes Qt's hairline fast path; wider
+        # pens go through the stroker and cost ~50x more on dense data
+        self.pen = QPen(color, 1)
+        self.pen.setCosmetic(True)
+        self.path = QPainterPath()
+        self.origin = 0.0
+        self.lo = self.hi = 0.0      # covered time range
+        self.resolution = 0.0        # seconds per point the path was built at
+        self.last_t = None
+        self.y_lo, self.y_hi = 0.0, 1.0
+
+    def covers(self, start, end, resolution, following):
+        span = end - start
+        # Rebuild when zoomed more than 2x, scrolled out of range or when
+        # live data has pushed most of the path off screen
+        return (self.last_t is not None and self.lo <= start <= self.lo + 2 * span
+                and (following or end <= self.hi)
+                and self.resolution / 2 <= resolution <= self.resolution * 2)
+
+    def rebuild(self, store, start, end, span, width, now):
+        """Decimate ``[start - span/2, end + span/2]`` to one point per pixel."""
+        self.lo, self.hi = start - span / 2, min(end + span / 2, now)
+        points = max(3, int(width * (self.hi - self.lo) / span))
+        self.resolution = span / max(width, 1)
+        self.origin = self.lo
+        t, v = store.query(self.channel, self.lo, self.hi, max_points=points * 2)
+        self.path = QPainterPath()
+        self.last_t = None
+        if len(t) == 0:
+            return
+        keep = lttb(t, v, points)
+        t, v = t[keep], v[keep]
+        self._extend_y(v)
+        self._append(t, v)
+
+    def extend(self, store, now):
+        """Append samples newer than the end of the path."""
+        if self.last_t is None or now <= self.last_t:
+            return False
+        span = now - self.last_t
+        points = max(2, int(span / self.resolution) + 1)
+        t, v = store.query(self.channel, np.nextafter(self.last_t, np.inf), now,
+                           max_points=points * 2)
+        self.hi = max(self.hi, now)
+        if len(t) == 0:
+            return False
+        keep = lttb(t, v, points)
+        t, v = t[keep], v[keep]
+        self._extend_y(v)
+        self._append(t, v)
+        return True
+
+    def _append(self, t, v):
+        xs = (t - self.origin).tolist()
+        ys = v.tolist()
+        path = self.path
+        if self.last_t is None:
+            path.moveTo(xs[0], ys[0])
+            xs, ys = xs[1:], ys[1:]
+        for x, y in zip(xs, ys):
+            path.lineTo(x, y)
+        self.last_t = float(t[-1])
+
+    def _extend_y(self, v):
+        lo, hi = float(v.min()), float(v.max())
+        if self.last_t is None:
+            self.y_lo, self.y_hi = min(0.0, lo), max(hi, lo + 1.0)
+        else:
+            self.y_lo, self.y_hi = min(self.y_lo, lo), max(self.y_hi, hi)
+
+
+class _ChartCanvas(QWidget):
+    def __init__(self, chart):
+        super().__init__(chart)
+        self.chart = chart
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self._font = QFont("Lexend Regular")
+        self._font.setPixelSize(13)
+        self._drag_x = None
+
+    def plot_rects(self):
+        r = QRectF(self.rect()).adjusted(56, 12, -12, -24)
+        h = (r.height() - 16) / len(SERIES)
+        return [QRectF(r.left(), r.top() + i * (h + 16), r.width(), h) for i in range(len(SERIES))]
+
+    def paintEvent(self, event):
+        chart = self.chart
+        start, end = chart.visible_range()
+        span = end - start
+        p = QPainter(self)
+        p.fillRect(self.rect(), QColor(theme.COLOR_BG))
+        p.setFont(self._font)
+        for trace, rect in zip(chart.traces, self.plot_rects()):
+            p.setPen(QPen(GRID_COLOR, 1))
+            p.drawRect(rect)
+            y_lo, y_hi = trace.y_lo, trace.y_hi + (trace.y_hi - trace.y_lo) * 0.08
+            p.setPen(LABEL_COLOR)
+            p.drawText(QRectF(0, rect.top() - 2, rect.left() - 6, 16), Qt.AlignRight, f"{y_hi:.0f}")
+            p.drawText(QRectF(0, rect.bottom() - 14, rect.left() - 6, 16), Qt.AlignRight, f"{y_lo:.0f}")
+            p.drawText(QRectF(rect.left() + 6, rect.top() + 4, 200, 16), Qt.AlignLeft, f"{trace.channel} ({trace.unit})")
+            if trace.last_t is None:
+                continue
+            sx = rect.width() / span
+            sy = rect.height() / max(y_hi - y_lo, 1e-6)
+            # data (seconds from origin, value) -> pixels
+            transform = QTransform(sx, 0, 0, -sy,
+                                   rect.left() - (start - trace.origin) * sx,
+                                   rect.bottom() + y_lo * sy)
+            p.save()
+            p.setClipRect(rect)
+            p.setRenderHint(QPainter.Antialiasing)
+            p.setTransform(transform)
+            p.setPen(trace.pen)
+            p.drawPath(trace.path)
+            p.restore()
+        rect = self.plot_rects()[-1]
+        p.setPen(LABEL_COLOR)
+        p.drawText(QRectF(rect.left(), rect.bottom() + 4, 120, 16), Qt.AlignLeft, _ago(chart.now() - start))
+        p.drawText(QRectF(rect.right() - 120, rect.bottom() + 4, 120, 16), Qt.AlignRight,
+                   "now" if chart.following else _ago(chart.now() - end))
+        p.end()
+
+    def mousePressEvent(self, event):
+        self._drag_x = event.x()
+
+    def mouseMoveEvent(self, event):
+        if self._drag_x is None:
+            return
+        width = self.plot_rects()[0].width()
+        start, end = self.chart.visible_range()
+        self.chart.pan(-(event.x() - self._drag_x) * (end - start) / max(width, 1))
+        self._drag_x = event.x()
+
+    def mouseReleaseEvent(self, event):
+        self._drag_x = None
+
+    def mouseDoubleClickEvent(self, event):
+        self.chart.follow()
+
+    def wheelEvent(self, event):
+        rect = self.plot_rects()[0]
+        start, end = self.chart.visible_range()
+        anchor = start + (event.pos().x() - rect.left()) / max(rect.width(), 1) * (end - start)
+        self.chart.zoom(0.8 if event.angleDelta().y() > 0 else 1.25, anchor)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.chart.invalidate()
+
+
+def _ago(seconds):
+    seconds = max(0, int(seconds))
+    if seconds < 60:
+        return f"-{seconds}s"
+    if seconds < 3600:
+        return f"-{seconds // 60}m"
+    return f"-{seconds // 3600}h{seconds % 3600 // 60:02d}"
+
+
+class HistoryChartWidget(QWidget):
+    """Speed and power history, from the last minute up to the whole trip.
+
+    Reads from the telemetry history store. Each series is decimated to
+    about one point per pixel with LTTB and kept as a cached path: live
+    data is appended to the path, panning only moves it, and it is rebuilt
+    only when zooming or scrolling past the covered range. Drag to pan,
+    wheel to zoom, double-tap to go back to live.
+    """
+
+    def __init__(self, store=None, parent=None):
+        super().__init__(parent)
+        self.store = store or history_store()
+        self.traces = [_Trace(*series) for series in SERIES]
+        self.span = SPANS[0][1]
+        self.end = None  # None follows live data
+        self._zoom_span = None
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(10)
+        chips = QHBoxLayout()
+        chips.setSpacing(8)
+        self.span_buttons = QButtonGroup(self)
+        for i, (label, seconds) in enumerate(SPANS):
+            button = QPushButton(label)
+            button.setCheckable(True)
+            button.setChecked(i == 0)
+            button.setStyleSheet(_chip_style())
+            button.clicked.connect(lambda _, s=seconds: self.set_span(s))
+            self.span_buttons.addButton(button, i)
+            chips.addWidget(button)
+        chips.addStretch(1)
+        layout.addLayout(chips)
+        self.canvas = _ChartCanvas(self)
+        layout.addWidget(self.canvas, 1)
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.tick)
+
+    def now(self):
+        return time.time()
+
+    @property
+    def following(self):
+        return self.end is None
+
+    def visible_span(self):
+        if self._zoom_span is not None:
+            return self._zoom_span
+        if self.span is None:
+            return max(MIN_SPAN, self.now() - _STARTED_AT)
+        return float(self.span)
+
+    def visible_range(self):
+        end = self.now() if self.end is None else self.end
+        return end - self.visible_span(), end
+
+    def set_span(self, seconds):
+        self.span = seconds
+        self.span_buttons.button([s for _, s in SPANS].index(seconds)).setChecked(True)
+        self._zoom_span = None
+        self.end = None
+        self.refresh()
+
+    def follow(self):
+        self.end = None
+        self.refresh()
+
+    def pan(self, seconds):
+        start, end = self.visible_range()
+        now = self.now()
+        end = min(end + seconds, now)
+        self.end = None if end >= now else end
+        self.refresh()
+
+    def zoom(self, factor, anchor):
+        start, end = self.visible_range()
+        span = min(max(MIN_SPAN, (end - start) * factor), max(MIN_SPAN, self.now() - _STARTED_AT))
+        new_start = anchor - (anchor - start) * span / (end - start)
+        self._zoom_span = span
+        if self.end is not None:
+            self.end = min(new_start + span, self.now())
+        self.refresh()
+
+    def invalidate(self):
+        for trace in self.traces:
+            trace.last_t = None
+        self.refresh()
+
+    def refresh(self):
+        """Bring the cached paths up to date for the visible range and repaint."""
+        start, end = self.visible_range()
+        span = end - start
+        width = self.canvas.plot_rects()[0].width()
+        resolution = span / max(width, 1)
+        now = self.now()
+        for trace in self.traces:
+            if not trace.covers(start, end, resolution, self.following):
+                trace.rebuild(self.store, start, end, span, width, now)
+            elif self.following:
+                trace.extend(self.store, now)
+        self.canvas.update()
+
+    def tick(self):
+        if self.following:
+            self.refresh()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.invalidate()
+        self._timer.start(TICK_MS)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._timer.stop()
@@ -0,0 +1,49 @@
+from typing import Dict, Optional, Tuple
+
+from PyQt5.QtCore import QRectF, Qt
+from PyQt5.QtGui import QColor, QIcon, QImage, QPainter, QPixmap
+from PyQt5.QtSvg import QSvgRenderer
+
+# (path, logical size, tint) -> pre-rasterized pixmap
+_pixmaps: Dict[Tuple[str, int, Optional[str]], QPixmap] = {}
+
+
+def rasterize_svg(path: str, size: int, color: Optional[QColor] = None, dpr: float = 1.0) -> QImage:
+    """Render an SVG into a QImage, optionally tinted with a flat color.
+
+    Only QImage is used here, so this is safe to call from a worker thread.
+    """
+    px = max(1, int(round(size * dpr)))
+    image = QImage(px, px, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    renderer = QSvgRenderer(path)
+    p = QPainter(image)
+    try:
+        p.setRenderHint(QPainter.Antialiasing)
+        renderer.render(p, QRectF(0, 0, px, px))
+        if color is not None:
+            p.setCompositionMode(QPainter.CompositionMode_SourceIn)
+            p.fillRect(0, 0, px, px, color)
+    finally:
+        p.end()
+    image.setDevicePixelRatio(dpr)
+    return image
+
+
+def store(path: str, size: int, image: QImage, color: Optional[QColor] = None) -> None:
+    """Keep a rasterized icon. Must be called on the UI thread (creates a QPixmap)."""
+    key = (path, size, color.name() if color is not None else None)
+    _pixmaps[key] = QPixmap.fromImage(image)
+
+
+def icon(path: str, size: int, color: Optional[QColor] = None) -> QIcon:
+    """Return the icon for ``path``, using the pre-rasterized pixmap when available."""
+    key = (path, size, color.name() if color is not None else None)
+    pixmap = _pixmaps.get(key)
+    if pixmap is not None:
+        return QIcon(pixmap)
+    if color is None:
+        return QIcon(path)
+    # Tinted icons need rasterizing anyway; do it now and keep the result
+    store(path, size, rasterize_svg(path, size, color), color)
+    return QIcon(_pixmaps[key])
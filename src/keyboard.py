@@ -1,87 +1,180 @@
-from PyQt5.QtWidgets import QWidget, QGridLayout, QPushButton, QVBoxLayout
-from PyQt5.QtCore import Qt, pyqtSignal, QSize
-from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt, pyqtSignal, QSize, QRectF, QEvent
+from PyQt5.QtGui import QFont, QPainter, QColor, QPen
+from PyQt5 import sip
+
+# Key rows; the last row is laid out on a six-column grid
+ROWS = [
+    ['1', '2', '3', '4', '5', '6', '7', '8', '9', '0'],
+    ['q', 'w', 'e', 'r', 't', 'y', 'u', 'i', 'o', 'p'],
+    ['a', 's', 'd', 'f', 'g', 'h', 'j', 'k', 'l'],
+    ['z', 'x', 'c', 'v', 'b', 'n', 'm', '.', '/'],
+]
+# (label, value, columns spanned)
+SPECIAL_ROW = [('Space', ' ', 3), ('⌫', '\b', 1), ('Enter', '\n', 1), ('▼', None, 1)]
+
+BG_COLOR = QColor('#1A1A1A')
+ACCENT_COLOR = QColor('#00FFA3')
+PRESSED_TEXT_COLOR = QColor('#000000')
+SPACING = 5
+MARGIN = 9
+
+
+class _Key:
+    __slots__ = ('rect', 'label', 'value')
+
+    def __init__(self, rect, label, value):
+        self.rect = rect
+        self.label = label
+        self.value = value
+
 
 class VirtualKeyboard(QWidget):
+    """On-screen keyboard drawn as a single widget.
+
+    Key rectangles are computed once per size and touches are hit-tested
+    against them, so pressing a key only repaints that key. One instance is
+    shared by every web embed (see ``shared_keyboard``); ``show_for`` moves
+    it onto the embed that needs it.
+    """
+
     key_pressed = pyqtSignal(str)  # Signal emitted when a key is pressed
-    
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setup_ui()
-        
-    def setup_ui(self):
-        layout = QVBoxLayout()
-        layout.setSpacing(5)
-        self.setStyleSheet("""
-            QPushButton {
-                background-color: #1A1A1A;
-                color: #00FFA3;
-                border: 2px solid #00FFA3;
-                border-radius: 5px;
-                font-family: 'Lexend Bold';
-                font-size: 16px;
-                min-width: 40px;
-                min-height: 40px;
-            }
-            QPushButton:pressed {
-                background-color: #00FFA3;
-                color: #000000;
-            }
-        """)
-        
-        # Main keyboard layout
-        keyboard_layout = QGridLayout()
-        keyboard_layout.setSpacing(5)
-        
-        # Define keyboard rows
-        rows = [
-            ['1', '2', '3', '4', '5', '6', '7', '8', '9', '0'],
-            ['q', 'w', 'e', 'r', 't', 'y', 'u', 'i', 'o', 'p'],
-            ['a', 's', 'd', 'f', 'g', 'h', 'j', 'k', 'l'],
-            ['z', 'x', 'c', 'v', 'b', 'n', 'm', '.', '/']
-        ]
-        
-        # Add keys to layout
-        for row_idx, row in enumerate(rows):
-            for col_idx, key in enumerate(row):
-                btn = QPushButton(key)
-                btn.clicked.connect(lambda checked, k=key: self.key_pressed.emit(k))
-                keyboard_layout.addWidget(btn, row_idx, col_idx)
-        
-        # Special keys row
-        special_layout = QGridLayout()
-        special_layout.setSpacing(5)
-        
-        # Space bar
-        space_btn = QPushButton('Space')
-        space_btn.clicked.connect(lambda: self.key_pressed.emit(' '))
-        space_btn.setMinimumWidth(200)
-        special_layout.addWidget(space_btn, 0, 0, 1, 3)
-        
-        # Backspace
-        backspace_btn = QPushButton('⌫')
-        backspace_btn.clicked.connect(lambda: self.key_pressed.emit('\b'))
-        special_layout.addWidget(backspace_btn, 0, 3)
-        
-        # Enter
-        enter_btn = QPushButton('Enter')
-        enter_btn.clicked.connect(lambda: self.key_pressed.emit('\n'))
-        special_layout.addWidget(enter_btn, 0, 4)
-        
-        # Hide keyboard button
-        hide_btn = QPushButton('▼')
-        hide_btn.clicked.connect(self.hide)
-        special_layout.addWidget(hide_btn, 0, 5)
-        
-        layout.addLayout(keyboard_layout)
-        layout.addLayout(special_layout)
-        self.setLayout(layout)
-        
-    def showEvent(self, event):
-        super().showEvent(event)
-        # Ensure keyboard is always at the bottom of the screen
-        if self.parent():
-            self.move(0, self.parent().height() - self.height())
-            
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self._keys = []
+        self._pressed = None
+        self._host = None
+        self._receiver = None
+        self._font = QFont('Lexend Bold')
+        self._font.setPixelSize(16)
+        self._pen = QPen(ACCENT_COLOR, 2)
+        self.hide()
+
     def sizeHint(self):
-        return QSize(800, 300)  # Reasonable default size for the keyboard 
\ No newline at end of file
+        return QSize(800, 300)  # Reasonable default size for the keyboard
+
+    def show_for(self, host, receiver):
+        """Show the keyboard at the bottom of ``host``, sending keys to ``receiver``."""
+        if self._host is not host:
+            if self._host is not None:
+                self._host.removeEventFilter(self)
+            self.setParent(host)
+            host.installEventFilter(self)
+            self._host = host
+        if self._receiver is not receiver:
+            if self._receiver is not None:
+                self.key_pressed.disconnect(self._receiver)
+            self.key_pressed.connect(receiver)
+            self._receiver = receiver
+        self._place()
+        self.show()
+        self.raise_()
+
+    def release(self, host):
+        """Hide the keyboard if it is currently shown for ``host``."""
+        if self._host is host:
+            self.hide()
+
+    def _place(self):
+        if self._host is None:
+            return
+        width = self._host.width()
+        height = self.sizeHint().height()
+        self.setGeometry(0, self._host.height() - height, width, height)
+
+    def eventFilter(self, obj, event):
+        if obj is self._host and event.type() == QEvent.Resize:
+            self._place()
+        return super().eventFilter(obj, event)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._layout_keys()
+
+    def _layout_keys(self):
+        keys = []
+        w = self.width() - 2 * MARGIN
+        rows = len(ROWS) + 1
+        row_h = (self.height() - 2 * MARGIN - SPACING * (rows - 1)) / rows
+        col_w = (w - SPACING * 9) / 10
+        for r, row in enumerate(ROWS):
+            y = MARGIN + r * (row_h + SPACING)
+            for c, label in enumerate(row):
+                x = MARGIN + c * (col_w + SPACING)
+                keys.append(_Key(QRectF(x, y, col_w, row_h), label, label))
+        y = MARGIN + len(ROWS) * (row_h + SPACING)
+        unit = (w - SPACING * 5) / 6
+        col = 0
+        for label, value, span in SPECIAL_ROW:
+            x = MARGIN + col * (unit + SPACING)
+            keys.append(_Key(QRectF(x, y, unit * span + SPACING * (span - 1), row_h), label, value))
+            col += span
+        self._keys = keys
+
+    def _key_at(self, pos):
+        for key in self._keys:
+            if key.rect.contains(pos):
+                return key
+        return None
+
+    def _update_key(self, key):
+        if key is not None:
+            self.update(key.rect.toAlignedRect().adjusted(-2, -2, 2, 2))
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        p.setRenderHint(QPainter.Antialiasing)
+        dirty = QRectF(event.rect())
+        p.fillRect(event.rect(), BG_COLOR)
+        p.setFont(self._font)
+        for key in self._keys:
+            if not dirty.intersects(key.rect):
+                continue
+            rect = key.rect.adjusted(1, 1, -1, -1)
+            pressed = key is self._pressed
+            p.setPen(self._pen)
+            p.setBrush(ACCENT_COLOR if pressed else BG_COLOR)
+            p.drawRoundedRect(rect, 5, 5)
+            p.setPen(PRESSED_TEXT_COLOR if pressed else ACCENT_COLOR)
+            p.drawText(rect, Qt.AlignCenter, key.label)
+        p.end()
+
+    def mousePressEvent(self, event):
+        key = self._key_at(event.pos())
+        if key is not self._pressed:
+            self._update_key(self._pressed)
+            self._pressed = key
+            self._update_key(key)
+
+    def mouseMoveEvent(self, event):
+        # Sliding off a key cancels it, like a button
+        if self._pressed is not None and not self._pressed.rect.contains(event.pos()):
+            self._update_key(self._pressed)
+            self._pressed = None
+
+    def mouseReleaseEvent(self, event):
+        key = self._pressed
+        self._pressed = None
+        self._update_key(key)
+        if key is None or not key.rect.contains(event.pos()):
+            return
+        if key.value is None:
+            self.hide()
+        else:
+            self.key_pressed.emit(key.value)
+
+
+_shared = None
+
+
+def shared_keyboard():
+    """The application-wide keyboard, created the first time it is needed."""
+    global _shared
+    # The keyboard lives inside whichever embed used it last, so it goes
+    # away with that embed if the embed is ever destroyed
+    if _shared is None or sip.isdeleted(_shared):
+        _shared = VirtualKeyboard()
+    return _shared
@@ -1,9 +1,16 @@
 from PyQt5.QtWidgets import QWidget, QHBoxLayout, QPushButton
 from PyQt5.QtCore import Qt, pyqtSignal, QSize
-from PyQt5.QtGui import QIcon
 import os
 # from debug_logger import debug_logger
 from src.style.buttons import nav_button_style
+from src import icon_cache
+
+HOME_ICON = "Media/Icons/home-hashtag-svgrepo-com.svg"
+MUSIC_ICON = "Media/Icons/music-svgrepo-com.svg"
+MAPS_ICON = "Media/Icons/route-square-svgrepo-com.svg"
+GAMES_ICON = "Media/Icons/gameboy-svgrepo-com.svg"
+NAV_ICONS = [HOME_ICON, MUSIC_ICON, MAPS_ICON, GAMES_ICON]
+NAV_ICON_SIZE = 64  # Doubled icon size
 
 class navWidget(QWidget):
     # Define signals for button clicks
@@ -28,12 +35,12 @@ class navWidget(QWidget):
         layout.addStretch(1)
         
         # Home button
-        home_path = "Media/Icons/home-hashtag-svgrepo-com.svg"
+        home_path = HOME_ICON
         # debug_logger.log_debug(f"Loading home icon: {home_path}", "navWidget")
         if os.path.exists(home_path):
             home_btn = QPushButton()
-            home_btn.setIcon(QIcon(home_path))
-            home_btn.setIconSize(QSize(64, 64))  # Doubled icon size
+            home_btn.setIcon(icon_cache.icon(home_path, NAV_ICON_SIZE))
+            home_btn.setIconSize(QSize(NAV_ICON_SIZE, NAV_ICON_SIZE))  # Doubled icon size
             home_btn.setFixedSize(QSize(100, 100))  # Doubled button size
             home_btn.setStyleSheet(button_style)
             home_btn.clicked.connect(lambda: self.button_clicked_signal.emit("Home"))
@@ -44,12 +51,12 @@ class navWidget(QWidget):
             pass
         
         # Music button
-        music_path = "Media/Icons/music-svgrepo-com.svg"
+        music_path = MUSIC_ICON
         # debug_logger.log_debug(f"Loading music icon: {music_path}", "navWidget")
         if os.path.exists(music_path):
             music_btn = QPushButton()
-            music_btn.setIcon(QIcon(music_path))
-            music_btn.setIconSize(QSize(64, 64))  # Doubled icon size
+            music_btn.setIcon(icon_cache.icon(music_path, NAV_ICON_SIZE))
+            music_btn.setIconSize(QSize(NAV_ICON_SIZE, NAV_ICON_SIZE))  # Doubled icon size
             music_btn.setFixedSize(QSize(100, 100))  # Doubled button size
             music_btn.setStyleSheet(button_style)
             music_btn.clicked.connect(lambda: self.button_clicked_signal.emit("Music"))
@@ -60,12 +67,12 @@ class navWidget(QWidget):
             pass
         
         # Maps button
-        maps_path = "Media/Icons/route-square-svgrepo-com.svg"
+        maps_path = MAPS_ICON
         # debug_logger.log_debug(f"Loading maps icon: {maps_path}", "navWidget")
         if os.path.exists(maps_path):
             maps_btn = QPushButton()
-            maps_btn.setIcon(QIcon(maps_path))
-            maps_btn.setIconSize(QSize(64, 64))  # Doubled icon size
+            maps_btn.setIcon(icon_cache.icon(maps_path, NAV_ICON_SIZE))
+            maps_btn.setIconSize(QSize(NAV_ICON_SIZE, NAV_ICON_SIZE))  # Doubled icon size
             maps_btn.setFixedSize(QSize(100, 100))  # Doubled button size
             maps_btn.setStyleSheet(button_style)
             maps_btn.clicked.connect(lambda: self.button_clicked_signal.emit("Maps"))
@@ -76,12 +83,12 @@ class navWidget(QWidget):
             pass
         
         # Games button
-        games_path = "Media/Icons/gameboy-svgrepo-com.svg"
+        games_path = GAMES_ICON
         # debug_logger.log_debug(f"Loading games icon: {games_path}", "navWidget")
         if os.path.exists(games_path):
             games_btn = QPushButton()
-            games_btn.setIcon(QIcon(games_path))
-            games_btn.setIconSize(QSize(64, 64))  # Doubled icon size
+            games_btn.setIcon(icon_cache.icon(games_path, NAV_ICON_SIZE))
+            games_btn.setIconSize(QSize(NAV_ICON_SIZE, NAV_ICON_SIZE))  # Doubled icon size
             games_btn.setFixedSize(QSize(100, 100))  # Doubled button size
             games_btn.setStyleSheet(button_style)
             games_btn.clicked.connect(lambda: self.button_clicked_signal.emit("Games"))
@@ -0,0 +1,229 @@
+"""Turn-by-turn progress along a route, computed on the device.
+
+The maps page hands over the route once (see RouteBridge); after that
+every position fix is snapped to the route here, without the network.
+The polyline is projected onto a flat plane around its start and its
+segments are put in a uniform grid, so a fix only looks at the few
+segments in its own cell. Network routing is only needed again when the
+car has clearly left the route.
+"""
+import json
+import math
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+EARTH_RADIUS_M = 6371000.0
+# Grid cell size; also how far from the route a fix can be and still snap
+CELL_M = 50.0
+# Off route once further than OFF_ROUTE_M for OFF_ROUTE_SECONDS,
+# back on once within ON_ROUTE_M (hysteresis against GPS jitter)
+OFF_ROUTE_M = 40.0
+ON_ROUTE_M = 20.0
+OFF_ROUTE_SECONDS = 3.0
+ARRIVED_M = 20.0
+# Candidates further behind or ahead of the current progress than this are
+# likely a different pass over the same road (loops, out-and-back) and
+# lose to nearer ones
+BACKTRACK_M = 30.0
+JUMP_AHEAD_M = 500.0
+
+
+@dataclass(frozen=True)
+class Step:
+    instruction: str
+    maneuver: str
+    start_m: float      # distance along the route where the step begins
+    length_m: float
+
+
+@dataclass
+class NavState:
+    step_index: int
+    step: Step
+    next_step: Optional[Step]
+    distance_to_maneuver: float
+    remaining_m: float
+    along_m: float
+    offset_m: float
+    snapped: Tuple[float, float]
+    off_route: bool
+    arrived: bool
+
+
+class Route:
+    """A polyline of ``(lat, lng)`` points and the steps along it."""
+
+    def __init__(self, path: Sequence[Tuple[float, float]],
+                 steps: Sequence[Tuple[str, str, int]] = ()) -> None:
+        """``steps`` are ``(instruction, maneuver, first path index)``."""
+        if len(path) < 2:
+            raise ValueError("A route needs at least two points")
+        self.path = [(float(lat), float(lng)) for lat, lng in path]
+        lat0, lng0 = self.path[0]
+        self._origin = (lat0, lng0)
+        self._kx = math.radians(1) * EARTH_RADIUS_M * math.cos(math.radians(lat0))
+        self._ky = math.radians(1) * EARTH_RADIUS_M
+        self.xy = [self.to_plane(lat, lng) for lat, lng in self.path]
+        self.cumulative = [0.0]
+        for (ax, ay), (bx, by) in zip(self.xy, self.xy[1:]):
+            self.cumulative.append(self.cumulative[-1] + math.hypot(bx - ax, by - ay))
+        self.length_m = self.cumulative[-1]
+        if not steps:
+            steps = [('', '', 0)]
+        starts = [self.cumulative[min(index, len(self.path) - 1)] for _, _, index in steps]
+        ends = starts[1:] + [self.length_m]
+        self.steps = [Step(text, maneuver, start, end - start)
+                      for (text, maneuver, _), start, end in zip(steps, starts, ends)]
+        self._step_starts = starts
+
+    @classmethod
+    def from_json(cls, payload: str) -> 'Route':
+        """The maps page format: ``{"steps": [{"instruction", "maneuver", "path"}]}``.
+
+        Step paths are joined into the route polyline; a bare list of
+        points is a route without steps.
+        """
+        data = json.loads(payload)
+        if isinstance(data, list):
+            return cls(data)
+        path, steps = [], []
+        for step in data.get('steps', ()):
+            points = [tuple(p) for p in step.get('path', ())]
+            start = len(path)
+            # Consecutive steps share their joining point
+            if path and points and points[0] == path[-1]:
+                points = points[1:]
+                start -= 1
+            steps.append((step.get('instruction', ''), step.get('maneuver', ''), start))
+            path.extend(points)
+        return cls(path, steps)
+
+    def to_plane(self, lat: float, lng: float) -> Tuple[float, float]:
+        return (lng - self._origin[1]) * self._kx, (lat - self._origin[0]) * self._ky
+
+    def to_latlng(self, x: float, y: float) -> Tuple[float, float]:
+        return self._origin[0] + y / self._ky, self._origin[1] + x / self._kx
+
+    def step_at(self, along_m: float) -> int:
+        return max(bisect_right(self._step_starts, along_m) - 1, 0)
+
+
+class SegmentGrid:
+    """Uniform grid over the route's segments.
+
+    Each segment is listed in the cells it passes through and their eight
+    neighbours, so the cell a fix falls in holds every segment within
+    ``cell_m`` of it. That is a band of cells along the segment, not its
+    bounding box, so long diagonal segments stay cheap.
+    """
+
+    def __init__(self, xy: Sequence[Tuple[float, float]], cell_m: float = CELL_M) -> None:
+        self.cell_m = cell_m
+        self.cells = {}
+        for i, ((ax, ay), (bx, by)) in enumerate(zip(xy, xy[1:])):
+            band = set()
+            for cx, cy in self._cells_along(ax, ay, bx, by):
+                band.update((cx + dx, cy + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1))
+            for cell in band:
+                self.cells.setdefault(cell, []).append(i)
+
+    def _cell(self, v: float) -> int:
+        return math.floor(v / self.cell_m)
+
+    def _cells_along(self, ax: float, ay: float, bx: float, by: float) -> List[Tuple[int, int]]:
+        """Cells crossed by the segment from ``a`` to ``b``, walked one boundary at a time."""
+        size = self.cell_m
+        cx, cy = self._cell(ax), self._cell(ay)
+        ex, ey = self._cell(bx), self._cell(by)
+        dx, dy = bx - ax, by - ay
+        step_x, step_y = (1 if dx > 0 else -1), (1 if dy > 0 else -1)
+        # Fraction of the segment at which the next x / y cell boundary is crossed
+        next_x = ((cx + (step_x > 0)) * size - ax) / dx if dx else math.inf
+        next_y = ((cy + (step_y > 0)) * size - ay) / dy if dy else math.inf
+        delta_x = size / abs(dx) if dx else math.inf
+        delta_y = size / abs(dy) if dy else math.inf
+        cells = [(cx, cy)]
+        # The exact number of boundary crossings; also guards against rounding at corners
+        for _ in range(abs(ex - cx) + abs(ey - cy)):
+            if next_x < next_y:
+                cx += step_x
+                next_x += delta_x
+            else:
+                cy += step_y
+                next_y += delta_y
+            cells.append((cx, cy))
+        return cells
+
+    def near(self, x: float, y: float) -> List[int]:
+        return self.cells.get((self._cell(x), self._cell(y)), [])
+
+
+class TurnByTurn:
+    """Follows a car along a ``Route``, one fix at a time."""
+
+    def __init__(self, route: Route, cell_m: float = CELL_M) -> None:
+        self.route = route
+        self.grid = SegmentGrid(route.xy, cell_m)
+        # (ax, ay, dx, dy, length^2) per segment, for the hot loop
+        self._segments = [(ax, ay, bx - ax, by - ay, (bx - ax) ** 2 + (by - ay) ** 2)
+                          for (ax, ay), (bx, by) in zip(route.xy, route.xy[1:])]
+        self.along_m = 0.0
+        self.step_index = 0
+        self.off_route = False
+        self._off_since = None
+        self.state: Optional[NavState] = None
+
+    def _snap(self, x: float, y: float):
+        """``(offset, along, px, py)`` of the best match near ``(x, y)``, or None."""
+        best = None
+        best_score = math.inf
+        cumulative = self.route.cumulative
+        segments = self._segments
+        for i in self.grid.near(x, y):
+            ax, ay, dx, dy, len2 = segments[i]
+            t = ((x - ax) * dx + (y - ay) * dy) / len2 if len2 else 0.0
+            t = 0.0 if t < 0.0 else 1.0 if t > 1.0 else t
+            px, py = ax + t * dx, ay + t * dy
+            offset = math.hypot(x - px, y - py)
+            along = cumulative[i] + t * math.sqrt(len2)
+            score = offset
+            if self.state is not None and not \
+                    self.along_m - BACKTRACK_M <= along <= self.along_m + JUMP_AHEAD_M:
+                score += OFF_ROUTE_M
+            if score < best_score:
+                best_score = score
+                best = (offset, along, px, py)
+        return best
+
+    def update(self, lat: float, lng: float, t: float) -> NavState:
+        """Snap a fix taken at time ``t`` (seconds) and advance the route."""
+        route = self.route
+        x, y = route.to_plane(lat, lng)
+        match = self._snap(x, y)
+        if match is None:
+            offset = math.inf
+        else:
+            offset, along, px, py = match
+            if offset <= OFF_ROUTE_M:
+                # Progress only moves forward; GPS noise never undoes a turn
+                self.along_m = max(self.along_m, along)
+        if offset > OFF_ROUTE_M:
+            if self._off_since is None:
+                self._off_since = t
+            if t - self._off_since >= OFF_ROUTE_SECONDS:
+                self.off_route = True
+        elif offset <= ON_ROUTE_M or not self.off_route:
+            self._off_since = None
+            self.off_route = False
+        self.step_index = max(self.step_index, route.step_at(self.along_m))
+        steps = route.steps
+        step = steps[self.step_index]
+        next_step = steps[self.step_index + 1] if self.step_index + 1 < len(steps) else None
+        remaining = route.length_m - self.along_m
+        snapped = route.to_latlng(px, py) if match is not None else (lat, lng)
+        self.state = NavState(self.step_index, step, next_step,
+                              step.start_m + step.length_m - self.along_m, remaining,
+                              self.along_m, offset, snapped, self.off_route,
+                              remaining <= ARRIVED_M and not self.off_route)
+        return self.state
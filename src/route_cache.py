@@ -0,0 +1,155 @@
+"""Directions results kept on the device.
+
+Routes are stored under their origin and destination snapped to a grid
+of ``cell_m`` cells, so the daily trips (home, office, charger) come back
+from disk without asking Google, and keep working offline. Step paths
+are stored as encoded polylines. Entries older than ``refresh_after``
+are still served but flagged stale, so the page can fetch a fresh route
+when it is online; entries older than ``ttl`` are dropped.
+"""
+import json
+import math
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.app_paths import cache_path
+
+CELL_M = 250.0
+TTL_DAYS = 30.0
+REFRESH_AFTER_HOURS = 24.0
+_M_PER_DEG = 111195.0
+
+
+def encode_polyline(points: Sequence[Tuple[float, float]]) -> str:
+    """Google's encoded polyline format, 1e-5 degree precision."""
+    out = []
+    last_lat = last_lng = 0
+    for lat, lng in points:
+        ilat, ilng = int(round(lat * 1e5)), int(round(lng * 1e5))
+        for delta in (ilat - last_lat, ilng - last_lng):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                out.append(chr((0x20 | (value & 0x1f)) + 63))
+                value >>= 5
+            out.append(chr(value + 63))
+        last_lat, last_lng = ilat, ilng
+    return ''.join(out)
+
+
+def decode_polyline(encoded: str) -> List[Tuple[float, float]]:
+    points = []
+    index = lat = lng = 0
+    coords = [0, 0]
+    while index < len(encoded):
+        for i in range(2):
+            shift = result = 0
+            while True:
+                b = ord(encoded[index]) - 63
+                index += 1
+                result |= (b & 0x1f) << shift
+                shift += 5
+                if b < 0x20:
+                    break
+            coords[i] += ~(result >> 1) if result & 1 else result >> 1
+        lat, lng = coords
+        points.append((lat / 1e5, lng / 1e5))
+    return points
+
+
+class RouteCache:
+    """SQLite table of routes keyed by quantized origin and destination."""
+
+    def __init__(self, path: str, cell_m: float = CELL_M, ttl: float = TTL_DAYS * 86400,
+                 refresh_after: float = REFRESH_AFTER_HOURS * 3600) -> None:
+        self.path = path
+        self.cell_m = cell_m
+        self.ttl = ttl
+        self.refresh_after = refresh_after
+        self._db = sqlite3.connect(path)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS routes (
+                origin TEXT, destination TEXT, fetched_at REAL, hits INTEGER DEFAULT 0,
+                steps TEXT, PRIMARY KEY (origin, destination));
+            CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER);
+        """)
+        # hits / stale hits / misses / stored, kept across restarts
+        self.stats = dict.fromkeys(('hits', 'stale', 'misses', 'stored'), 0)
+        self.stats.update(self._db.execute("SELECT name, value FROM counters").fetchall())
+        self.purge()
+
+    def cell(self, lat: float, lng: float) -> str:
+        step = self.cell_m / _M_PER_DEG
+        row = math.floor(lat / step)
+        # Columns narrow with latitude so cells stay roughly square
+        col = math.floor(lng * math.cos(math.radians((row + 0.5) * step)) / step)
+        return f"{row}:{col}"
+
+    def _count(self, name: str) -> None:
+        self.stats[name] += 1
+        self._db.execute("INSERT INTO counters VALUES (?, 1) "
+                         "ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,))
+
+    def get(self, origin: Tuple[float, float], destination: Tuple[float, float],
+            now: Optional[float] = None) -> Optional[Tuple[Dict, bool]]:
+        """``(route, stale)`` for the trip, or None on a miss."""
+        now = time.time() if now is None else now
+        key = (self.cell(*origin), self.cell(*destination))
+        row = self._db.execute("SELECT fetched_at, steps FROM routes WHERE origin=? AND destination=?",
+                               key).fetchone()
+        if row is None or now - row[0] > self.ttl:
+            self._count('misses')
+            self._db.commit()
+            return None
+        stale = now - row[0] > self.refresh_after
+        self._count('stale' if stale else 'hits')
+        self._db.execute("UPDATE routes SET hits = hits + 1 WHERE origin=? AND destination=?", key)
+        self._db.commit()
+        steps = [dict(step, path=decode_polyline(step['path'])) for step in json.loads(row[1])]
+        return {'steps': steps, 'fetched_at': row[0]}, stale
+
+    def put(self, origin: Tuple[float, float], destination: Tuple[float, float],
+            route: Dict, now: Optional[float] = None) -> None:
+        """Store a route in the page format (``steps`` with point lists)."""
+        steps = [dict(step, path=encode_polyline(step.get('path', ()))) for step in route['steps']]
+        self._db.execute("INSERT OR REPLACE INTO routes (origin, destination, fetched_at, steps) "
+                         "VALUES (?, ?, ?, ?)",
+                         (self.cell(*origin), self.cell(*destination),
+                          time.time() if now is None else now, json.dumps(steps)))
+        self._count('stored')
+        self._db.commit()
+
+    def purge(self, now: Optional[float] = None) -> int:
+        now = time.time() if now is None else now
+        removed = self._db.execute("DELETE FROM routes WHERE fetched_at < ?", (now - self.ttl,)).rowcount
+        self._db.commit()
+        return removed
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM routes").fetchone()[0]
+
+    def close(self) -> None:
+        self._db.close()
+
+
+_cache: Optional[RouteCache] = None
+
+
+def route_cache() -> RouteCache:
+    """The shared route cache, created on first use."""
+    global _cache
+    if _cache is None:
+        _cache = RouteCache(cache_path('routes.sqlite'),
+                            ttl=float(os.getenv("PUDDLE_ROUTE_TTL_DAYS", TTL_DAYS)) * 86400)
+    return _cache
+
+
+def close_route_cache() -> None:
+    global _cache
+    if _cache is not None:
+        stats = _cache.stats
+        print(f"Route cache: {stats['hits']} hits, {stats['stale']} stale, "
+              f"{stats['misses']} misses, {len(_cache)} routes")
+        _cache.close()
+        _cache = None
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import Callable, Dict, Optional
+
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtWidgets import QStackedWidget, QWidget
+
+
+class ScreenRegistry(QObject):
+    """Builds content screens the first time they are asked for.
+
+    Screens are registered as factories and only constructed when
+    :meth:`get` is first called for them (normally from a nav or menu
+    button). Built screens are added to the content stack and cached, so
+    later calls are a dictionary lookup.
+    """
+
+    # Emitted once per screen, right after it has been built
+    screen_created = pyqtSignal(str, QObject)
+
+    def __init__(self, stack: QStackedWidget, parent=None) -> None:
+        super().__init__(parent)
+        self._stack = stack
+        self._factories: Dict[str, Callable[[], QWidget]] = {}
+        self._screens: Dict[str, QWidget] = {}
+
+    def register(self, name: str, factory: Callable[[], QWidget]) -> None:
+        self._factories[name] = factory
+
+    def is_built(self, name: str) -> bool:
+        return name in self._screens
+
+    def peek(self, name: str) -> Optional[QWidget]:
+        """Return the screen if it has already been built, without building it."""
+        return self._screens.get(name)
+
+    def get(self, name: str) -> QWidget:
+        """Return the named screen, building it on first use."""
+        screen = self._screens.get(name)
+        if screen is None:
+            screen = self._factories[name]()
+            self._screens[name] = screen
+            self._stack.addWidget(screen)
+            self.screen_created.emit(name, screen)
+        return screen
@@ -0,0 +1,250 @@
+"""Vehicle alerts: threshold and staleness rules over the telemetry channels.
+
+Rules are declared in JSON (the bundled alerts.json, ``$PUDDLE_ALERTS`` or
+an explicit path) and compiled once into per-channel NumPy arrays. Each
+batch of samples is then checked against every rule on its channel with a
+handful of array operations, hysteresis and debounce included, so the cost
+barely moves with the number of rules. Evaluation runs on its own thread
+reading the channel rings; the ingest thread never sees it.
+
+A threshold rule looks like::
+
+    {"name": "overspeed", "channel": "speed", "above": 70, "clear_below": 65,
+     "raise_after": 2.0, "clear_after": 1.0, "severity": "warning",
+     "message": "Speed over 70 mph"}
+
+``below``/``clear_above`` work the same way the other way round. The clear
+level defaults to the threshold (no hysteresis) and the delays default to
+0. A staleness rule has ``stale_after`` seconds instead of a threshold.
+"""
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtSignal
+
+DEFAULT_RULES = os.path.join(os.path.dirname(__file__), 'alerts.json')
+EVAL_INTERVAL = 0.1
+
+SEVERITIES = ('info', 'warning', 'critical')
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    name: str
+    channel: str
+    severity: str = 'warning'
+    message: str = ''
+    # Threshold rules: raise when sign * v > sign * threshold
+    threshold: Optional[float] = None
+    sign: int = 1
+    clear: Optional[float] = None
+    raise_after: float = 0.0
+    clear_after: float = 0.0
+    # Staleness rules: raise when the channel has been silent this long
+    stale_after: Optional[float] = None
+
+    @classmethod
+    def from_dict(cls, d: dict) -> 'AlertRule':
+        try:
+            name, channel = str(d['name']), str(d['channel'])
+        except KeyError as e:
+            raise ValueError(f"Alert rule is missing {e.args[0]!r}: {d}")
+        severity = d.get('severity', 'warning')
+        if severity not in SEVERITIES:
+            raise ValueError(f"Alert rule {name!r}: unknown severity {severity!r}")
+        common = dict(name=name, channel=channel, severity=severity, message=d.get('message', name))
+        if 'stale_after' in d:
+            return cls(stale_after=float(d['stale_after']), **common)
+        if ('above' in d) == ('below' in d):
+            raise ValueError(f"Alert rule {name!r} needs exactly one of 'above', 'below' or 'stale_after'")
+        if 'above' in d:
+            threshold, sign, clear = d['above'], 1, d.get('clear_below', d['above'])
+        else:
+            threshold, sign, clear = d['below'], -1, d.get('clear_above', d['below'])
+        if sign * clear > sign * threshold:
+            raise ValueError(f"Alert rule {name!r}: clear level is past the threshold")
+        return cls(threshold=float(threshold), sign=sign, clear=float(clear),
+                   raise_after=float(d.get('raise_after', 0.0)),
+                   clear_after=float(d.get('clear_after', 0.0)), **common)
+
+
+@dataclass(frozen=True)
+class AlertEvent:
+    rule: AlertRule
+    active: bool
+    t: float
+    value: Optional[float] = None
+
+
+def load_rules(path: Optional[str] = None) -> List[AlertRule]:
+    """Rules from ``path``, ``$PUDDLE_ALERTS`` or the bundled alerts.json."""
+    with open(path or os.getenv('PUDDLE_ALERTS') or DEFAULT_RULES) as f:
+        config = json.load(f)
+    rules = [AlertRule.from_dict(d) for d in config.get('rules', [])]
+    names = [r.name for r in rules]
+    if len(set(names)) != len(names):
+        raise ValueError("Alert rule names must be unique")
+    return rules
+
+
+def _ffill(events: np.ndarray, initial: np.ndarray) -> np.ndarray:
+    """Per row, the sign of the last non-zero event so far (``initial`` before any)."""
+    n = events.shape[1]
+    index = np.where(events != 0, np.arange(n), -1)
+    np.maximum.accumulate(index, axis=1, out=index)
+    last = np.take_along_axis(events, np.maximum(index, 0), axis=1) > 0
+    return np.where(index >= 0, last, initial[:, None])
+
+
+class _ChannelRules:
+    """Threshold rules of one channel as arrays, plus their state."""
+
+    def __init__(self, rules: List[AlertRule]) -> None:
+        self.rules = rules
+        sign = np.array([r.sign for r in rules], np.float64)
+        self.sign = sign[:, None]
+        self.on = (sign * [r.threshold for r in rules])[:, None]
+        self.off = (sign * [r.clear for r in rules])[:, None]
+        self.raise_after = np.array([r.raise_after for r in rules])[:, None]
+        self.clear_after = np.array([r.clear_after for r in rules])[:, None]
+        n = len(rules)
+        self.level = np.zeros(n, bool)        # past the threshold, with hysteresis
+        self.since = np.full(n, -np.inf)      # when ``level`` last changed
+        self.active = np.zeros(n, bool)       # debounced state
+        self.seq = 0
+
+    def evaluate(self, t: np.ndarray, v: np.ndarray) -> List[AlertEvent]:
+        x = self.sign * v.astype(np.float64)
+        # Hysteresis: above ``on`` sets, below ``off`` resets, between holds
+        level = _ffill(np.where(x > self.on, 1, np.where(x < self.off, -1, 0)), self.level)
+        # Time each sample has spent in its current level
+        previous = np.concatenate((self.level[:, None], level[:, :-1]), axis=1)
+        changed = np.where(level != previous, np.arange(len(t)), -1)
+        np.maximum.accumulate(changed, axis=1, out=changed)
+        since = np.where(changed >= 0, t[np.maximum(changed, 0)], self.since[:, None])
+        held = t - since
+        # Debounce: the level has to hold for the delay before the alert follows
+        active = _ffill(np.where(level & (held >= self.raise_after), 1,
+                                 np.where(~level & (held >= self.clear_after), -1, 0)), self.active)
+        previous = np.concatenate((self.active[:, None], active[:, :-1]), axis=1)
+        rows, cols = np.nonzero(active != previous)
+        self.level, self.since, self.active = level[:, -1], since[:, -1], active[:, -1]
+        if len(rows) == 0:
+            return []
+        order = np.argsort(cols, kind='stable')
+        return [AlertEvent(self.rules[r], bool(active[r, c]), float(t[c]), float(v[c]))
+                for r, c in zip(rows[order].tolist(), cols[order].tolist())]
+
+
+class AlertRules:
+    """A rule set compiled for evaluation; not thread-safe, owned by one evaluator."""
+
+    def __init__(self, rules: List[AlertRule]) -> None:
+        self.rules = list(rules)
+        by_channel: Dict[str, List[AlertRule]] = {}
+        for rule in self.rules:
+            if rule.stale_after is None:
+                by_channel.setdefault(rule.channel, []).append(rule)
+        self.channels = {name: _ChannelRules(rs) for name, rs in by_channel.items()}
+        self.stale_rules = [r for r in self.rules if r.stale_after is not None]
+        self._stale_limit = np.array([r.stale_after for r in self.stale_rules])
+        self._stale_active = np.zeros(len(self.stale_rules), bool)
+        self.active: Dict[str, AlertEvent] = {}
+
+    def evaluate(self, channel: str, t: np.ndarray, v: np.ndarray) -> List[AlertEvent]:
+        rules = self.channels.get(channel)
+        if rules is None or len(t) == 0:
+            return []
+        return self._track(rules.evaluate(t, v))
+
+    def check_stale(self, now: float, last_seen: Dict[str, float]) -> List[AlertEvent]:
+        """Raise or clear staleness alerts given each channel's newest sample time."""
+        if not self.stale_rules:
+            return []
+        last = np.array([last_seen.get(r.channel, -np.inf) for r in self.stale_rules])
+        stale = now - last > self._stale_limit
+        changed = np.nonzero(stale != self._stale_active)[0]
+        self._stale_active = stale
+        return self._track([AlertEvent(self.stale_rules[i], bool(stale[i]), now) for i in changed.tolist()])
+
+    def _track(self, events: List[AlertEvent]) -> List[AlertEvent]:
+        for event in events:
+            if event.active:
+                self.active[event.rule.name] = event
+            else:
+                self.active.pop(event.rule.name, None)
+        return events
+
+
+class AlertMonitor(QObject):
+    """Evaluates alert rules against a ``TelemetryEngine`` on a worker thread.
+
+    Every ``interval`` it reads what each ruled channel gained since the
+    last pass and checks staleness. All raise and clear events of a pass go
+    out together as one ``changed`` emission (a list of ``AlertEvent``),
+    which Qt queues over to the UI thread.
+    """
+
+    changed = pyqtSignal(object)
+
+    def __init__(self, engine, rules: Optional[List[AlertRule]] = None,
+                 interval: float = EVAL_INTERVAL, parent=None) -> None:
+        super().__init__(parent)
+        self.engine = engine
+        self.rules = AlertRules(load_rules() if rules is None else rules)
+        self.interval = interval
+        self._started_at = time.time()
+        self._stop = threading.Event()
+        self._thread = None
+        # Worker-thread cost, for load tests with hundreds of rules
+        self.passes = 0
+        self.pass_seconds = 0.0
+
+    @property
+    def active(self) -> List[AlertEvent]:
+        return list(self.rules.active.values())
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._started_at = time.time()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='alerts', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def evaluate(self, now: Optional[float] = None) -> List[AlertEvent]:
+        """One pass over new samples and staleness; emits ``changed`` if anything changed."""
+        start = time.perf_counter()
+        events = []
+        for name, rules in self.rules.channels.items():
+            samples, rules.seq = self.engine.channel(name).read_since(rules.seq)
+            if len(samples):
+                events += self.rules.evaluate(name, samples['t'], samples['v'])
+        last_seen = {}
+        for rule in self.rules.stale_rules:
+            t = self.engine.channel(rule.channel).latest('t')
+            last_seen[rule.channel] = self._started_at if t is None else float(t)
+        events += self.rules.check_stale(time.time() if now is None else now, last_seen)
+        self.passes += 1
+        self.pass_seconds += time.perf_counter() - start
+        if events:
+            self.changed.emit(events)
+        return events
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.evaluate()
+            except Exception as e:
+                print(f"Alert evaluation error: {e}")
@@ -0,0 +1,228 @@
+"""DBC signal decoding for the telemetry engine.
+
+A DBC file is compiled once into extraction plans: for every signal the
+shift and mask to apply to the frame payload read as a 64-bit integer,
+plus sign, scale, offset and multiplexer condition. Decoding a batch then
+costs a handful of NumPy operations per signal, however many frames it
+holds.
+"""
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_DBC = os.path.join(os.path.dirname(__file__), 'vehicle.dbc')
+
+_MESSAGE = re.compile(r'^BO_\s+(\d+)\s+(\w+)\s*:\s*(\d+)')
+_SIGNAL = re.compile(
+    r'^SG_\s+(\w+)\s*(M|m\d+)?\s*:\s*(\d+)\|(\d+)@([01])([+-])\s*'
+    r'\(\s*([-+\d.eE]+)\s*,\s*([-+\d.eE]+)\s*\)\s*'
+    r'\[\s*([-+\d.eE]+)\s*\|\s*([-+\d.eE]+)\s*\]\s*"([^"]*)"')
+_VALTYPE = re.compile(r'^SIG_VALTYPE_\s+(\d+)\s+(\w+)\s*:\s*([12])')
+
+_EFF_FLAG = 0x80000000
+_EFF_MASK = 0x1FFFFFFF
+
+
+@dataclass
+class Signal:
+    name: str
+    start: int
+    length: int
+    little_endian: bool
+    signed: bool
+    scale: float = 1.0
+    offset: float = 0.0
+    minimum: float = 0.0
+    maximum: float = 0.0
+    unit: str = ''
+    is_multiplexer: bool = False
+    mux_value: Optional[int] = None
+    is_float: bool = False
+
+    @property
+    def lsb(self) -> int:
+        """Position of the least significant bit in the payload integer.
+
+        Intel signals read the payload as little-endian and start at their
+        LSB; Motorola signals read it as big-endian and the DBC start bit
+        is the MSB in the byte-wise sawtooth numbering.
+        """
+        if self.little_endian:
+            return self.start
+        msb = (7 - self.start // 8) * 8 + self.start % 8
+        return msb - self.length + 1
+
+
+@dataclass
+class Message:
+    frame_id: int
+    name: str
+    dlc: int
+    signals: List[Signal] = field(default_factory=list)
+
+
+def parse_dbc(text: str) -> Dict[int, Message]:
+    """Messages by CAN id. Only what decoding needs is read."""
+    messages = {}
+    current = None
+    float_signals = []
+    for line in text.splitlines():
+        line = line.strip()
+        m = _MESSAGE.match(line)
+        if m:
+            frame_id = int(m.group(1))
+            if frame_id & _EFF_FLAG:
+                frame_id &= _EFF_MASK
+            current = Message(frame_id, m.group(2), int(m.group(3)))
+            messages[frame_id] = current
+            continue
+        m = _SIGNAL.match(line)
+        if m and current is not None:
+            mux = m.group(2)
+            current.signals.append(Signal(
+                name=m.group(1),
+                start=int(m.group(3)),
+                length=int(m.group(4)),
+                little_endian=m.group(5) == '1',
+                signed=m.group(6) == '-',
+                scale=float(m.group(7)),
+                offset=float(m.group(8)),
+                minimum=float(m.group(9)),
+                maximum=float(m.group(10)),
+                unit=m.group(11),
+                is_multiplexer=mux == 'M',
+                mux_value=int(mux[1:]) if mux and mux != 'M' else None,
+            ))
+            continue
+        m = _VALTYPE.match(line)
+        if m:
+            float_signals.append((int(m.group(1)) & _EFF_MASK, m.group(2)))
+    for frame_id, name in float_signals:
+        message = messages.get(frame_id)
+        for signal in message.signals if message else ():
+            if signal.name == name:
+                signal.is_float = True
+    return messages
+
+
+class _Plan:
+    __slots__ = ('name', 'little_endian', 'shift', 'mask', 'sign_bit', 'scale',
+                 'offset', 'is_float', 'is_multiplexer', 'mux_value')
+
+    def __init__(self, signal: Signal) -> None:
+        self.name = signal.name
+        self.little_endian = signal.little_endian
+        self.shift = np.uint64(signal.lsb)
+        self.mask = np.uint64((1 << signal.length) - 1)
+        self.sign_bit = 1 << (signal.length - 1) if signal.signed else 0
+        self.scale = signal.scale
+        self.offset = signal.offset
+        self.is_float = signal.is_float
+        self.is_multiplexer = signal.is_multiplexer
+        self.mux_value = signal.mux_value
+
+    def raw(self, le: np.ndarray, be: np.ndarray) -> np.ndarray:
+        payload = le if self.little_endian else be
+        return (payload >> self.shift) & self.mask
+
+    def physical(self, raw: np.ndarray) -> np.ndarray:
+        if self.is_float:
+            if self.mask == np.uint64(0xFFFFFFFFFFFFFFFF):
+                return raw.view(np.float64).astype(np.float32)
+            return raw.astype(np.uint32).view(np.float32)
+        if self.sign_bit:
+            values = raw.astype(np.int64)
+            values -= (values & self.sign_bit) << 1
+        else:
+            values = raw
+        values = values.astype(np.float64)
+        if self.scale != 1.0:
+            values *= self.scale
+        if self.offset:
+            values += self.offset
+        return values.astype(np.float32)
+
+
+class DBCDecoder:
+    """Decodes batches of ``FRAME_DTYPE`` frames using a DBC database.
+
+    Called with a batch it returns ``{signal: (t, values)}`` for the signals
+    present, which is what ``TelemetryEngine`` stores per channel. Signals
+    of a multiplexed message only appear for frames carrying their
+    multiplexer value. ``decode_messages`` gives one structured array per
+    message instead.
+    """
+
+    def __init__(self, messages: Dict[int, Message]) -> None:
+        self.messages = messages
+        self._plans = {frame_id: [_Plan(s) for s in message.signals]
+                       for frame_id, message in messages.items()}
+        self._ids = np.array(sorted(self._plans), dtype=np.uint32)
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_DBC) -> 'DBCDecoder':
+        with open(path, encoding='latin-1') as f:
+            return cls(parse_dbc(f.read()))
+
+    @property
+    def channels(self) -> List[str]:
+        return [s.name for m in self.messages.values() for s in m.signals]
+
+    def _groups(self, frames: np.ndarray):
+        ids = frames['id']
+        present = np.intersect1d(np.unique(ids), self._ids, assume_unique=True)
+        for frame_id in present:
+            mask = ids == frame_id
+            data = np.ascontiguousarray(frames['data'][mask])
+            le = data.view('<u8').ravel()
+            be = data.view('>u8').ravel()
+            yield int(frame_id), frames['t'][mask], le, be
+
+    def __call__(self, frames: np.ndarray):
+        out = {}
+        for frame_id, t, le, be in self._groups(frames):
+            plans = self._plans[frame_id]
+            selector = None
+            for plan in plans:
+                if plan.is_multiplexer:
+                    selector = plan.raw(le, be)
+            for plan in plans:
+                if plan.mux_value is None:
+                    out[plan.name] = (t, plan.physical(plan.raw(le, be)))
+                elif selector is not None:
+                    active = selector == plan.mux_value
+                    if active.any():
+                        out[plan.name] = (t[active], plan.physical(plan.raw(le[active], be[active])))
+        return out
+
+    def decode_messages(self, frames: np.ndarray) -> Dict[str, np.ndarray]:
+        """One structured array per message: ``t`` plus a field per signal.
+
+        Multiplexed signals are NaN in frames that do not carry them.
+        """
+        out = {}
+        for frame_id, t, le, be in self._groups(frames):
+            message = self.messages[frame_id]
+            plans = self._plans[frame_id]
+            dtype = [('t', '<f8')] + [(p.name, '<f4') for p in plans]
+            records = np.empty(len(t), dtype)
+            records['t'] = t
+            selector = None
+            for plan in plans:
+                if plan.is_multiplexer:
+                    selector = plan.raw(le, be)
+            for plan in plans:
+                values = plan.physical(plan.raw(le, be))
+                if plan.mux_value is not None and selector is not None:
+                    values = np.where(selector == plan.mux_value, values, np.float32(np.nan))
+                records[plan.name] = values
+            out[message.name] = records
+        return out
+
+
+def load_decoder(path: Optional[str] = None) -> DBCDecoder:
+    """Decoder for ``path``, ``$PUDDLE_DBC`` or the bundled vehicle.dbc."""
+    return DBCDecoder.from_file(path or os.getenv('PUDDLE_DBC') or DEFAULT_DBC)
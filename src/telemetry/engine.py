@@ -0,0 +1,104 @@
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from src.telemetry.ring import FRAME_DTYPE, SAMPLE_DTYPE, RingBuffer
+from src.telemetry.dbc import load_decoder
+from src.telemetry.sources import FrameSource
+
+Decoder = Callable[[np.ndarray], Dict[str, Tuple[np.ndarray, np.ndarray]]]
+
+_MAX_BACKOFF = 5.0
+
+
+class TelemetryEngine:
+    """Reads a frame source on a background thread into ring buffers.
+
+    Raw frames go into ``frames`` and every decoded channel gets its own
+    ring of ``SAMPLE_DTYPE`` records (see ``channel``). The UI never gets a
+    callback from here; it polls the rings (see ``TelemetryFeed``). If the
+    source fails the engine reopens it with a growing back-off.
+    """
+
+    def __init__(self, source: FrameSource, decoder: Optional[Decoder] = None,
+                 frame_capacity: int = 1 << 16, sample_capacity: int = 1 << 14) -> None:
+        self.source = source
+        self.decoder = decoder or load_decoder()
+        self.frames = RingBuffer(frame_capacity, FRAME_DTYPE)
+        self._sample_capacity = sample_capacity
+        self._channels: Dict[str, RingBuffer] = {}
+        for name in getattr(self.decoder, 'channels', ()):
+            self.channel(name)
+        self._stop = threading.Event()
+        self._thread = None
+        self._batch_listeners = []
+        self._channel_listeners = []
+        self.connected = False
+
+    def channel(self, name: str) -> RingBuffer:
+        """The sample ring for ``name``, created empty if it has not been seen yet."""
+        ring = self._channels.get(name)
+        if ring is None:
+            # The engine, feed and alert threads all get here; setdefault is
+            # atomic, so a ring another thread created first is never replaced
+            ring = self._channels.setdefault(name, RingBuffer(self._sample_capacity, SAMPLE_DTYPE))
+        return ring
+
+    @property
+    def channels(self):
+        return list(self._channels)
+
+    def add_batch_listener(self, callback: Callable[[np.ndarray], None]) -> None:
+        """Call ``callback(frames)`` on the engine thread for every raw batch."""
+        self._batch_listeners.append(callback)
+
+    def add_channel_listener(self, callback: Callable[[str, np.ndarray, np.ndarray], None]) -> None:
+        """Call ``callback(name, t, values)`` on the engine thread for every decoded batch."""
+        self._channel_listeners.append(callback)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='telemetry', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def process(self, frames: np.ndarray) -> None:
+        """Store and decode one batch; called on the engine thread."""
+        if len(frames) == 0:
+            return
+        self.frames.push(frames)
+        for callback in self._batch_listeners:
+            callback(frames)
+        for name, (t, values) in self.decoder(frames).items():
+            self.channel(name).push_columns(t=t, v=values)
+            for callback in self._channel_listeners:
+                callback(name, t, values)
+
+    def _run(self) -> None:
+        backoff = 0.5
+        while not self._stop.is_set():
+            try:
+                self.source.open()
+                self.connected = True
+                backoff = 0.5
+                while not self._stop.is_set():
+                    self.process(self.source.read(0.05))
+            except Exception as e:
+                print(f"Telemetry source error: {e}")
+            finally:
+                self.connected = False
+                try:
+                    self.source.close()
+                except Exception:
+                    pass
+            if self._stop.wait(backoff):
+                break
+            backoff = min(backoff * 2, _MAX_BACKOFF)
@@ -0,0 +1,109 @@
+import math
+import time
+from typing import Callable, Dict, List
+
+from PyQt5.QtCore import QObject, QTimer, Qt
+
+from src.telemetry.engine import TelemetryEngine
+
+FRAME_INTERVAL_MS = 16
+
+
+class TelemetryFeed(QObject):
+    """Hands telemetry to widgets once per display frame.
+
+    Each bound channel is checked on a ~60 Hz timer; if anything new was
+    written since the last frame, the setter gets the mean of the new
+    samples (a cheap decimation of the few hundred Hz feed). Nothing is
+    signalled per sample and nothing is allocated per frame.
+    """
+
+    def __init__(self, engine: TelemetryEngine, parent=None) -> None:
+        super().__init__(parent)
+        self.engine = engine
+        # channel -> [last seen sequence, setters]
+        self._bindings: Dict[str, list] = {}
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self.poll)
+        # UI-thread cost of handing values to widgets, for replay load tests
+        self.polls = 0
+        self.poll_seconds = 0.0
+
+    def bind(self, channel: str, setter: Callable[[float], None]) -> None:
+        entry = self._bindings.setdefault(channel, [0, []])
+        entry[1].append(setter)
+
+    def start(self) -> None:
+        self._timer.start(FRAME_INTERVAL_MS)
+
+    def stop(self) -> None:
+        self._timer.stop()
+
+    def poll(self) -> None:
+        start = time.perf_counter()
+        for name, entry in self._bindings.items():
+            ring = self.engine.channel(name)
+            written = ring.written
+            if written == entry[0]:
+                continue
+            value = ring.mean_since(entry[0], 'v')
+            entry[0] = written
+            if value is None:
+                continue
+            setters: List[Callable[[float], None]] = entry[1]
+            for setter in setters:
+                setter(value)
+        self.polls += 1
+        self.poll_seconds += time.perf_counter() - start
+
+
+# Smaller moves than this are not worth a call into the map page
+MIN_MOVE_M = 0.2
+MIN_TURN_DEG = 0.5
+
+
+class PositionFeed(QObject):
+    """Hands the dead-reckoned car position to the maps once per display frame.
+
+    GPS fixes arrive about once a second; in between the tracker
+    extrapolates along the filtered velocity, so the marker glides instead
+    of jumping. A frame in which the car has not visibly moved calls no
+    setter at all.
+    """
+
+    def __init__(self, tracker, parent=None) -> None:
+        super().__init__(parent)
+        self.tracker = tracker
+        self._setters: List[Callable[[float, float, float], None]] = []
+        self._last = None
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self.poll)
+        self.pushes = 0
+
+    def bind(self, setter: Callable[[float, float, float], None]) -> None:
+        self._setters.append(setter)
+
+    def start(self) -> None:
+        self._timer.start(FRAME_INTERVAL_MS)
+
+    def stop(self) -> None:
+        self._timer.stop()
+
+    def poll(self, now=None) -> None:
+        position = self.tracker.position(now)
+        if position is None:
+            return
+        lat, lng, heading = position
+        last = self._last
+        if last is not None:
+            dy = (lat - last[0]) * 111195.0
+            dx = (lng - last[1]) * 111195.0 * math.cos(math.radians(lat))
+            turn = abs((heading - last[2] + 180) % 360 - 180)
+            if dx * dx + dy * dy < MIN_MOVE_M ** 2 and turn < MIN_TURN_DEG:
+                return
+        self._last = position
+        self.pushes += 1
+        for setter in self._setters:
+            setter(lat, lng, heading)
@@ -0,0 +1,435 @@
+"""Car position from a GPS receiver.
+
+Sources yield ``Fix`` lists from ``read()``, like the frame sources in
+sources.py: NMEA from a serial receiver, JSON reports from gpsd, or an
+NMEA log played back with its original timing. ``GpsTracker`` reads one on
+a background thread into a small Kalman filter, which the UI asks for a
+dead-reckoned position every frame (see ``PositionFeed``).
+"""
+import calendar
+import json
+import math
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+try:  # optional: only needed for serial receivers
+    import serial
+except ImportError:
+    serial = None
+
+EARTH_RADIUS_M = 6371000.0
+KNOTS = 0.514444
+# Receiver position error at HDOP 1 (user equivalent range error)
+UERE_M = 4.0
+# Speed over ground reported by receivers is much better than their position
+SPEED_SIGMA = 0.5
+# Process noise: how hard the car may accelerate or turn, m/s^2
+ACCEL_SIGMA = 2.0
+# Below this speed the course is noise and the heading is held
+MIN_HEADING_SPEED = 1.0
+# Dead reckoning stops this long after the last fix
+MAX_EXTRAPOLATION = 2.0
+# A gap this long (a tunnel, a cold start) restarts the filter
+RESET_GAP = 10.0
+_MAX_BACKOFF = 5.0
+
+
+@dataclass
+class Fix:
+    t: float
+    lat: float
+    lng: float
+    speed: Optional[float] = None     # m/s over ground
+    course: Optional[float] = None    # degrees from north
+    hdop: Optional[float] = None
+
+
+def _checksum_ok(sentence: str) -> bool:
+    body, star, checksum = sentence.partition('*')
+    if not star:
+        return True
+    value = 0
+    for ch in body[1:]:
+        value ^= ord(ch)
+    try:
+        return value == int(checksum[:2], 16)
+    except ValueError:
+        return False
+
+
+def _coordinate(value: str, hemisphere: str) -> float:
+    # ddmm.mmmm / dddmm.mmmm
+    degrees_len = value.index('.') - 2
+    result = float(value[:degrees_len]) + float(value[degrees_len:]) / 60.0
+    return -result if hemisphere in ('S', 'W') else result
+
+
+def _utc_seconds(hhmmss: str, ddmmyy: str = '') -> float:
+    seconds = int(hhmmss[0:2]) * 3600 + int(hhmmss[2:4]) * 60 + float(hhmmss[4:])
+    if len(ddmmyy) == 6:
+        seconds += calendar.timegm((2000 + int(ddmmyy[4:6]), int(ddmmyy[2:4]), int(ddmmyy[0:2]), 0, 0, 0))
+    return seconds
+
+
+class NMEAParser:
+    """Turns NMEA sentences into fixes.
+
+    RMC carries position, speed and course; GGA adds the HDOP. Receivers
+    send both every epoch, so a fix is produced for each RMC, and for GGA
+    only from receivers that never send RMC. ``t`` is the receiver's UTC
+    time (seconds of the day unless RMC gave a date) for replay timing.
+    """
+
+    def __init__(self) -> None:
+        self.hdop: Optional[float] = None
+        self._rmc_seen = False
+
+    def feed(self, line: str) -> Optional[Fix]:
+        line = line.strip()
+        if not line.startswith('$') or not _checksum_ok(line):
+            return None
+        fields = line.split('*')[0].split(',')
+        kind = fields[0][3:]
+        try:
+            if kind == 'RMC' and len(fields) >= 10:
+                self._rmc_seen = True
+                if fields[2] != 'A' or not fields[3]:
+                    return None
+                return Fix(_utc_seconds(fields[1], fields[9]),
+                           _coordinate(fields[3], fields[4]), _coordinate(fields[5], fields[6]),
+                           float(fields[7]) * KNOTS if fields[7] else None,
+                           float(fields[8]) if fields[8] else None, self.hdop)
+            if kind == 'GGA' and len(fields) >= 9:
+                if fields[6] in ('', '0') or not fields[2]:
+                    return None
+                self.hdop = float(fields[8]) if fields[8] else None
+                if self._rmc_seen:
+                    return None
+                return Fix(_utc_seconds(fields[1]), _coordinate(fields[2], fields[3]),
+                           _coordinate(fields[4], fields[5]), hdop=self.hdop)
+        except (ValueError, IndexError):
+            pass
+        return None
+
+
+def load_nmea(path: str) -> List[Fix]:
+    """All fixes in an NMEA log, in order."""
+    parser = NMEAParser()
+    with open(path, errors='replace') as f:
+        return [fix for fix in map(parser.feed, f) if fix is not None]
+
+
+class PositionSource:
+    """Base class for position sources."""
+
+    def open(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def read(self, timeout: float = 0.2) -> List[Fix]:
+        raise NotImplementedError
+
+
+class SerialNMEASource(PositionSource):
+    """A receiver on a serial port (or USB CDC device) speaking NMEA 0183."""
+
+    def __init__(self, port: str, baudrate: int = 9600) -> None:
+        self.port = port
+        self.baudrate = baudrate
+        self._serial = None
+        self._parser = NMEAParser()
+        self._pending = b''
+
+    def open(self) -> None:
+        if serial is None:
+            raise RuntimeError("pyserial is required for serial GPS receivers")
+        self._serial = serial.Serial(self.port, self.baudrate, timeout=0)
+
+    def close(self) -> None:
+        if self._serial is not None:
+            self._serial.close()
+            self._serial = None
+
+    def read(self, timeout: float = 0.2) -> List[Fix]:
+        self._serial.timeout = timeout
+        chunk = self._serial.read(max(1, self._serial.in_waiting))
+        lines = (self._pending + chunk).split(b'\n')
+        self._pending = lines.pop()
+        now = time.time()
+        fixes = []
+        for line in lines:
+            fix = self._parser.feed(line.decode('ascii', 'replace'))
+            if fix is not None:
+                fix.t = now
+                fixes.append(fix)
+        return fixes
+
+
+class GpsdSource(PositionSource):
+    """TPV reports from a gpsd daemon (or anything speaking its JSON protocol)."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 2947) -> None:
+        self.host = host
+        self.port = port
+        self._sock = None
+        self._pending = b''
+
+    def open(self) -> None:
+        self._sock = socket.create_connection((self.host, self.port), timeout=5)
+        self._sock.sendall(b'?WATCH={"enable":true,"json":true};\n')
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def read(self, timeout: float = 0.2) -> List[Fix]:
+        self._sock.settimeout(timeout)
+        try:
+            chunk = self._sock.recv(65536)
+        except socket.timeout:
+            return []
+        if not chunk:
+            raise ConnectionError("gpsd closed the connection")
+        lines = (self._pending + chunk).split(b'\n')
+        self._pending = lines.pop()
+        now = time.time()
+        fixes = []
+        for line in lines:
+            try:
+                report = json.loads(line)
+            except ValueError:
+                continue
+            # mode 2/3 is a 2D/3D fix
+            if report.get('class') != 'TPV' or report.get('mode', 0) < 2 or 'lat' not in report:
+                continue
+            eph = report.get('eph')
+            fixes.append(Fix(now, report['lat'], report['lon'], report.get('speed'),
+                             report.get('track'), eph / UERE_M if eph else None))
+        return fixes
+
+
+class NMEAReplaySource(PositionSource):
+    """Plays back an NMEA log with its original timing, scaled by ``rate``."""
+
+    def __init__(self, fixes: List[Fix], rate: float = 1.0, loop: bool = True) -> None:
+        self.fixes = fixes
+        self.rate = rate
+        self.loop = loop
+        self._pos = 0
+        self._start_wall = 0.0
+        self._offset = 0.0
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> 'NMEAReplaySource':
+        return cls(load_nmea(path), **kwargs)
+
+    def open(self) -> None:
+        self._pos = 0
+        self._start_wall = time.monotonic()
+        self._offset = 0.0
+
+    def read(self, timeout: float = 0.2) -> List[Fix]:
+        fixes = self.fixes
+        if not fixes or (not self.loop and self._pos >= len(fixes)):
+            time.sleep(timeout)
+            return []
+        if self._pos >= len(fixes):
+            self._offset += fixes[-1].t - fixes[0].t + 1.0
+            self._pos = 0
+        due = fixes[0].t + (time.monotonic() - self._start_wall) * self.rate - self._offset \
+            if self.rate > 0 else math.inf
+        out = []
+        while self._pos < len(fixes) and fixes[self._pos].t <= due:
+            fix = fixes[self._pos]
+            out.append(Fix(time.time(), fix.lat, fix.lng, fix.speed, fix.course, fix.hdop))
+            self._pos += 1
+        if not out:
+            time.sleep(min(max((fixes[self._pos].t - due) / self.rate, 0.0), timeout))
+        return out
+
+
+def gps_source_from_spec(spec: str) -> Optional[PositionSource]:
+    """Build a source from a PUDDLE_GPS style spec.
+
+    ``serial:/dev/ttyACM0[@9600]``, ``gpsd:[host:]port`` (``gpsd`` alone is
+    the local daemon) or ``replay:drive.nmea[@rate]``. An empty spec means
+    no GPS.
+    """
+    spec = (spec or '').strip()
+    if not spec:
+        return None
+    kind, _, arg = spec.partition(':')
+    kind = kind.lower()
+    if kind == 'serial':
+        port, _, baud = arg.partition('@')
+        return SerialNMEASource(port, int(baud or 9600))
+    if kind == 'gpsd':
+        host, _, port = arg.rpartition(':')
+        return GpsdSource(host or '127.0.0.1', int(port or 2947))
+    if kind == 'replay':
+        path, _, rate = arg.rpartition('@') if '@' in arg else (arg, '', '')
+        return NMEAReplaySource.from_file(os.path.expanduser(path), rate=float(rate or 1.0))
+    raise ValueError(f"Unknown GPS source: {spec}")
+
+
+class PositionFilter:
+    """Constant-velocity Kalman filter on a local east/north plane.
+
+    State is ``[x, y, vx, vy]`` in metres around the first fix. Positions
+    are weighted by their HDOP and speed/course, when the receiver gives
+    them, are fused as a velocity measurement, so the heading follows the
+    road instead of the position jitter.
+    """
+
+    def __init__(self) -> None:
+        self.origin: Optional[Tuple[float, float]] = None
+        self.t = 0.0
+        self.x = np.zeros(4)
+        self.P = np.eye(4)
+        self.heading = 0.0
+
+    def _to_plane(self, lat: float, lng: float) -> Tuple[float, float]:
+        lat0, lng0 = self.origin
+        return (math.radians(lng - lng0) * EARTH_RADIUS_M * self._cos0,
+                math.radians(lat - lat0) * EARTH_RADIUS_M)
+
+    def _to_latlng(self, x: float, y: float) -> Tuple[float, float]:
+        lat0, lng0 = self.origin
+        return (lat0 + math.degrees(y / EARTH_RADIUS_M),
+                lng0 + math.degrees(x / (EARTH_RADIUS_M * self._cos0)))
+
+    def reset(self, fix: Fix) -> None:
+        self.origin = (fix.lat, fix.lng)
+        self._cos0 = max(math.cos(math.radians(fix.lat)), 1e-6)
+        self.t = fix.t
+        self.x = np.zeros(4)
+        sigma = UERE_M * (fix.hdop or 1.0)
+        self.P = np.diag([sigma ** 2, sigma ** 2, 100.0, 100.0])
+        if fix.speed is not None and fix.course is not None:
+            self.x[2:] = self._velocity(fix)
+            self.P[2, 2] = self.P[3, 3] = SPEED_SIGMA ** 2
+        self._update_heading(fix)
+
+    @staticmethod
+    def _velocity(fix: Fix) -> np.ndarray:
+        course = math.radians(fix.course)
+        return np.array([fix.speed * math.sin(course), fix.speed * math.cos(course)])
+
+    def update(self, fix: Fix) -> None:
+        dt = fix.t - self.t
+        # Far from the origin the flat plane stops being flat
+        if self.origin is None or dt > RESET_GAP or dt < 0 or \
+                abs(fix.lat - self.origin[0]) + abs(fix.lng - self.origin[1]) > 0.5:
+            self.reset(fix)
+            return
+        F = np.eye(4)
+        F[0, 2] = F[1, 3] = dt
+        q = ACCEL_SIGMA ** 2
+        Q = q * np.array([[dt ** 4 / 4, 0, dt ** 3 / 2, 0], [0, dt ** 4 / 4, 0, dt ** 3 / 2],
+                          [dt ** 3 / 2, 0, dt ** 2, 0], [0, dt ** 3 / 2, 0, dt ** 2]])
+        x = F @ self.x
+        P = F @ self.P @ F.T + Q
+
+        sigma = UERE_M * (fix.hdop or 1.0)
+        if fix.speed is not None and fix.course is not None:
+            H = np.eye(4)
+            z = np.concatenate((self._to_plane(fix.lat, fix.lng), self._velocity(fix)))
+            R = np.diag([sigma ** 2, sigma ** 2, SPEED_SIGMA ** 2, SPEED_SIGMA ** 2])
+        else:
+            H = np.eye(2, 4)
+            z = np.array(self._to_plane(fix.lat, fix.lng))
+            R = np.eye(2) * sigma ** 2
+        S = H @ P @ H.T + R
+        K = np.linalg.solve(S, H @ P).T
+        self.x = x + K @ (z - H @ x)
+        self.P = (np.eye(4) - K @ H) @ P
+        self.t = fix.t
+        self._update_heading(fix)
+
+    def _update_heading(self, fix: Fix) -> None:
+        vx, vy = self.x[2:]
+        if math.hypot(vx, vy) >= MIN_HEADING_SPEED:
+            self.heading = math.degrees(math.atan2(vx, vy)) % 360
+        elif fix.course is not None and (fix.speed or 0) >= MIN_HEADING_SPEED:
+            self.heading = fix.course % 360
+
+    @property
+    def speed(self) -> float:
+        return float(math.hypot(*self.x[2:]))
+
+    def predict(self, t: float) -> Optional[Tuple[float, float, float]]:
+        """``(lat, lng, heading)`` dead-reckoned to time ``t``."""
+        if self.origin is None:
+            return None
+        dt = min(max(t - self.t, 0.0), MAX_EXTRAPOLATION)
+        lat, lng = self._to_latlng(self.x[0] + self.x[2] * dt, self.x[1] + self.x[3] * dt)
+        return lat, lng, self.heading
+
+
+class GpsTracker:
+    """Reads a position source on a background thread into a ``PositionFilter``."""
+
+    def __init__(self, source: PositionSource) -> None:
+        self.source = source
+        self.filter = PositionFilter()
+        self.fixes = 0
+        self.last_fix_at = 0.0
+        self.connected = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='gps', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def process(self, fixes: List[Fix]) -> None:
+        for fix in fixes:
+            with self._lock:
+                self.filter.update(fix)
+            self.fixes += 1
+            self.last_fix_at = fix.t
+
+    def position(self, now: Optional[float] = None) -> Optional[Tuple[float, float, float]]:
+        """The current ``(lat, lng, heading)``, extrapolated from the last fix."""
+        with self._lock:
+            return self.filter.predict(time.time() if now is None else now)
+
+    def _run(self) -> None:
+        backoff = 0.5
+        while not self._stop.is_set():
+            try:
+                self.source.open()
+                self.connected = True
+                backoff = 0.5
+                while not self._stop.is_set():
+                    self.process(self.source.read(0.2))
+            except Exception as e:
+                print(f"GPS source error: {e}")
+            finally:
+                self.connected = False
+                try:
+                    self.source.close()
+                except Exception:
+                    pass
+            if self._stop.wait(backoff):
+                break
+            backoff = min(backoff * 2, _MAX_BACKOFF)
@@ -0,0 +1,242 @@
+"""Trip history: an append-only columnar store of decoded channels.
+
+Every channel has its own directory. Samples are partitioned by hour into
+a pair of column files, ``<hour>.t`` (float64 seconds) and ``<hour>.v``
+(float32 values), and every flushed chunk of samples gets a fixed-size
+record in ``summary`` with its time span, position and min/max/mean.
+Queries memory-map only the partitions they need, and windows too long
+to plot sample by sample are answered from the chunk summaries, so a
+week of data costs about as much to chart as a minute.
+"""
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.app_paths import DATA_DIR
+
+PARTITION_SECONDS = 3600
+
+SUMMARY_DTYPE = np.dtype([
+    ('t0', '<f8'),
+    ('t1', '<f8'),
+    ('part', '<u4'),      # hour the chunk's samples live in
+    ('offset', '<u4'),    # index of the first sample in that partition
+    ('count', '<u4'),
+    ('min', '<f4'),
+    ('max', '<f4'),
+    ('mean', '<f4'),
+])
+
+# Summaries replace raw samples once each point would span this many chunks
+_CHUNKS_PER_POINT = 4
+
+
+class _Channel:
+    def __init__(self, directory: str, chunk_samples: int) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.pending_t = np.empty(chunk_samples, '<f8')
+        self.pending_v = np.empty(chunk_samples, '<f4')
+        self.fill = 0
+        self.opened_at = 0.0
+        self._sizes: Dict[int, int] = {}
+
+    def column_path(self, part: int, column: str) -> str:
+        return os.path.join(self.directory, f'{part}.{column}')
+
+    @property
+    def summary_path(self) -> str:
+        return os.path.join(self.directory, 'summary')
+
+    def partition_size(self, part: int) -> int:
+        size = self._sizes.get(part)
+        if size is None:
+            path = self.column_path(part, 'v')
+            size = os.path.getsize(path) // 4 if os.path.exists(path) else 0
+            self._sizes[part] = size
+        return size
+
+    def partitions(self) -> List[int]:
+        return sorted(int(name[:-2]) for name in os.listdir(self.directory)
+                      if name.endswith('.v') and name[:-2].isdigit())
+
+
+class HistoryStore:
+    """Per-channel columnar history of telemetry samples.
+
+    ``append`` may be called from the telemetry thread and ``query`` from
+    the UI thread. Samples are kept in memory until a chunk is full or
+    ``flush_interval`` seconds old, and queries see them straight away.
+    """
+
+    def __init__(self, root: Optional[str] = None, chunk_samples: int = 1024,
+                 flush_interval: float = 5.0) -> None:
+        self.root = root or os.path.join(DATA_DIR, 'history')
+        self.chunk_samples = chunk_samples
+        self.flush_interval = flush_interval
+        self._channels: Dict[str, _Channel] = {}
+        self._lock = threading.Lock()
+
+    def _channel(self, name: str) -> _Channel:
+        channel = self._channels.get(name)
+        if channel is None:
+            with self._lock:
+                channel = self._channels.get(name)
+                if channel is None:
+                    safe = re.sub(r'[^\w.-]', '_', name)
+                    channel = _Channel(os.path.join(self.root, safe), self.chunk_samples)
+                    self._channels[name] = channel
+        return channel
+
+    @property
+    def channels(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(os.listdir(self.root))
+
+    def append(self, name: str, t: np.ndarray, v: np.ndarray) -> None:
+        channel = self._channel(name)
+        with channel.lock:
+            while len(t):
+                if channel.fill == 0:
+                    channel.opened_at = time.monotonic()
+                n = min(len(t), self.chunk_samples - channel.fill)
+                channel.pending_t[channel.fill:channel.fill + n] = t[:n]
+                channel.pending_v[channel.fill:channel.fill + n] = v[:n]
+                channel.fill += n
+                t, v = t[n:], v[n:]
+                if (channel.fill == self.chunk_samples
+                        or time.monotonic() - channel.opened_at >= self.flush_interval):
+                    self._flush(channel)
+
+    def flush(self) -> None:
+        for channel in list(self._channels.values()):
+            with channel.lock:
+                self._flush(channel)
+
+    close = flush
+
+    def _flush(self, channel: _Channel) -> None:
+        if channel.fill == 0:
+            return
+        t = channel.pending_t[:channel.fill]
+        v = channel.pending_v[:channel.fill]
+        parts = (t // PARTITION_SECONDS).astype(np.int64)
+        # Split at hour boundaries so every chunk lives in one partition
+        bounds = np.flatnonzero(np.diff(parts)) + 1
+        summaries = []
+        for ts, vs, part in zip(np.split(t, bounds), np.split(v, bounds), parts[np.r_[0, bounds]]):
+            part = int(part)
+            offset = channel.partition_size(part)
+            with open(channel.column_path(part, 't'), 'ab') as f:
+                f.write(ts.tobytes())
+            with open(channel.column_path(part, 'v'), 'ab') as f:
+                f.write(vs.tobytes())
+            channel._sizes[part] = offset + len(vs)
+            summaries.append((ts[0], ts[-1], part, offset, len(vs),
+                              vs.min(), vs.max(), vs.mean(dtype=np.float64)))
+        with open(channel.summary_path, 'ab') as f:
+            f.write(np.array(summaries, SUMMARY_DTYPE).tobytes())
+        channel.fill = 0
+
+    def summaries(self, name: str, t0: float = -np.inf, t1: float = np.inf) -> np.ndarray:
+        """Chunk summaries overlapping ``[t0, t1]``."""
+        path = self._channel(name).summary_path
+        count = os.path.getsize(path) // SUMMARY_DTYPE.itemsize if os.path.exists(path) else 0
+        if count == 0:
+            return np.zeros(0, SUMMARY_DTYPE)
+        summary = np.memmap(path, SUMMARY_DTYPE, 'r', shape=(count,))
+        first = int(np.searchsorted(summary['t1'], t0, side='left'))
+        last = int(np.searchsorted(summary['t0'], t1, side='right'))
+        return summary[first:last]
+
+    def _raw(self, channel: _Channel, t0: float, t1: float):
+        """Memory-mapped sample slices in ``[t0, t1]``, partition by partition."""
+        first = int(t0 // PARTITION_SECONDS) if np.isfinite(t0) else None
+        last = int(t1 // PARTITION_SECONDS) if np.isfinite(t1) else None
+        for part in channel.partitions():
+            if (first is not None and part < first) or (last is not None and part > last):
+                continue
+            size = channel.partition_size(part)
+            if size == 0:
+                continue
+            ts = np.memmap(channel.column_path(part, 't'), '<f8', 'r', shape=(size,))
+            vs = np.memmap(channel.column_path(part, 'v'), '<f4', 'r', shape=(size,))
+            lo = int(np.searchsorted(ts, t0, side='left'))
+            hi = int(np.searchsorted(ts, t1, side='right'))
+            if hi > lo:
+                yield ts[lo:hi], vs[lo:hi]
+
+    def query(self, name: str, t0: float, t1: float,
+              max_points: int = 2000) -> Tuple[np.ndarray, np.ndarray]:
+        """Samples of ``name`` in ``[t0, t1]``, decimated to at most ``max_points``.
+
+        Short windows return the samples themselves. Longer ones return the
+        mean of ``max_points`` equal time buckets, computed from the raw
+        samples or, when every bucket spans several chunks, from the chunk
+        summaries without touching the samples at all.
+        """
+        channel = self._channel(name)
+        with channel.lock:
+            pending_t = channel.pending_t[:channel.fill].copy()
+            pending_v = channel.pending_v[:channel.fill].copy()
+            # Flushed data is everything before the pending chunk
+            stored_end = pending_t[0] if len(pending_t) else np.inf
+        keep = (pending_t >= t0) & (pending_t <= t1)
+        pending_t, pending_v = pending_t[keep], pending_v[keep]
+
+        summaries = self.summaries(name, t0, min(t1, stored_end))
+        stored = int(summaries['count'].sum())
+        if stored + len(pending_t) <= max_points:
+            slices = list(self._raw(channel, t0, min(t1, np.nextafter(stored_end, -np.inf))))
+            ts = [s[0] for s in slices] + [pending_t]
+            vs = [s[1] for s in slices] + [pending_v]
+            return np.concatenate(ts).astype(np.float64), np.concatenate(vs).astype(np.float32)
+
+        sums = np.zeros(max_points)
+        counts = np.zeros(max_points)
+        width = (t1 - t0) / max_points
+
+        inner_edges = t0 + width * np.arange(1, max_points)
+
+        def accumulate(t, v, weights=None):
+            # Samples are sorted by time, so buckets are contiguous runs
+            starts = np.r_[0, np.searchsorted(t, inner_edges)]
+            n = np.diff(np.r_[starts, len(t)])
+            nonempty = n > 0
+            first = starts[nonempty]
+            if weights is None:
+                sums[nonempty] += np.add.reduceat(v, first)
+                counts[nonempty] += n[nonempty]
+            else:
+                sums[nonempty] += np.add.reduceat(weights * v, first)
+                counts[nonempty] += np.add.reduceat(weights, first)
+
+        if len(summaries) >= max_points * _CHUNKS_PER_POINT:
+            # Attribute each chunk's mean to the bucket of its midpoint
+            mid = (summaries['t0'] + summaries['t1']) / 2
+            accumulate(mid, summaries['mean'].astype(np.float64), summaries['count'].astype(np.float64))
+        else:
+            for ts, vs in self._raw(channel, t0, min(t1, np.nextafter(stored_end, -np.inf))):
+                accumulate(ts, vs.astype(np.float64))
+        if len(pending_t):
+            accumulate(pending_t, pending_v.astype(np.float64))
+        filled = counts > 0
+        centers = t0 + (np.arange(max_points) + 0.5) * width
+        return centers[filled], (sums[filled] / counts[filled]).astype(np.float32)
+
+
+_store: Optional[HistoryStore] = None
+
+
+def history_store() -> HistoryStore:
+    """The shared history store in the data directory, created on first use."""
+    global _store
+    if _store is None:
+        _store = HistoryStore()
+    return _store
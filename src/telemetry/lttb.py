@@ -0,0 +1,62 @@
+import numpy as np
+
+# Above this many points per bucket, buckets are first cut down to their
+# minimum and maximum (MinMaxLTTB); the result is visually the same
+PRESELECT_RATIO = 8
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the points Largest-Triangle-Three-Buckets keeps.
+
+    The first and last points are always kept. The points between are
+    split into ``n_out - 2`` buckets and from each bucket the point forming
+    the largest triangle with the previously kept point and the mean of
+    the next bucket is kept. Bucket edges, means and the min/max
+    preselection for long inputs are vectorized; the final walk has to go
+    bucket by bucket since each choice depends on the one before.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, np.float64)
+    y = np.asarray(y, np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    if n > PRESELECT_RATIO * n_out:
+        keep = _minmax(y, edges)
+        return keep[lttb(x[keep], y[keep], n_out)]
+
+    starts, ends = edges[:-1], edges[1:]
+    counts = ends - starts
+    # Mean of every bucket, and the last point standing in as the bucket after the last
+    mean_x = np.append(np.add.reduceat(x[1:n - 1], starts - 1) / counts, x[-1]).tolist()
+    mean_y = np.append(np.add.reduceat(y[1:n - 1], starts - 1) / counts, y[-1]).tolist()
+
+    xs, ys = x.tolist(), y.tolist()
+    out = [0]
+    a = 0
+    for i, (lo, hi) in enumerate(zip(starts.tolist(), ends.tolist())):
+        ax, ay = xs[a], ys[a]
+        # Twice the triangle area is linear in the candidate point
+        kx, ky = mean_y[i + 1] - ay, ax - mean_x[i + 1]
+        best, a = -1.0, lo
+        for j in range(lo, hi):
+            area = abs(kx * (xs[j] - ax) + ky * (ys[j] - ay))
+            if area > best:
+                best, a = area, j
+        out.append(a)
+    out.append(n - 1)
+    return np.array(out, np.int64)
+
+
+def _minmax(y: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """First, last and the min and max of every bucket, in index order."""
+    starts, counts = edges[:-1], np.diff(edges)
+    width = int(counts.max())
+    columns = np.arange(width)
+    valid = columns < counts[:, None]
+    index = np.where(valid, starts[:, None] + columns, 0)
+    values = y[index]
+    lo = np.where(valid, values, np.inf).argmin(axis=1)
+    hi = np.where(valid, values, -np.inf).argmax(axis=1)
+    pair = np.sort(np.stack([lo, hi], axis=1), axis=1) + starts[:, None]
+    return np.concatenate(([0], pair.ravel(), [len(y) - 1]))
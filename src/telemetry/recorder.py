@@ -0,0 +1,346 @@
+"""Append-only binary log of raw telemetry frames.
+
+A log is two files:
+
+``trip.ptlog``
+    An 8 byte file header followed by chunks. Each chunk is a small header
+    (frame count, payload size, first and last timestamp) and a zlib
+    payload holding the chunk column by column: timestamps as microsecond
+    offsets from the first frame, ids, lengths and the eight data bytes.
+    Storing columns instead of records lets zlib find the repetition.
+``trip.ptlog.idx``
+    One fixed-size ``INDEX_DTYPE`` record per chunk, so a reader can
+    memory-map it and binary-search by time without touching the log.
+
+Both files are only ever appended to. A reader trusts index entries whose
+chunk is complete on disk and rebuilds the index by scanning the log if
+it is missing.
+"""
+import argparse
+import mmap
+import os
+import struct
+import time
+import zlib
+from typing import Iterator, Optional
+
+import numpy as np
+
+from src.telemetry.ring import FRAME_DTYPE
+from src.telemetry.sources import FrameSource, load_candump
+
+FILE_MAGIC = b'PTLOG\x00\x01\x00'
+_CHUNK = struct.Struct('<4sIIdd')
+_CHUNK_MAGIC = b'CHNK'
+
+INDEX_DTYPE = np.dtype([
+    ('offset', '<u8'),   # of the chunk header in the log
+    ('count', '<u4'),
+    ('size', '<u4'),     # compressed payload bytes
+    ('t0', '<f8'),
+    ('t1', '<f8'),
+])
+
+# Timestamps are stored as u4 microseconds from the chunk start
+_MAX_CHUNK_SPAN = 3600.0
+
+
+def _encode(frames: np.ndarray) -> bytes:
+    t0 = frames['t'][0]
+    offsets = np.round((frames['t'] - t0) * 1e6).astype('<u4')
+    columns = (offsets, frames['id'].astype('<u4'), frames['dlc'],
+               np.ascontiguousarray(frames['data'].T))
+    return zlib.compress(b''.join(c.tobytes() for c in columns), 1)
+
+
+def _decode(payload, count: int, t0: float) -> np.ndarray:
+    raw = zlib.decompress(payload)
+    frames = np.empty(count, FRAME_DTYPE)
+    pos = 0
+    offsets = np.frombuffer(raw, '<u4', count, pos)
+    pos += 4 * count
+    frames['t'] = t0 + offsets / 1e6
+    frames['id'] = np.frombuffer(raw, '<u4', count, pos)
+    pos += 4 * count
+    frames['dlc'] = np.frombuffer(raw, 'u1', count, pos)
+    pos += count
+    frames['data'] = np.frombuffer(raw, 'u1', 8 * count, pos).reshape(8, count).T
+    return frames
+
+
+class TelemetryRecorder:
+    """Appends raw frames to a log.
+
+    ``write`` is cheap enough to call from the engine thread for every
+    batch (see ``TelemetryEngine.add_batch_listener``): frames are copied
+    into a preallocated chunk and compressed once the chunk is full or
+    ``flush_interval`` seconds old.
+    """
+
+    def __init__(self, path: str, chunk_frames: int = 8192, flush_interval: float = 2.0) -> None:
+        self.path = path
+        self.flush_interval = flush_interval
+        self._chunk = np.empty(chunk_frames, FRAME_DTYPE)
+        self._fill = 0
+        self._opened_at = 0.0
+        self.frames_written = 0
+        self.bytes_written = 0
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._log = open(path, 'ab')
+        if new:
+            self._log.write(FILE_MAGIC)
+        else:
+            with open(path, 'rb') as f:
+                if f.read(len(FILE_MAGIC)) != FILE_MAGIC:
+                    self._log.close()
+                    raise ValueError(f"{path} is not a telemetry log")
+            if not os.path.exists(index_path(path)):
+                TelemetryLog(path).close()  # rebuilds the index
+        self._index = open(index_path(path), 'ab')
+
+    def write(self, frames: np.ndarray) -> None:
+        while len(frames):
+            if self._fill == 0:
+                self._opened_at = time.monotonic()
+                t0 = frames['t'][0]
+            else:
+                t0 = self._chunk['t'][0]
+            n = min(len(frames), len(self._chunk) - self._fill)
+            # Offsets are unsigned and 32 bit: a frame from before the chunk
+            # start (the wall clock was stepped back) or too far after it
+            # starts a new chunk
+            offsets = frames['t'][:n] - t0
+            fits = (offsets >= 0) & (offsets < _MAX_CHUNK_SPAN)
+            if not fits.all():
+                n = int(np.argmin(fits))
+            if n:
+                self._chunk[self._fill:self._fill + n] = frames[:n]
+                self._fill += n
+                frames = frames[n:]
+            if (n == 0 or self._fill == len(self._chunk)
+                    or time.monotonic() - self._opened_at >= self.flush_interval):
+                self.flush()
+
+    def flush(self) -> None:
+        if self._fill == 0:
+            return
+        frames = self._chunk[:self._fill]
+        payload = _encode(frames)
+        t0, t1 = float(frames['t'][0]), float(frames['t'].max())
+        offset = self._log.tell()
+        self._log.write(_CHUNK.pack(_CHUNK_MAGIC, len(frames), len(payload), t0, t1))
+        self._log.write(payload)
+        self._log.flush()
+        entry = np.array([(offset, len(frames), len(payload), t0, t1)], INDEX_DTYPE)
+        self._index.write(entry.tobytes())
+        self._index.flush()
+        self.frames_written += len(frames)
+        self.bytes_written += _CHUNK.size + len(payload)
+        self._fill = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._log.close()
+        self._index.close()
+
+
+def index_path(path: str) -> str:
+    return path + '.idx'
+
+
+class TelemetryLog:
+    """Read access to a log through memory maps.
+
+    Only the chunks overlapping a requested time range are decompressed.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        if size < len(FILE_MAGIC):
+            raise ValueError(f"{path} is not a telemetry log")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(FILE_MAGIC)] != FILE_MAGIC:
+            raise ValueError(f"{path} is not a telemetry log")
+        self.index = self._load_index(size)
+
+    def _load_index(self, size: int) -> np.ndarray:
+        path = index_path(self.path)
+        if os.path.exists(path):
+            entries = os.path.getsize(path) // INDEX_DTYPE.itemsize
+            if entries == 0:
+                return np.zeros(0, INDEX_DTYPE)
+            index = np.memmap(path, INDEX_DTYPE, 'r', shape=(entries,))
+            # A crash can leave an index entry for a chunk that never hit the disk
+            complete = index['offset'] + _CHUNK.size + index['size'] <= size
+            return index if complete.all() else index[:int(np.argmin(complete))]
+        return self._rebuild_index(size, path)
+
+    def _rebuild_index(self, size: int, path: str) -> np.ndarray:
+        entries = []
+        offset = len(FILE_MAGIC)
+        while offset + _CHUNK.size <= size:
+            magic, count, length, t0, t1 = _CHUNK.unpack_from(self._map, offset)
+            if magic != _CHUNK_MAGIC or offset + _CHUNK.size + length > size:
+                break
+            entries.append((offset, count, length, t0, t1))
+            offset += _CHUNK.size + length
+        index = np.array(entries, INDEX_DTYPE)
+        with open(path, 'wb') as f:
+            f.write(index.tobytes())
+        return index
+
+    def __len__(self) -> int:
+        return int(self.index['count'].sum())
+
+    @property
+    def time_range(self):
+        if len(self.index) == 0:
+            return None
+        # Chunks are in file order, which is not time order after a clock step
+        return float(self.index['t0'].min()), float(self.index['t1'].max())
+
+    def chunk(self, i: int) -> np.ndarray:
+        entry = self.index[i]
+        start = int(entry['offset']) + _CHUNK.size
+        payload = memoryview(self._map)[start:start + int(entry['size'])]
+        try:
+            return _decode(payload, int(entry['count']), float(entry['t0']))
+        finally:
+            payload.release()
+
+    def iter_chunks(self, t0: Optional[float] = None, t1: Optional[float] = None) -> Iterator[np.ndarray]:
+        """Chunks overlapping ``[t0, t1]``, trimmed to it."""
+        overlaps = np.ones(len(self.index), bool)
+        if t0 is not None:
+            overlaps &= self.index['t1'] >= t0
+        if t1 is not None:
+            overlaps &= self.index['t0'] <= t1
+        for i in np.flatnonzero(overlaps):
+            frames = self.chunk(i)
+            if t0 is not None and frames['t'][0] < t0:
+                frames = frames[frames['t'] >= t0]
+            if t1 is not None and frames['t'][-1] > t1:
+                frames = frames[frames['t'] <= t1]
+            if len(frames):
+                yield frames
+
+    def read(self, t0: Optional[float] = None, t1: Optional[float] = None) -> np.ndarray:
+        chunks = list(self.iter_chunks(t0, t1))
+        return np.concatenate(chunks) if chunks else np.zeros(0, FRAME_DTYPE)
+
+    def close(self) -> None:
+        self.index = np.zeros(0, INDEX_DTYPE)
+        self._map.close()
+        self._file.close()
+
+
+class LogReplaySource(FrameSource):
+    """Replays a telemetry log into the engine, one chunk in memory at a time.
+
+    ``rate`` 1.0 is real time, larger is faster and 0 is as fast as the
+    engine takes frames. Timing is taken from the recorded timestamps, so
+    a replay feeds the UI the same sequence every time. With ``restamp``
+    the frames carry the current time like a live source.
+    """
+
+    def __init__(self, path: str, rate: float = 1.0, loop: bool = False,
+                 restamp: bool = True, max_batch: int = 256) -> None:
+        super().__init__(max_batch)
+        self.path = path
+        self.rate = rate
+        self.loop = loop
+        self.restamp = restamp
+        self._log = None
+        self._chunk_no = 0
+        self._frames = np.zeros(0, FRAME_DTYPE)
+        self._pos = 0
+        self._origin = 0.0     # recorded time that maps to _start_wall
+        self._start_wall = 0.0
+        self.finished = False
+
+    def open(self) -> None:
+        self._log = TelemetryLog(self.path)
+        self._rewind()
+
+    def _rewind(self) -> None:
+        self._chunk_no = 0
+        self._frames = np.zeros(0, FRAME_DTYPE)
+        self._pos = 0
+        # Replay is in file order, so the clock starts at the first chunk
+        self._origin = float(self._log.index['t0'][0]) if len(self._log.index) else 0.0
+        self._start_wall = time.monotonic()
+        self.finished = len(self._log.index) == 0
+
+    def close(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def _next_frames(self) -> bool:
+        while self._pos >= len(self._frames):
+            if self._chunk_no >= len(self._log.index):
+                if not self.loop:
+                    self.finished = True
+                    return False
+                self._rewind()
+            frames = self._log.chunk(self._chunk_no)
+            if len(self._frames) and frames['t'][0] < self._frames['t'][-1]:
+                # The clock stepped back while recording; go on without a gap
+                self._origin -= self._frames['t'][-1] - frames['t'][0]
+            self._frames = frames
+            self._chunk_no += 1
+            self._pos = 0
+        return True
+
+    def read(self, timeout: float = 0.05) -> np.ndarray:
+        if self.finished or not self._next_frames():
+            time.sleep(timeout)
+            return self._out[:0]
+        frames = self._frames
+        end = min(len(frames), self._pos + self.max_batch)
+        if self.rate > 0:
+            due = self._origin + (time.monotonic() - self._start_wall) * self.rate
+            end = min(end, int(np.searchsorted(frames['t'], due, side='right')))
+            if end <= self._pos:
+                wait = (frames['t'][self._pos] - due) / self.rate
+                time.sleep(min(max(wait, 0.0), timeout))
+                return self._out[:0]
+        n = end - self._pos
+        out = self._out[:n]
+        out[:] = frames[self._pos:end]
+        if self.restamp:
+            out['t'] = time.time()
+        self._pos = end
+        return out
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Inspect or create telemetry logs")
+    sub = parser.add_subparsers(dest='command', required=True)
+    info = sub.add_parser('info', help='print a summary of a log')
+    info.add_argument('log')
+    convert = sub.add_parser('convert', help='convert a candump -l log')
+    convert.add_argument('candump')
+    convert.add_argument('log')
+    args = parser.parse_args(argv)
+
+    if args.command == 'convert':
+        recorder = TelemetryRecorder(args.log, flush_interval=float('inf'))
+        recorder.write(load_candump(args.candump))
+        recorder.close()
+        print(f"Wrote {recorder.frames_written} frames ({recorder.bytes_written} bytes) to {args.log}")
+        return
+    log = TelemetryLog(args.log)
+    span = log.time_range
+    print(f"{args.log}: {len(log)} frames in {len(log.index)} chunks, "
+          f"{os.path.getsize(args.log)} bytes")
+    if span:
+        ids = np.unique(np.concatenate([c['id'] for c in log.iter_chunks()]))
+        print(f"  {span[1] - span[0]:.1f} s, ids: {' '.join(f'{i:03X}' for i in ids)}")
+    log.close()
+
+
+if __name__ == '__main__':
+    main()
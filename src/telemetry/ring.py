@@ -0,0 +1,107 @@
+from typing import Optional
+
+import numpy as np
+
+# Raw CAN frame as it comes off the bus. Packed, so a batch can be sent
+# over UDP or written to disk as-is.
+FRAME_DTYPE = np.dtype([
+    ('t', '<f8'),          # seconds since the epoch
+    ('id', '<u4'),         # 11 or 29 bit identifier
+    ('dlc', 'u1'),
+    ('data', 'u1', (8,)),
+])
+
+# One decoded value of a telemetry channel
+SAMPLE_DTYPE = np.dtype([('t', '<f8'), ('v', '<f4')])
+
+
+class RingBuffer:
+    """Fixed-size ring of NumPy records for one writer thread and one reader.
+
+    The writer copies whole batches in and only then advances ``written``,
+    so a reader that checks ``written`` never sees a half-written record.
+    Nothing is allocated per sample on either side.
+    """
+
+    def __init__(self, capacity: int, dtype: np.dtype) -> None:
+        self.capacity = int(capacity)
+        self.dtype = np.dtype(dtype)
+        self._buf = np.zeros(self.capacity, self.dtype)
+        # Total number of records ever written; also the next sequence number
+        self.written = 0
+
+    def __len__(self) -> int:
+        return min(self.written, self.capacity)
+
+    def push(self, items: np.ndarray) -> None:
+        n = len(items)
+        if n == 0:
+            return
+        if n > self.capacity:
+            skipped = n - self.capacity
+            items = items[skipped:]
+            self.written += skipped
+            n = self.capacity
+        start = self.written % self.capacity
+        first = min(n, self.capacity - start)
+        self._buf[start:start + first] = items[:first]
+        if first < n:
+            self._buf[:n - first] = items[first:]
+        self.written += n
+
+    def push_columns(self, **columns) -> None:
+        """Push a batch given as one array per field, e.g. ``t=..., v=...``."""
+        n = len(next(iter(columns.values())))
+        if n == 0:
+            return
+        batch = np.empty(n, self.dtype)
+        for name, values in columns.items():
+            batch[name] = values
+        self.push(batch)
+
+    def latest(self, field: Optional[str] = None):
+        """The newest record (or one field of it), or None if nothing was written."""
+        if self.written == 0:
+            return None
+        record = self._buf[(self.written - 1) % self.capacity]
+        return record if field is None else record[field]
+
+    def read_since(self, seq: int, out: Optional[np.ndarray] = None):
+        """Copy records with sequence numbers ``>= seq``.
+
+        Returns ``(records, next_seq)``. If the reader fell more than
+        ``capacity`` behind, the oldest records are gone and only the last
+        ``capacity`` are returned.
+        """
+        end = self.written
+        seq = max(seq, end - self.capacity, 0)
+        n = end - seq
+        if out is None or len(out) < n:
+            out = np.empty(n, self.dtype)
+        if n:
+            start = seq % self.capacity
+            first = min(n, self.capacity - start)
+            out[:first] = self._buf[start:start + first]
+            if first < n:
+                out[first:n] = self._buf[:n - first]
+            # The writer may have lapped us while copying
+            lost = self.written - self.capacity - seq
+            if lost > 0:
+                out = out[lost:n]
+                n -= lost
+        return out[:n], end
+
+    def mean_since(self, seq: int, field: str) -> Optional[float]:
+        """Mean of ``field`` over records newer than ``seq`` without copying them."""
+        end = self.written
+        seq = max(seq, end - self.capacity, 0)
+        n = end - seq
+        if n <= 0:
+            return None
+        column = self._buf[field]
+        start = seq % self.capacity
+        first = min(n, self.capacity - start)
+        total = float(column[start:start + first].sum())
+        if first < n:
+            total += float(column[:n - first].sum())
+        return total / n
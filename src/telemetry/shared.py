@@ -0,0 +1,97 @@
+"""Latest telemetry values in shared memory, for the cluster process.
+
+One fixed-size record guarded by a sequence lock: the writer bumps
+``seq`` to an odd value, writes the values and bumps it back to even; a
+reader copies the record and keeps the copy only if ``seq`` was even and
+unchanged around it. Neither side ever blocks the other, so a stalled UI
+process cannot hold up the cluster and vice versa.
+"""
+import time
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional
+
+import numpy as np
+
+SNAPSHOT_DTYPE = np.dtype([
+    ('seq', '<u8'),
+    ('t', '<f8'),          # time of the newest value, seconds since the epoch
+    ('speed', '<f8'),      # mph
+    ('power', '<f8'),      # W
+    ('soc', '<f8'),        # %, NaN until known
+    ('updates', '<u8'),
+])
+CHANNELS = ('speed', 'power', 'soc')
+
+_READ_RETRIES = 100
+# Segments created by this process
+_created = set()
+
+
+class SharedSnapshot:
+    """The shared record, created by the publishing process and opened by readers."""
+
+    def __init__(self, name: Optional[str] = None, create: bool = False) -> None:
+        if create:
+            self._shm = SharedMemory(name=name, create=True, size=SNAPSHOT_DTYPE.itemsize)
+            _created.add(self._shm.name)
+        else:
+            self._shm = SharedMemory(name=name)
+            # Only the creator owns the segment; without this the resource
+            # tracker unlinks it when a reader exits (Python < 3.13)
+            if self._shm.name not in _created:
+                resource_tracker.unregister(self._shm._name, 'shared_memory')
+        self.owner = create
+        self._record = np.ndarray(1, SNAPSHOT_DTYPE, buffer=self._shm.buf)
+        self._seq = self._record['seq']
+        if create:
+            self._record[0] = (0, 0.0, 0.0, 0.0, np.nan, 0)
+        self.retries = 0
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def write(self, **values) -> None:
+        """Update some fields (one writer thread only)."""
+        record = self._record
+        seq = int(self._seq[0])
+        self._seq[0] = seq + 1
+        for field, value in values.items():
+            record[field] = value
+        record['updates'] += 1
+        self._seq[0] = seq + 2
+
+    def read(self) -> Optional[np.void]:
+        """A consistent copy of the record, or None if the writer kept it busy."""
+        for _ in range(_READ_RETRIES):
+            before = int(self._seq[0])
+            if before & 1 == 0:
+                copy = self._record[0].copy()
+                if int(self._seq[0]) == before:
+                    return copy
+            self.retries += 1
+            time.sleep(0)
+        return None
+
+    def close(self) -> None:
+        # Views into the buffer have to go before it can be closed
+        self._record = self._seq = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+            _created.discard(self._shm.name)
+
+
+class SnapshotPublisher:
+    """Channel listener that keeps a ``SharedSnapshot`` up to date."""
+
+    def __init__(self, snapshot: SharedSnapshot) -> None:
+        self.snapshot = snapshot
+
+    def attach(self, engine) -> None:
+        engine.add_channel_listener(self.on_samples)
+
+    def on_samples(self, name: str, t: np.ndarray, v: np.ndarray) -> None:
+        if name in CHANNELS and len(v):
+            self.snapshot.write(**{'t': float(t[-1]), name: float(v[-1])})
@@ -0,0 +1,63 @@
+"""Local stand-in for a vehicle.
+
+Sends the simulated drive cycle as UDP datagrams of packed frames, or
+writes it as a ``candump -l`` log for the replay source::
+
+    python -m src.telemetry.simulator --udp 127.0.0.1:5005 --rate 200
+    python -m src.telemetry.simulator --candump trip.log --seconds 600
+
+Point the dashboard at it with ``PUDDLE_TELEMETRY=udp:5005`` or
+``PUDDLE_TELEMETRY=replay:trip.log``.
+"""
+import argparse
+import socket
+import time
+
+import numpy as np
+
+from src.telemetry.sources import simulate_frames
+
+
+def write_candump(path: str, seconds: float, rate_hz: float, start: float = 0.0,
+                  interface: str = 'vcan0') -> int:
+    frames = simulate_frames(start + np.arange(int(seconds * rate_hz)) / rate_hz)
+    with open(path, 'w') as f:
+        for frame in frames:
+            data = bytes(frame['data'][:frame['dlc']]).hex().upper()
+            f.write(f"({frame['t']:.6f}) {interface} {frame['id']:03X}#{data}\n")
+    return len(frames)
+
+
+def send_udp(host: str, port: int, rate_hz: float, batch_hz: float = 50.0) -> None:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    per_batch = max(1, int(rate_hz / batch_hz))
+    t = time.time()
+    while True:
+        times = t + np.arange(per_batch) / rate_hz
+        sock.sendto(simulate_frames(times).tobytes(), (host, port))
+        t += per_batch / rate_hz
+        time.sleep(max(0.0, t - time.time()))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--udp', default='127.0.0.1:5005', help='host:port to send to')
+    parser.add_argument('--rate', type=float, default=200.0, help='samples per second per signal')
+    parser.add_argument('--candump', help='write a candump log instead of sending')
+    parser.add_argument('--seconds', type=float, default=300.0, help='length of the candump log')
+    args = parser.parse_args(argv)
+
+    if args.candump:
+        count = write_candump(args.candump, args.seconds, args.rate)
+        print(f"Wrote {count} frames to {args.candump}")
+        return
+    host, _, port = args.udp.rpartition(':')
+    print(f"Sending telemetry to {host or '127.0.0.1'}:{port} at {args.rate:g} Hz")
+    try:
+        send_udp(host or '127.0.0.1', int(port), args.rate)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
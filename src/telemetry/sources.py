@@ -0,0 +1,354 @@
+"""Frame sources for the telemetry engine.
+
+Every source yields batches of raw CAN frames as ``FRAME_DTYPE`` arrays
+from ``read()``, which blocks for at most ``timeout`` seconds. Batches are
+views into a buffer owned by the source and are only valid until the next
+``read()``.
+"""
+import os
+import re
+import socket
+import struct
+import time
+from typing import Optional
+
+import numpy as np
+
+from src.telemetry.ring import FRAME_DTYPE
+
+try:  # optional: only needed for serial adapters
+    import serial
+except ImportError:
+    serial = None
+
+CAN_EFF_FLAG = 0x80000000
+CAN_RTR_FLAG = 0x40000000
+CAN_ERR_FLAG = 0x20000000
+CAN_EFF_MASK = 0x1FFFFFFF
+CAN_SFF_MASK = 0x7FF
+
+_CAN_FRAME = struct.Struct('<IB3x8s')
+
+# IDs used by the built-in simulator; see vehicle.dbc
+SIM_SPEED_ID = 0x100
+SIM_POWER_ID = 0x101
+SIM_SOC_ID = 0x102
+
+
+class FrameSource:
+    """Base class for frame sources."""
+
+    def __init__(self, max_batch: int = 256) -> None:
+        self.max_batch = max_batch
+        self._out = np.zeros(max_batch, FRAME_DTYPE)
+
+    def open(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def read(self, timeout: float = 0.05) -> np.ndarray:
+        raise NotImplementedError
+
+    def _put(self, i: int, t: float, can_id: int, data: bytes) -> None:
+        rec = self._out[i]
+        rec['t'] = t
+        rec['id'] = can_id
+        rec['dlc'] = len(data)
+        rec['data'][:len(data)] = np.frombuffer(data, np.uint8)
+        rec['data'][len(data):] = 0
+
+
+class SocketCANSource(FrameSource):
+    """Linux SocketCAN interface, e.g. ``can0`` or ``vcan0``."""
+
+    def __init__(self, channel: str = 'can0', max_batch: int = 256) -> None:
+        super().__init__(max_batch)
+        self.channel = channel
+        self._sock = None
+
+    def open(self) -> None:
+        self._sock = socket.socket(socket.AF_CAN, socket.SOCK_RAW, socket.CAN_RAW)
+        self._sock.bind((self.channel,))
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def read(self, timeout: float = 0.05) -> np.ndarray:
+        sock = self._sock
+        n = 0
+        sock.settimeout(timeout)
+        try:
+            while n < self.max_batch:
+                raw = sock.recv(_CAN_FRAME.size)
+                can_id, dlc, data = _CAN_FRAME.unpack(raw)
+                if not can_id & (CAN_RTR_FLAG | CAN_ERR_FLAG):
+                    can_id &= CAN_EFF_MASK if can_id & CAN_EFF_FLAG else CAN_SFF_MASK
+                    self._put(n, time.time(), can_id, data[:dlc])
+                    n += 1
+                # Drain whatever else is queued without waiting
+                sock.settimeout(0)
+        except (socket.timeout, BlockingIOError):
+            pass
+        return self._out[:n]
+
+
+class SLCANSource(FrameSource):
+    """Serial-line CAN adapter speaking the LAWICEL/SLCAN ASCII protocol."""
+
+    def __init__(self, port: str, baudrate: int = 115200, bitrate_code: str = 'S6',
+                 max_batch: int = 256) -> None:
+        super().__init__(max_batch)
+        self.port = port
+        self.baudrate = baudrate
+        self.bitrate_code = bitrate_code  # S6 = 500 kbit/s
+        self._serial = None
+        self._pending = b''
+
+    def open(self) -> None:
+        if serial is None:
+            raise RuntimeError("pyserial is required for SLCAN telemetry")
+        self._serial = serial.Serial(self.port, self.baudrate, timeout=0)
+        self._serial.write(b'C\r' + self.bitrate_code.encode() + b'\rO\r')
+
+    def close(self) -> None:
+        if self._serial is not None:
+            try:
+                self._serial.write(b'C\r')
+            finally:
+                self._serial.close()
+                self._serial = None
+
+    def read(self, timeout: float = 0.05) -> np.ndarray:
+        self._serial.timeout = timeout
+        chunk = self._serial.read(max(1, self._serial.in_waiting))
+        lines = (self._pending + chunk).split(b'\r')
+        self._pending = lines.pop()
+        n = 0
+        now = time.time()
+        for line in lines:
+            if n >= self.max_batch:
+                break
+            parsed = parse_slcan(line)
+            if parsed is not None:
+                self._put(n, now, *parsed)
+                n += 1
+        return self._out[:n]
+
+
+def parse_slcan(line: bytes):
+    """``(id, data)`` for an SLCAN ``t``/``T`` data frame line, else None."""
+    try:
+        if line[:1] == b't':
+            can_id, dlc, body = int(line[1:4], 16), int(line[4:5]), line[5:]
+        elif line[:1] == b'T':
+            can_id, dlc, body = int(line[1:9], 16), int(line[9:10]), line[10:]
+        else:
+            return None
+        return can_id, bytes.fromhex(body[:2 * dlc].decode())
+    except ValueError:
+        return None
+
+
+_CANDUMP_LINE = re.compile(r'\((\d+\.\d+)\)\s+\S+\s+([0-9A-Fa-f]+)#([0-9A-Fa-f]*)')
+
+
+def load_candump(path: str) -> np.ndarray:
+    """Read a ``candump -l`` log into a frame array."""
+    rows = []
+    with open(path) as f:
+        for line in f:
+            m = _CANDUMP_LINE.match(line.strip())
+            if m:
+                data = bytes.fromhex(m.group(3))[:8]
+                rows.append((float(m.group(1)), int(m.group(2), 16), len(data),
+                             tuple(data) + (0,) * (8 - len(data))))
+    return np.array(rows, FRAME_DTYPE)
+
+
+class ReplaySource(FrameSource):
+    """Plays back recorded frames with their original timing.
+
+    ``rate`` scales time: 1.0 is real time, 4.0 is four times faster and 0
+    plays back as fast as the engine can take it. Frames are re-stamped
+    with the current time so consumers see a live feed.
+    """
+
+    def __init__(self, frames: np.ndarray, rate: float = 1.0, loop: bool = True,
+                 max_batch: int = 256) -> None:
+        super().__init__(max_batch)
+        self.frames = frames
+        self.rate = rate
+        self.loop = loop
+        self._pos = 0
+        self._start_wall = 0.0
+        self._offset = 0.0
+
+    @classmethod
+    def from_candump(cls, path: str, **kwargs) -> 'ReplaySource':
+        return cls(load_candump(path), **kwargs)
+
+    def open(self) -> None:
+        self._pos = 0
+        self._start_wall = time.monotonic()
+        self._offset = 0.0
+
+    @property
+    def finished(self) -> bool:
+        return not self.loop and self._pos >= len(self.frames)
+
+    def read(self, timeout: float = 0.05) -> np.ndarray:
+        frames = self.frames
+        if len(frames) == 0 or self.finished:
+            time.sleep(timeout)
+            return self._out[:0]
+        if self._pos >= len(frames):
+            # Loop: continue the timeline where the last pass ended
+            self._offset += frames['t'][-1] - frames['t'][0]
+            self._pos = 0
+        t0 = frames['t'][0]
+        if self.rate > 0:
+            elapsed = (time.monotonic() - self._start_wall) * self.rate
+            due = t0 + elapsed - self._offset
+            end = int(np.searchsorted(frames['t'], due, side='right'))
+            if end <= self._pos:
+                wait = (frames['t'][self._pos] - due) / self.rate
+                time.sleep(min(max(wait, 0.0), timeout))
+                return self._out[:0]
+        else:
+            end = len(frames)
+        end = min(end, self._pos + self.max_batch)
+        n = end - self._pos
+        out = self._out[:n]
+        out[:] = frames[self._pos:end]
+        out['t'] = time.time()
+        self._pos = end
+        return out
+
+
+class UDPSource(FrameSource):
+    """Receives datagrams of packed ``FRAME_DTYPE`` records (see simulator.py)."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 5005, max_batch: int = 256) -> None:
+        super().__init__(max_batch)
+        self.host = host
+        self.port = port
+        self._sock = None
+        self._buf = bytearray(65536)
+        # Frames of the last datagram that did not fit in the previous batch
+        self._leftover = np.zeros(0, FRAME_DTYPE)
+
+    def open(self) -> None:
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def read(self, timeout: float = 0.05) -> np.ndarray:
+        n = min(len(self._leftover), self.max_batch)
+        self._out[:n] = self._leftover[:n]
+        self._leftover = self._leftover[n:]
+        # Frames are already waiting: only drain what else is queued
+        self._sock.settimeout(0 if n else timeout)
+        try:
+            while n < self.max_batch:
+                size = self._sock.recv_into(self._buf)
+                frames = np.frombuffer(self._buf, FRAME_DTYPE, size // FRAME_DTYPE.itemsize)
+                count = min(len(frames), self.max_batch - n)
+                self._out[n:n + count] = frames[:count]
+                n += count
+                if count < len(frames):
+                    # The next recv reuses the buffer; keep the rest for the next batch
+                    self._leftover = frames[count:].copy()
+                    break
+                self._sock.settimeout(0)
+        except (socket.timeout, BlockingIOError):
+            pass
+        return self._out[:n]
+
+
+def simulate_frames(t: np.ndarray) -> np.ndarray:
+    """Synthetic drive cycle: speed, power and state-of-charge frames at times ``t``."""
+    speed = np.clip(35 + 30 * np.sin(t / 20.0) + 8 * np.sin(t / 3.1), 0, None)
+    accel = 30 / 20.0 * np.cos(t / 20.0) + 8 / 3.1 * np.cos(t / 3.1)
+    power = 120 * speed + 900 * accel + 0.08 * speed ** 2 * speed
+    soc = np.clip(80 - (t % 36000) / 450.0, 5, 100)
+
+    frames = np.zeros(len(t) * 3, FRAME_DTYPE)
+    frames['t'] = np.repeat(t, 3)
+    frames['dlc'] = 8
+    speed_f, power_f, soc_f = frames[0::3], frames[1::3], frames[2::3]
+    speed_f['id'] = SIM_SPEED_ID
+    speed_f['data'][:, :2] = np.round(speed / 0.01).astype('<u2').view(np.uint8).reshape(-1, 2)
+    power_f['id'] = SIM_POWER_ID
+    power_f['data'][:, :4] = np.round(power).astype('<i4').view(np.uint8).reshape(-1, 4)
+    soc_f['id'] = SIM_SOC_ID
+    soc_f['data'][:, 0] = np.round(soc / 0.5).astype(np.uint8)
+    return frames
+
+
+class SimulatedSource(FrameSource):
+    """In-process stand-in for a vehicle: the simulator drive cycle at ``rate_hz``."""
+
+    def __init__(self, rate_hz: float = 200.0, max_batch: int = 256) -> None:
+        super().__init__(max_batch)
+        self.rate_hz = rate_hz
+        self._next = 0.0
+
+    def open(self) -> None:
+        self._next = time.time()
+
+    def read(self, timeout: float = 0.05) -> np.ndarray:
+        time.sleep(timeout)
+        now = time.time()
+        steps = min(int((now - self._next) * self.rate_hz), self.max_batch // 3)
+        if steps <= 0:
+            return self._out[:0]
+        t = self._next + np.arange(steps) / self.rate_hz
+        self._next += steps / self.rate_hz
+        frames = simulate_frames(t)
+        out = self._out[:len(frames)]
+        out[:] = frames
+        return out
+
+
+def source_from_spec(spec: str) -> Optional[FrameSource]:
+    """Build a source from a PUDDLE_TELEMETRY style spec.
+
+    ``socketcan:can0``, ``slcan:/dev/ttyACM0[@115200]``,
+    ``replay:trip.log[@rate]`` (a candump log, or a recorded ``.ptlog``;
+    rate ``max`` replays as fast as possible), ``udp:[host:]port`` or
+    ``sim[:rate_hz]``.
+    An empty spec means telemetry is off.
+    """
+    spec = (spec or '').strip()
+    if not spec:
+        return None
+    kind, _, arg = spec.partition(':')
+    kind = kind.lower()
+    if kind == 'socketcan':
+        return SocketCANSource(arg or 'can0')
+    if kind == 'slcan':
+        port, _, baud = arg.partition('@')
+        return SLCANSource(port, int(baud or 115200))
+    if kind == 'replay':
+        path, _, rate = arg.rpartition('@') if '@' in arg else (arg, '', '')
+        path = os.path.expanduser(path)
+        rate = 0.0 if rate == 'max' else float(rate or 1.0)
+        if path.endswith('.ptlog'):
+            from src.telemetry.recorder import LogReplaySource
+            return LogReplaySource(path, rate=rate)
+        return ReplaySource.from_candump(path, rate=rate)
+    if kind == 'udp':
+        host, _, port = arg.rpartition(':')
+        return UDPSource(host or '0.0.0.0', int(port or 5005))
+    if kind == 'sim':
+        return SimulatedSource(float(arg or 200.0))
+    raise ValueError(f"Unknown telemetry source: {spec}")
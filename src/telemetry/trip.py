@@ -0,0 +1,199 @@
+"""Trip computer: running aggregates over the decoded telemetry stream.
+
+Everything here is updated batch by batch on the telemetry thread with a
+few NumPy operations per batch and constant state, so the cost does not
+grow with trip length and history is never rescanned.
+"""
+import math
+import os
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+# Samples further apart than this are a gap in the feed, not a segment
+MAX_GAP = 2.0
+# Below this speed the car counts as idle
+IDLE_SPEED = 0.5  # mph
+# Rolling efficiency covers the last few minutes of driving
+WINDOW_SECONDS = 600
+WINDOW_BIN_SECONDS = 5
+
+
+class RunningStats:
+    """Mean and variance with Welford's algorithm, merged a batch at a time.
+
+    Each batch is reduced with NumPy and folded into the running state
+    with Chan's parallel update, which is exact and numerically stable.
+    """
+
+    __slots__ = ('count', 'mean', '_m2', 'min', 'max')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values: np.ndarray) -> None:
+        n = len(values)
+        if n == 0:
+            return
+        mean = float(values.mean(dtype=np.float64))
+        m2 = float(((values - mean) ** 2).sum(dtype=np.float64))
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self._m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class WindowedSum:
+    """Sum of values over the last ``seconds``, kept in fixed time bins.
+
+    A ring of bins holds per-bin totals and a running total is adjusted as
+    bins enter and leave the window, so adding is O(1) per bin touched.
+    """
+
+    def __init__(self, seconds: float = WINDOW_SECONDS, bin_seconds: float = WINDOW_BIN_SECONDS) -> None:
+        self.bin_seconds = bin_seconds
+        self._bins = np.zeros(max(1, int(round(seconds / bin_seconds))))
+        self._head = None  # absolute index of the newest bin
+        self.total = 0.0
+
+    def _advance(self, head: int) -> None:
+        if self._head is None:
+            self._head = head
+            return
+        n = len(self._bins)
+        if head - self._head >= n:
+            self._bins[:] = 0.0
+            self.total = 0.0
+        else:
+            for b in range(self._head + 1, head + 1):
+                self.total -= self._bins[b % n]
+                self._bins[b % n] = 0.0
+        self._head = head
+
+    def add(self, t: np.ndarray, values: np.ndarray) -> None:
+        if len(t) == 0:
+            return
+        bins = (t // self.bin_seconds).astype(np.int64)
+        newest = int(bins[-1])
+        if self._head is None or newest > self._head:
+            self._advance(newest)
+        n = len(self._bins)
+        keep = bins > self._head - n
+        if not keep.all():
+            bins, values = bins[keep], values[keep]
+        np.add.at(self._bins, bins % n, values)
+        self.total += float(values.sum())
+
+
+class _Integrator:
+    """Trapezoidal integral of one channel, continued across batches."""
+
+    __slots__ = ('last_t', 'last_v')
+
+    def __init__(self) -> None:
+        self.last_t = None
+        self.last_v = None
+
+    def segments(self, t: np.ndarray, v: np.ndarray):
+        """``(end times, durations, start values, end values)`` of the new segments."""
+        if self.last_t is not None:
+            t = np.concatenate(([self.last_t], t))
+            v = np.concatenate(([self.last_v], v))
+        self.last_t, self.last_v = float(t[-1]), float(v[-1])
+        dt = np.diff(t)
+        valid = (dt > 0) & (dt <= MAX_GAP)
+        return t[1:][valid], dt[valid], v[:-1][valid], v[1:][valid]
+
+
+class TripComputer:
+    """Distance, averages, energy use and range for the current trip.
+
+    Attach it to a ``TelemetryEngine`` and it updates from the ``speed``
+    (mph), ``power`` (W) and ``soc`` (%) channels on the telemetry thread.
+    ``snapshot`` is cheap and safe to call from the UI thread.
+    """
+
+    def __init__(self, battery_kwh: Optional[float] = None) -> None:
+        self.battery_kwh = battery_kwh if battery_kwh is not None else \
+            float(os.getenv("PUDDLE_BATTERY_KWH", "75"))
+        self._lock = threading.Lock()
+        self._speed = _Integrator()
+        self._power = _Integrator()
+        self.speed_stats = RunningStats()   # while moving
+        self.distance_mi = 0.0
+        self.moving_s = 0.0
+        self.idle_s = 0.0
+        self.energy_wh = 0.0
+        self.soc = None
+        self._window_mi = WindowedSum()
+        self._window_wh = WindowedSum()
+
+    def attach(self, engine) -> None:
+        engine.add_channel_listener(self.on_samples)
+
+    def on_samples(self, name: str, t: np.ndarray, v: np.ndarray) -> None:
+        if name == 'speed':
+            self._on_speed(t, v)
+        elif name == 'power':
+            self._on_power(t, v)
+        elif name == 'soc' and len(v):
+            self.soc = float(v[-1])
+
+    def _on_speed(self, t, v):
+        end, dt, v0, v1 = self._speed.segments(t, v)
+        miles = (v0 + v1) * 0.5 * dt / 3600.0
+        idle = (v0 < IDLE_SPEED) & (v1 < IDLE_SPEED)
+        moving = v[v >= IDLE_SPEED]
+        with self._lock:
+            self.distance_mi += float(miles.sum())
+            idle_s = float(dt[idle].sum())
+            self.idle_s += idle_s
+            self.moving_s += float(dt.sum()) - idle_s
+            self.speed_stats.update(moving)
+            self._window_mi.add(end, miles)
+
+    def _on_power(self, t, v):
+        end, dt, v0, v1 = self._power.segments(t, v)
+        wh = (v0 + v1) * 0.5 * dt / 3600.0
+        with self._lock:
+            self.energy_wh += float(wh.sum())
+            self._window_wh.add(end, wh)
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        with self._lock:
+            distance = self.distance_mi
+            window_mi, window_wh = self._window_mi.total, self._window_wh.total
+            snap = {
+                'distance_mi': distance,
+                'moving_s': self.moving_s,
+                'idle_s': self.idle_s,
+                'avg_speed': distance / (self.moving_s / 3600.0) if self.moving_s > 0 else None,
+                'speed_std': self.speed_stats.std if self.speed_stats.count > 1 else None,
+                'max_speed': self.speed_stats.max if self.speed_stats.count else None,
+                'energy_wh': self.energy_wh,
+                'wh_per_mi': self.energy_wh / distance if distance > 0.01 else None,
+                'recent_wh_per_mi': window_wh / window_mi if window_mi > 0.01 else None,
+                'soc': self.soc,
+            }
+        efficiency = snap['recent_wh_per_mi'] or snap['wh_per_mi']
+        if self.soc is not None and efficiency and efficiency > 0:
+            snap['range_mi'] = self.soc / 100.0 * self.battery_kwh * 1000.0 / efficiency
+        else:
+            snap['range_mi'] = None
+        return snap
@@ -0,0 +1,248 @@
+"""Download the map tiles along the active route before we get there.
+
+The route polyline is resampled every half tile, widened by a buffer and
+turned into the set of tiles it touches at the minimap's zoom levels,
+nearest first along the route. A couple of worker threads fetch what the
+tile store does not have yet. They step aside whenever the map itself is
+waiting for a download, and on a metered connection they only fetch the
+next stretch of the route until an unmetered one is available.
+
+Bulk downloading is against the usage policy of the public OpenStreetMap
+tile servers, so prefetching is off unless ``$PUDDLE_PREFETCH_TILES=1``
+and the layer points at a server that allows it (``$PUDDLE_TILE_URL``).
+"""
+import math
+import os
+import threading
+import time
+import urllib.parse
+from collections import deque
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.tile_store import TILE_LAYERS, TileStore, tile_store
+
+EARTH_RADIUS_M = 6371000.0
+# Zoom levels the minimap shows (it follows the car at 16)
+PREFETCH_ZOOMS = (14, 15, 16)
+BUFFER_M = 300.0
+WORKERS = 2
+# Background downloads pause this long after the map fetched a tile itself
+FOREGROUND_QUIET = 1.0
+# On a metered connection only this many tiles ahead are fetched
+METERED_BUDGET = 150
+METERED_RECHECK = 30.0
+# Keep a route's worth modest even on servers that allow bulk downloads
+MAX_TILES = 3000
+# Tile servers whose usage policy forbids prefetching
+NO_BULK_HOSTS = ('tile.openstreetmap.org',)
+
+
+def tile_xy(lat: np.ndarray, lng: np.ndarray, z: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Fractional Web Mercator tile coordinates."""
+    n = 1 << z
+    lat = np.radians(np.clip(lat, -85.0511, 85.0511))
+    x = (np.asarray(lng) + 180.0) / 360.0 * n
+    y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / math.pi) / 2.0 * n
+    return x, y
+
+
+def corridor_tiles(points: Sequence[Tuple[float, float]], zooms: Sequence[int] = PREFETCH_ZOOMS,
+                   buffer_m: float = BUFFER_M) -> List[Tuple[int, int, int]]:
+    """``(z, x, y)`` of every tile within ``buffer_m`` of the route, nearest first.
+
+    Tiles are ordered by the distance along the route at which they are
+    first needed; at equal distance lower zooms come first.
+    """
+    pts = np.asarray(points, np.float64).reshape(-1, 2)
+    if len(pts) == 0:
+        return []
+    lat, lng = np.radians(pts[:, 0]), np.radians(pts[:, 1])
+    dx = np.diff(lng) * np.cos((lat[1:] + lat[:-1]) / 2)
+    along = np.concatenate(([0.0], np.cumsum(EARTH_RADIUS_M * np.hypot(dx, np.diff(lat)))))
+    mean_cos = max(math.cos(float(lat.mean())), 1e-6)
+
+    dist, zs, xs, ys = [], [], [], []
+    for z in zooms:
+        n = 1 << z
+        tile_m = 2 * math.pi * EARTH_RADIUS_M * mean_cos / n
+        # Samples every half tile, so no tile under the route is skipped
+        d = np.append(np.arange(0.0, along[-1], tile_m / 2), along[-1])
+        fx, fy = tile_xy(np.interp(d, along, pts[:, 0]), np.interp(d, along, pts[:, 1]), z)
+        r = buffer_m / tile_m
+        width = int(math.ceil(2 * r)) + 1
+        offsets = np.arange(width + 1)
+        x0, y0 = np.floor(fx - r).astype(np.int64), np.floor(fy - r).astype(np.int64)
+        x1, y1 = np.floor(fx + r).astype(np.int64), np.floor(fy + r).astype(np.int64)
+        gx = x0[:, None, None] + offsets[None, :, None]
+        gy = y0[:, None, None] + offsets[None, None, :]
+        keep = (gx <= x1[:, None, None]) & (gy <= y1[:, None, None]) & (gy >= 0) & (gy < n)
+        gd = np.broadcast_to(d[:, None, None], keep.shape)[keep]
+        gx, gy = (np.broadcast_to(gx, keep.shape)[keep] % n), np.broadcast_to(gy, keep.shape)[keep]
+        # Samples are in route order, so the first occurrence is the nearest
+        _, first = np.unique(gx * n + gy, return_index=True)
+        dist.append(gd[first])
+        zs.append(np.full(len(first), z))
+        xs.append(gx[first])
+        ys.append(gy[first])
+    dist, zs, xs, ys = (np.concatenate(a) for a in (dist, zs, xs, ys))
+    order = np.lexsort((zs, dist))
+    return list(zip(zs[order].tolist(), xs[order].tolist(), ys[order].tolist()))
+
+
+def network_is_metered() -> bool:
+    """``$PUDDLE_METERED`` if set, otherwise NetworkManager's guess (False if unknown)."""
+    override = os.getenv("PUDDLE_METERED")
+    if override is not None:
+        return override == "1"
+    try:
+        from PyQt5.QtDBus import QDBusConnection, QDBusInterface
+        nm = QDBusInterface("org.freedesktop.NetworkManager", "/org/freedesktop/NetworkManager",
+                            "org.freedesktop.NetworkManager", QDBusConnection.systemBus())
+        # NM_METERED_YES = 1, NM_METERED_GUESS_YES = 3
+        return nm.isValid() and nm.property("Metered") in (1, 3)
+    except Exception:
+        return False
+
+
+def prefetch_allowed(layer: str) -> bool:
+    """``$PUDDLE_PREFETCH_TILES=1`` and the layer's server is not one that forbids it."""
+    url = TILE_LAYERS.get(layer)
+    if url is None or os.getenv("PUDDLE_PREFETCH_TILES", "0") != "1":
+        return False
+    host = urllib.parse.urlsplit(url).hostname or ''
+    return not any(host == h or host.endswith('.' + h) for h in NO_BULK_HOSTS)
+
+
+class TilePrefetcher:
+    """Fetches the tiles of the current route corridor in the background.
+
+    ``refresh_metered`` asks the network whether it is metered and is called
+    from the UI thread (``set_route`` and a timer); the workers only read
+    the cached answer.
+    """
+
+    def __init__(self, store: Optional[TileStore] = None, layer: str = 'osm',
+                 zooms: Sequence[int] = PREFETCH_ZOOMS, workers: int = WORKERS,
+                 metered: Callable[[], bool] = network_is_metered,
+                 enabled: Optional[bool] = None) -> None:
+        self.store = store or tile_store()
+        self.layer = layer
+        self.zooms = tuple(zooms)
+        self.workers = workers
+        self.enabled = prefetch_allowed(layer) if enabled is None else enabled
+        self._metered = metered
+        self.metered = False
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._generation = 0
+        self._taken = 0          # tiles handed to workers for the current route
+        self._threads = []
+        self._stopped = False
+        self.stats = {'queued': 0, 'fetched': 0, 'present': 0, 'failed': 0}
+
+    def set_route(self, points: Sequence[Tuple[float, float]]) -> int:
+        """Replace the corridor with the one around ``points``; returns the tile count."""
+        if not self.enabled:
+            return 0
+        tiles = corridor_tiles(points, self.zooms)[:MAX_TILES]
+        self.refresh_metered()
+        with self._cond:
+            self._generation += 1
+            self._queue = deque(tiles)
+            self._taken = 0
+            self.stats['queued'] = len(tiles)
+            self._cond.notify_all()
+        self._start()
+        return len(tiles)
+
+    def clear(self) -> None:
+        self.set_route([])
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def stop(self, timeout: float = 2.0) -> None:
+        with self._cond:
+            self._stopped = True
+            self._queue.clear()
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _start(self) -> None:
+        if self._threads:
+            return
+        self._stopped = False
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'tile-prefetch-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def refresh_metered(self) -> None:
+        """Re-check the connection; may block on D-Bus, so never called with the lock held."""
+        if not self.enabled:
+            return
+        metered = bool(self._metered())
+        if metered != self.metered:
+            with self._cond:
+                self.metered = metered
+                # Workers held back by the metered budget may go on
+                self._cond.notify_all()
+
+    def _next(self):
+        with self._cond:
+            while True:
+                if self._stopped:
+                    return None
+                if self._queue and not (self._taken >= METERED_BUDGET and self.metered):
+                    self._taken += 1
+                    return self._generation, self._queue.popleft()
+                # Nothing to do, or waiting for an unmetered connection
+                self._cond.wait()
+
+    def _run(self) -> None:
+        while True:
+            item = self._next()
+            if item is None:
+                return
+            generation, (z, x, y) = item
+            store = self.store
+            # Never compete with tiles the map is waiting for
+            while time.monotonic() - store.foreground_at < FOREGROUND_QUIET and not self._stopped:
+                time.sleep(0.2)
+            if generation != self._generation or self._stopped:
+                continue
+            if store.has_tile(self.layer, z, x, y):
+                outcome = 'present'
+            elif store.fetch_tile(self.layer, z, x, y, background=True) is not None:
+                outcome = 'fetched'
+            else:
+                outcome = 'failed'
+            with self._cond:
+                self.stats[outcome] += 1
+
+
+_prefetcher: Optional[TilePrefetcher] = None
+
+
+def tile_prefetcher() -> TilePrefetcher:
+    """The shared prefetcher for the minimap tile layer, created on first use."""
+    global _prefetcher
+    if _prefetcher is None:
+        _prefetcher = TilePrefetcher()
+        if not _prefetcher.enabled:
+            print("Tile prefetch off: set PUDDLE_TILE_URL to a server that allows it "
+                  "and PUDDLE_PREFETCH_TILES=1")
+    return _prefetcher
+
+
+def stop_tile_prefetcher() -> None:
+    """Stop the shared prefetcher, if it was ever started."""
+    global _prefetcher
+    if _prefetcher is not None:
+        _prefetcher.stop()
+        _prefetcher = None
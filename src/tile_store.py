@@ -0,0 +1,332 @@
+"""Map tiles and map assets for the minimap, kept on the device.
+
+Lookups go to offline MBTiles files first, then to an LRU cache of
+everything fetched before, and only then to the network. MBTiles files
+are opened read-only with one shared, memory-mapped SQLite connection
+each. The cache is write-back: fetched tiles are served from memory at
+once and written to disk in batches by a background thread, together
+with the access times that drive eviction.
+"""
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from src.app_paths import CACHE_DIR
+
+USER_AGENT = "Puddle/1.0 (car dashboard)"
+
+OSM_TILE_URL = 'https://tile.openstreetmap.org/{z}/{x}/{y}.png'
+# layer -> upstream URL template; $PUDDLE_TILE_URL points the minimap at another server
+TILE_LAYERS = {
+    'osm': os.getenv("PUDDLE_TILE_URL") or OSM_TILE_URL,
+}
+# name -> upstream URL; files of the same name in ASSET_DIR take precedence
+ASSETS = {
+    'leaflet.js': 'https://unpkg.com/leaflet@1.9.4/dist/leaflet.js',
+    'leaflet.css': 'https://unpkg.com/leaflet@1.9.4/dist/leaflet.css',
+}
+ASSET_DIR = os.path.join(os.path.dirname(__file__), 'web_embed', 'maps', 'leaflet')
+
+MIME_TYPES = {
+    'png': 'image/png', 'jpg': 'image/jpeg', 'jpeg': 'image/jpeg', 'webp': 'image/webp',
+    'pbf': 'application/x-protobuf', 'js': 'application/javascript', 'css': 'text/css',
+}
+
+FETCH_TIMEOUT = 10.0
+
+
+def mime_type(name: str) -> str:
+    return MIME_TYPES.get(name.rsplit('.', 1)[-1].lower(), 'application/octet-stream')
+
+
+def http_get(url: str, timeout: float = FETCH_TIMEOUT) -> bytes:
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.read()
+
+
+class MBTiles:
+    """One MBTiles file, read-only; safe to share between threads."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        uri = f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro&immutable=1"
+        self._db = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        # Let SQLite read pages straight from a memory map of the file
+        self._db.execute("PRAGMA mmap_size=268435456")
+        self._lock = threading.Lock()
+        metadata = dict(self._db.execute("SELECT name, value FROM metadata").fetchall())
+        self.format = metadata.get('format', 'png')
+        self.min_zoom = int(metadata.get('minzoom', 0))
+        self.max_zoom = int(metadata.get('maxzoom', 22))
+
+    def get(self, z: int, x: int, y: int) -> Optional[bytes]:
+        if not self.min_zoom <= z <= self.max_zoom:
+            return None
+        # MBTiles rows count from the bottom (TMS)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT tile_data FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                (z, x, (1 << z) - 1 - y)).fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class TileCache:
+    """Size-bounded LRU of files under ``root``, written back in batches."""
+
+    def __init__(self, root: str, max_bytes: int, flush_interval: float = 2.0) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index: 'OrderedDict[str, int]' = OrderedDict()   # key -> size, oldest first
+        self._pending: Dict[str, bytes] = {}
+        self._touched = set()
+        self.total_bytes = 0
+        self._load_index()
+        self._wake = threading.Event()
+        self._closed = False
+        self._writer = None
+
+    def _load_index(self) -> None:
+        entries = []
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(dirpath, name)
+                st = os.stat(path)
+                entries.append((st.st_mtime, os.path.relpath(path, self.root).replace(os.sep, '/'), st.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self.total_bytes += size
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if key not in self._index:
+                return None
+            self._index.move_to_end(key)
+            data = self._pending.get(key)
+            if data is not None:
+                return data
+            self._touched.add(key)
+        try:
+            with open(os.path.join(self.root, key), 'rb') as f:
+                return f.read()
+        except OSError:
+            with self._lock:
+                size = self._index.pop(key, None)
+                if size is not None:
+                    self.total_bytes -= size
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        with self._lock:
+            old = self._index.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old
+            self._index[key] = len(data)
+            self._pending[key] = data
+            self.total_bytes += len(data)
+            evicted = self._evict()
+        for key in evicted:
+            try:
+                os.remove(os.path.join(self.root, key))
+            except OSError:
+                pass
+        self._start_writer()
+
+    def _evict(self):
+        evicted = []
+        while self.total_bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self.total_bytes -= size
+            self._touched.discard(key)
+            if self._pending.pop(key, None) is None:
+                evicted.append(key)
+        return evicted
+
+    def _start_writer(self) -> None:
+        if self._writer is None and not self._closed:
+            self._writer = threading.Thread(target=self._write_loop, name='tile-cache', daemon=True)
+            self._writer.start()
+
+    def _write_loop(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """Write pending tiles and recorded accesses to disk."""
+        with self._lock:
+            pending = dict(self._pending)
+            touched, self._touched = self._touched, set()
+        for key, data in pending.items():
+            path = os.path.join(self.root, key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path + '.tmp', 'wb') as f:
+                    f.write(data)
+                os.replace(path + '.tmp', path)
+            except OSError as e:
+                print(f"Tile cache write failed: {e}")
+        # Tiles stay readable from memory until they are on disk
+        orphans = []
+        with self._lock:
+            for key, data in pending.items():
+                if self._pending.get(key) is data:
+                    del self._pending[key]
+                if key not in self._index:
+                    orphans.append(key)   # evicted while being written
+        for key in orphans:
+            try:
+                os.remove(os.path.join(self.root, key))
+            except OSError:
+                pass
+        # Access times live in the file mtimes so the LRU order survives restarts
+        now = time.time()
+        for key in touched - set(pending):
+            try:
+                os.utime(os.path.join(self.root, key), (now, now))
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake.set()
+        if self._writer is not None:
+            self._writer.join(5)
+            self._writer = None
+        self.flush()
+
+
+class TileStore:
+    """Tiles and assets from MBTiles, the cache or the network, in that order.
+
+    ``local_*`` never touch the network and are meant for the UI thread;
+    ``fetch_*`` download a miss into the cache and belong on a worker.
+    """
+
+    def __init__(self, cache: TileCache, mbtiles: Optional[Dict[str, list]] = None,
+                 online: bool = True, fetch: Callable[[str], bytes] = http_get) -> None:
+        self.cache = cache
+        self.mbtiles = mbtiles or {}
+        self.online = online
+        self._fetch = fetch
+        self.stats = {'mbtiles': 0, 'cache': 0, 'fetched': 0, 'failed': 0}
+        # When the page last had to wait for a download; background work backs off
+        self.foreground_at = 0.0
+
+    @staticmethod
+    def tile_key(layer: str, z: int, x: int, y: int) -> str:
+        return f"{layer}/{z}/{x}/{y}"
+
+    def local_tile(self, layer: str, z: int, x: int, y: int) -> Optional[Tuple[bytes, str]]:
+        for tiles in self.mbtiles.get(layer, ()):
+            data = tiles.get(z, x, y)
+            if data is not None:
+                self.stats['mbtiles'] += 1
+                return data, mime_type(tiles.format)
+        data = self.cache.get(self.tile_key(layer, z, x, y))
+        if data is not None:
+            self.stats['cache'] += 1
+            return data, mime_type(TILE_LAYERS.get(layer, 'png'))
+        return None
+
+    def has_tile(self, layer: str, z: int, x: int, y: int) -> bool:
+        return self.tile_key(layer, z, x, y) in self.cache or \
+            any(t.get(z, x, y) is not None for t in self.mbtiles.get(layer, ()))
+
+    def fetch_tile(self, layer: str, z: int, x: int, y: int,
+                   background: bool = False) -> Optional[Tuple[bytes, str]]:
+        url = TILE_LAYERS.get(layer)
+        if url is None or not self.online:
+            return None
+        if not background:
+            self.foreground_at = time.monotonic()
+        return self._download(url.format(z=z, x=x, y=y), self.tile_key(layer, z, x, y))
+
+    def tile(self, layer: str, z: int, x: int, y: int) -> Optional[Tuple[bytes, str]]:
+        return self.local_tile(layer, z, x, y) or self.fetch_tile(layer, z, x, y)
+
+    def local_asset(self, name: str) -> Optional[Tuple[bytes, str]]:
+        if name not in ASSETS:
+            return None
+        path = os.path.join(ASSET_DIR, name)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                return f.read(), mime_type(name)
+        data = self.cache.get(f"assets/{name}")
+        return (data, mime_type(name)) if data is not None else None
+
+    def fetch_asset(self, name: str) -> Optional[Tuple[bytes, str]]:
+        if name not in ASSETS or not self.online:
+            return None
+        return self._download(ASSETS[name], f"assets/{name}")
+
+    def _download(self, url: str, key: str) -> Optional[Tuple[bytes, str]]:
+        try:
+            data = self._fetch(url)
+        except Exception as e:
+            self.stats['failed'] += 1
+            print(f"Tile fetch failed for {url}: {e}")
+            return None
+        self.stats['fetched'] += 1
+        self.cache.put(key, data)
+        return data, mime_type(url)
+
+    def close(self) -> None:
+        self.cache.close()
+        for files in self.mbtiles.values():
+            for tiles in files:
+                tiles.close()
+
+
+def _open_mbtiles(spec: str) -> Dict[str, list]:
+    """``$PUDDLE_MBTILES``: paths separated by os.pathsep, each optionally ``layer=path``."""
+    layers: Dict[str, list] = {}
+    for entry in filter(None, spec.split(os.pathsep)):
+        layer, _, path = entry.rpartition('=')
+        try:
+            layers.setdefault(layer or 'osm', []).append(MBTiles(os.path.expanduser(path)))
+        except sqlite3.Error as e:
+            print(f"Ignoring MBTiles file {path}: {e}")
+    return layers
+
+
+_store: Optional[TileStore] = None
+
+
+def tile_store() -> TileStore:
+    """The shared tile store, created on first use."""
+    global _store
+    if _store is None:
+        cache = TileCache(os.path.join(CACHE_DIR, 'tiles'),
+                          int(float(os.getenv("PUDDLE_TILE_CACHE_MB", "512")) * 1024 * 1024))
+        _store = TileStore(cache, _open_mbtiles(os.getenv("PUDDLE_MBTILES", "")),
+                           online=os.getenv("PUDDLE_TILES_OFFLINE", "0") != "1")
+    return _store
+
+
+def close_tile_store() -> None:
+    """Flush and close the shared store, if it was ever opened."""
+    global _store
+    if _store is not None:
+        _store.close()
+        _store = None
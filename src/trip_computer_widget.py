@@ -0,0 +1,76 @@
+from PyQt5.QtWidgets import QWidget, QGridLayout, QVBoxLayout, QLabel
+from PyQt5.QtCore import Qt, QTimer
+from src.style import theme
+
+REFRESH_MS = 1000
+
+# (snapshot key, caption, format)
+TILES = [
+    ('distance_mi', 'TRIP', '{:.1f} mi'),
+    ('avg_speed', 'AVG', '{:.0f} mph'),
+    ('recent_wh_per_mi', 'WH/MI', '{:.0f}'),
+    ('range_mi', 'RANGE', '{:.0f} mi'),
+]
+
+
+def _tile(caption):
+    box = QWidget()
+    layout = QVBoxLayout(box)
+    layout.setContentsMargins(0, 0, 0, 0)
+    layout.setSpacing(0)
+    value = QLabel('--')
+    value.setAlignment(Qt.AlignCenter)
+    value.setStyleSheet(f"color: {theme.COLOR_TEXT}; font-family: {theme.FONT_FAMILY_BOLD}; font-size: 18px;")
+    label = QLabel(caption)
+    label.setAlignment(Qt.AlignCenter)
+    label.setStyleSheet(f"color: {theme.COLOR_TEXT_MUTED}; font-family: {theme.FONT_FAMILY_REGULAR}; font-size: 11px;")
+    layout.addWidget(value)
+    layout.addWidget(label)
+    return box, value
+
+
+class TripComputerWidget(QWidget):
+    """Trip distance, average speed, recent efficiency and range.
+
+    Reads a ``TripComputer`` snapshot once a second; nothing here runs per
+    telemetry sample.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.trip = None
+        self.setStyleSheet("background-color: transparent;")
+        layout = QGridLayout(self)
+        layout.setContentsMargins(0, 4, 0, 4)
+        layout.setSpacing(6)
+        self.values = {}
+        for i, (key, caption, _) in enumerate(TILES):
+            box, value = _tile(caption)
+            self.values[key] = value
+            layout.addWidget(box, i // 2, i % 2)
+        self.idle_label = QLabel('')
+        self.idle_label.setAlignment(Qt.AlignCenter)
+        self.idle_label.setStyleSheet(f"color: {theme.COLOR_TEXT_MUTED}; font-family: {theme.FONT_FAMILY_REGULAR}; font-size: 11px;")
+        layout.addWidget(self.idle_label, 2, 0, 1, 2)
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def bind(self, trip):
+        """Start showing ``trip``; the widget stays hidden without telemetry."""
+        self.trip = trip
+        self.refresh()
+        self._timer.start(REFRESH_MS)
+        self.show()
+
+    def refresh(self):
+        if self.trip is None:
+            return
+        snap = self.trip.snapshot()
+        for key, _, fmt in TILES:
+            value = snap.get(key)
+            if value is None and key == 'recent_wh_per_mi':
+                value = snap.get('wh_per_mi')
+            self.values[key].setText('--' if value is None else fmt.format(value))
+        idle = int(snap['idle_s'])
+        self.idle_label.setText(f"IDLE {idle // 60}:{idle % 60:02d}" if idle else '')
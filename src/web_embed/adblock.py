@@ -1,26 +1,76 @@
-from PyQt5.QtWebEngineCore import QWebEngineUrlRequestInterceptor
-from PyQt5.QtCore import QTimer
+import os
+from PyQt5.QtWebEngineCore import QWebEngineUrlRequestInterceptor, QWebEngineUrlRequestInfo
+from PyQt5.QtWebEngineWidgets import QWebEngineScript
+from src.app_paths import CACHE_DIR
+from src.web_embed.scripts import script_registry
+from src.web_embed.adblock_engine import (
+    load_filter_lists, TYPE_DOCUMENT, TYPE_SUBDOCUMENT, TYPE_STYLESHEET, TYPE_SCRIPT,
+    TYPE_IMAGE, TYPE_FONT, TYPE_OBJECT, TYPE_MEDIA, TYPE_XHR, TYPE_PING, TYPE_OTHER,
+)
+
+
+# Resource types reported by QtWebEngine mapped to ABP type options
+_RESOURCE_TYPES = {
+    'ResourceTypeMainFrame': TYPE_DOCUMENT,
+    'ResourceTypeSubFrame': TYPE_SUBDOCUMENT,
+    'ResourceTypeStylesheet': TYPE_STYLESHEET,
+    'ResourceTypeScript': TYPE_SCRIPT,
+    'ResourceTypeImage': TYPE_IMAGE,
+    'ResourceTypeFontResource': TYPE_FONT,
+    'ResourceTypeObject': TYPE_OBJECT,
+    'ResourceTypeMedia': TYPE_MEDIA,
+    'ResourceTypeWorker': TYPE_SCRIPT,
+    'ResourceTypeSharedWorker': TYPE_SCRIPT,
+    'ResourceTypeServiceWorker': TYPE_SCRIPT,
+    'ResourceTypeFavicon': TYPE_IMAGE,
+    'ResourceTypeXhr': TYPE_XHR,
+    'ResourceTypePing': TYPE_PING,
+    'ResourceTypePluginResource': TYPE_OBJECT,
+}
+_RESOURCE_TYPE_BITS = {
+    getattr(QWebEngineUrlRequestInfo, name): bit
+    for name, bit in _RESOURCE_TYPES.items()
+    if hasattr(QWebEngineUrlRequestInfo, name)
+}
+
+_FILTER_DIR = os.path.join(os.path.dirname(__file__), 'filters')
+_matcher = None
+
+
+def filter_list_paths():
+    """Built-in lists plus any extra lists named in PUDDLE_ADBLOCK_LISTS."""
+    paths = sorted(
+        os.path.join(_FILTER_DIR, name)
+        for name in os.listdir(_FILTER_DIR) if name.endswith('.txt')
+    ) if os.path.isdir(_FILTER_DIR) else []
+    extra = os.getenv('PUDDLE_ADBLOCK_LISTS', '')
+    paths += [p for p in extra.split(os.pathsep) if p]
+    return paths
+
+
+def shared_matcher():
+    """Compiled matcher shared by every interceptor, loaded from the disk cache."""
+    global _matcher
+    if _matcher is None:
+        _matcher = load_filter_lists(filter_list_paths(), os.path.join(CACHE_DIR, 'adblock'))
+    return _matcher
 
 
 class AdblockInterceptor(QWebEngineUrlRequestInterceptor):
-    def __init__(self):
+    def __init__(self, matcher=None):
         super().__init__()
-        self.block_hosts = {
-            'googleads.g.doubleclick.net',
-            'pagead2.googlesyndication.com',
-            'stats.g.doubleclick.net',
-        }
-        self.block_substrings = [
-            '/pagead/', '/adservice', '/ads?', '/api/stats/ads',
-            'doubleclick.net', 'googlesyndication.com',
-        ]
+        self.matcher = matcher or shared_matcher()
 
     def interceptRequest(self, info):
         try:
             u = info.requestUrl()
-            h = u.host().lower()
-            s = u.toString().lower()
-            if h in self.block_hosts or any(x in s for x in self.block_substrings):
+            blocked = self.matcher.should_block(
+                u.toString(),
+                u.host(),
+                info.firstPartyUrl().toString(),
+                _RESOURCE_TYPE_BITS.get(info.resourceType(), TYPE_OTHER),
+            )
+            if blocked:
                 info.block(True)
         except Exception:
             pass
@@ -63,6 +113,14 @@ _YT_JS = r"""
 })();
 """
 
+script_registry.register('youtube-adblock', _YT_JS,
+                         injection_point=QWebEngineScript.DocumentCreation,
+                         world=QWebEngineScript.MainWorld)
+script_registry.register('youtube-adblock-auto',
+                         "if (/youtube/i.test(location.hostname)) " + _YT_JS,
+                         injection_point=QWebEngineScript.DocumentCreation,
+                         world=QWebEngineScript.MainWorld)
+
 
 def enable_adblock(view, target="youtube"):
     try:
@@ -76,54 +134,11 @@ def enable_adblock(view, target="youtube"):
             setter(interceptor)
             setattr(view, "_adblock_interceptor", interceptor)
 
-        def inject():
-            try:
-                p = view.page()
-                u = p.url().toString().lower() if hasattr(p, 'url') else ''
-                host = ''
-                try:
-                    host = p.url().host().lower()
-                except Exception:
-                    pass
-                if target == 'youtube' or ('youtube' in host):
-                    p.runJavaScript(_YT_JS)
-            except Exception:
-                pass
-
-        def schedule():
-            try:
-                inject()
-                for ms in (250, 500, 1000, 2000):
-                    QTimer.singleShot(ms, inject)
-            except Exception:
-                pass
-
-        try:
-            view._adblock_load_cb = lambda ok: ok and schedule()
-            view.loadFinished.connect(view._adblock_load_cb)
-        except Exception:
-            pass
-        try:
-            view._adblock_url_cb = lambda _u: schedule()
-            view.urlChanged.connect(view._adblock_url_cb)
-        except Exception:
-            pass
-        try:
-            view._adblock_start_cb = lambda: schedule()
-            view.loadStarted.connect(view._adblock_start_cb)
-        except Exception:
-            pass
-
-        try:
-            t = getattr(view, '_adblock_timer', None)
-            if t is None:
-                t = QTimer(view)
-                t.setInterval(1500)
-                t.timeout.connect(inject)
-                t.start()
-                setattr(view, '_adblock_timer', t)
-        except Exception:
-            pass
+        # The YouTube script is installed on the page once and QtWebEngine
+        # runs it at document creation on every load, before the player
+        # scripts. Other targets only get it on YouTube hosts.
+        name = 'youtube-adblock' if target == 'youtube' else 'youtube-adblock-auto'
+        script_registry.install(page, name)
 
         setattr(view, "_adblock_enabled", True)
     except Exception:
@@ -0,0 +1,503 @@
+"""Compiled matcher for Adblock Plus / EasyList network filters.
+
+Filter lists are compiled once into a flat binary file:
+
+* ``||domain^`` rules without options go into a domain-suffix trie whose
+  edges are stored as a sorted table of ``(parent, label hash)`` keys.
+* Every other rule is indexed by its longest literal fragment in an
+  Aho-Corasick automaton, so one pass over the URL finds every rule that
+  could match. Only those candidates are checked against their full
+  pattern and options.
+
+All tables are plain arrays, so a compiled list is loaded with ``mmap``
+without parsing anything. Rule text is kept in the file and turned into a
+regex only the first time a rule shows up as a candidate.
+"""
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+ENGINE_VERSION = 2
+_MAGIC = b"PADB"
+_HEADER = struct.Struct("<4sII20s")
+_SECTION = struct.Struct("<QQ")
+
+# Resource type bits, named after the ABP type options
+TYPE_OTHER = 1 << 0
+TYPE_SCRIPT = 1 << 1
+TYPE_IMAGE = 1 << 2
+TYPE_STYLESHEET = 1 << 3
+TYPE_OBJECT = 1 << 4
+TYPE_XHR = 1 << 5
+TYPE_SUBDOCUMENT = 1 << 6
+TYPE_PING = 1 << 7
+TYPE_MEDIA = 1 << 8
+TYPE_FONT = 1 << 9
+TYPE_WEBSOCKET = 1 << 10
+TYPE_DOCUMENT = 1 << 11
+# Rules without type options apply to everything except the page itself
+TYPE_DEFAULT = (TYPE_DOCUMENT << 1) - 1 & ~TYPE_DOCUMENT
+
+_TYPE_OPTIONS = {
+    "other": TYPE_OTHER,
+    "script": TYPE_SCRIPT,
+    "image": TYPE_IMAGE,
+    "stylesheet": TYPE_STYLESHEET,
+    "object": TYPE_OBJECT,
+    "xmlhttprequest": TYPE_XHR,
+    "subdocument": TYPE_SUBDOCUMENT,
+    "ping": TYPE_PING,
+    "media": TYPE_MEDIA,
+    "font": TYPE_FONT,
+    "websocket": TYPE_WEBSOCKET,
+    "document": TYPE_DOCUMENT,
+}
+# Options that do not change which requests a rule matches
+_IGNORED_OPTIONS = {"match-case", "important"}
+
+_TRIE_BLOCK = 1
+_TRIE_ALLOW = 2
+
+_MIN_KEY_LEN = 3
+# Only ``||host^`` with a whole domain goes in the label trie; ``||ads.`` or a
+# rule without ``^`` also matches hosts the trie cannot express
+_DOMAIN_RULE = re.compile(r"\|\|((?:[a-z0-9\-]+\.)*[a-z0-9\-]+)\^")
+_OPTIONS = re.compile(r"^[\w\-~=,|.*]+$")
+_BYTES = [bytes([i]) for i in range(256)]
+
+
+def _label_hash(label: str) -> int:
+    return int.from_bytes(hashlib.blake2b(label.encode("utf-8"), digest_size=5).digest(), "little")
+
+
+def _base_domain(host: str) -> str:
+    parts = host.split(".")
+    return ".".join(parts[-2:]) if len(parts) > 2 else host
+
+
+def _host_of(url: str) -> str:
+    i = url.find("://")
+    if i < 0:
+        return ""
+    host = url[i + 3:]
+    for sep in "/?#":
+        j = host.find(sep)
+        if j >= 0:
+            host = host[:j]
+    host = host.rsplit("@", 1)[-1]
+    return host.split(":", 1)[0]
+
+
+def _domain_matches(host: str, domain: str) -> bool:
+    return host == domain or host.endswith("." + domain)
+
+
+class NetworkRule:
+    """One parsed network filter."""
+
+    __slots__ = ("text", "exception", "pattern", "type_mask", "third_party",
+                 "include_domains", "exclude_domains", "exact", "_regex")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.exception = False
+        self.pattern = ""
+        self.type_mask = TYPE_DEFAULT
+        self.third_party: Optional[bool] = None
+        self.include_domains: Tuple[str, ...] = ()
+        self.exclude_domains: Tuple[str, ...] = ()
+        self.exact = False
+        self._regex = None
+
+    @property
+    def has_options(self) -> bool:
+        return (self.type_mask != TYPE_DEFAULT or self.third_party is not None
+                or bool(self.include_domains) or bool(self.exclude_domains))
+
+    @property
+    def is_document_exception(self) -> bool:
+        return self.exception and bool(self.type_mask & TYPE_DOCUMENT)
+
+    def key(self) -> str:
+        """Longest literal fragment of the pattern, used to index the rule."""
+        body = self.pattern.lstrip("|")
+        return max(re.split(r"[*^|]", body), key=len) if body else ""
+
+    def regex(self):
+        if self._regex is None:
+            p = self.pattern
+            start = end = ""
+            if p.startswith("||"):
+                start = r"^[a-z][a-z0-9+.\-]*:/+(?:[^/?#]*\.)?"
+                p = p[2:]
+            elif p.startswith("|"):
+                start = "^"
+                p = p[1:]
+            if p.endswith("|"):
+                end = "$"
+                p = p[:-1]
+            body = "".join(
+                ".*" if ch == "*" else r"(?:[^\w\-.%]|$)" if ch == "^" else re.escape(ch)
+                for ch in p
+            )
+            self._regex = re.compile(start + body + end)
+        return self._regex
+
+    def matches(self, url: str, host: str, first_party_host: str, resource_type: int) -> bool:
+        """Check options and the full pattern. ``url`` must already be lower-case."""
+        if not self.type_mask & resource_type:
+            return False
+        if self.third_party is not None and first_party_host:
+            third = _base_domain(host) != _base_domain(first_party_host)
+            if third != self.third_party:
+                return False
+        if self.include_domains and not any(_domain_matches(first_party_host, d) for d in self.include_domains):
+            return False
+        if any(_domain_matches(first_party_host, d) for d in self.exclude_domains):
+            return False
+        if self.exact:
+            return self.pattern in url
+        return self.regex().search(url) is not None
+
+
+def parse_rule(line: str) -> Optional[NetworkRule]:
+    """Parse one ABP filter line. Returns None for comments, cosmetic and unsupported rules."""
+    line = line.strip()
+    if not line or line[0] in "![":
+        return None
+    if "##" in line or "#@#" in line or "#?#" in line or "#$#" in line:
+        return None
+    rule = NetworkRule(line)
+    if line.startswith("@@"):
+        rule.exception = True
+        line = line[2:]
+    options = ""
+    i = line.rfind("$")
+    if i >= 0 and _OPTIONS.match(line[i + 1:]):
+        line, options = line[:i], line[i + 1:]
+    if len(line) > 2 and line.startswith("/") and line.endswith("/"):
+        return None  # regex rules are not supported
+    if options:
+        include_types = 0
+        exclude_types = 0
+        for opt in options.lower().split(","):
+            negated = opt.startswith("~")
+            name = opt.lstrip("~")
+            if name in _TYPE_OPTIONS:
+                if negated:
+                    exclude_types |= _TYPE_OPTIONS[name]
+                else:
+                    include_types |= _TYPE_OPTIONS[name]
+            elif name == "third-party":
+                rule.third_party = not negated
+            elif name.startswith("domain="):
+                domains = name[len("domain="):].split("|")
+                rule.include_domains = tuple(d for d in domains if d and not d.startswith("~"))
+                rule.exclude_domains = tuple(d[1:] for d in domains if d.startswith("~"))
+            elif name in _IGNORED_OPTIONS:
+                continue
+            else:
+                return None
+        rule.type_mask = (include_types or TYPE_DEFAULT) & ~exclude_types
+    rule.pattern = line.lower()
+    rule.exact = not rule.has_options and not any(c in rule.pattern for c in "*^|")
+    return rule
+
+
+class _AhoCorasickBuilder:
+    def __init__(self) -> None:
+        self.goto: List[Dict[int, int]] = [{}]
+        self.out: List[List[int]] = [[]]
+
+    def add(self, key: bytes, rule_id: int) -> None:
+        s = 0
+        for c in key:
+            nxt = self.goto[s].get(c)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[s][c] = nxt
+                self.goto.append({})
+                self.out.append([])
+            s = nxt
+        self.out[s].append(rule_id)
+
+    def tables(self):
+        n = len(self.goto)
+        fail = [0] * n
+        dict_link = [0] * n
+        queue = deque(self.goto[0].values())
+        while queue:
+            s = queue.popleft()
+            for c, t in self.goto[s].items():
+                queue.append(t)
+                f = fail[s]
+                while f and c not in self.goto[f]:
+                    f = fail[f]
+                fail[t] = self.goto[f].get(c, 0) if self.goto[f].get(c, 0) != t else 0
+                dict_link[t] = fail[t] if self.out[fail[t]] else dict_link[fail[t]]
+        root = array("I", [0] * 256)
+        for c, t in self.goto[0].items():
+            root[c] = t
+        edge_start = array("I", [0])
+        edge_chars = bytearray()
+        edge_targets = array("I")
+        out_start = array("I", [0])
+        out_rules = array("I")
+        for s in range(n):
+            for c in sorted(self.goto[s]):
+                edge_chars.append(c)
+                edge_targets.append(self.goto[s][c])
+            edge_start.append(len(edge_targets))
+            out_rules.extend(self.out[s])
+            out_start.append(len(out_rules))
+        return (root, edge_start, bytes(edge_chars), edge_targets,
+                array("I", fail), array("I", dict_link), out_start, out_rules)
+
+
+def compile_rules(lines: Iterable[str]) -> bytes:
+    """Compile filter lines into the binary format loaded by :class:`AdblockMatcher`."""
+    trie: List[Dict[str, int]] = [{}]
+    trie_flags = bytearray([0])
+    ac = _AhoCorasickBuilder()
+    generic = array("I")
+    texts: List[bytes] = []
+    seen: Set[str] = set()
+
+    for line in lines:
+        rule = parse_rule(line)
+        if rule is None or rule.text in seen:
+            continue
+        seen.add(rule.text)
+        m = _DOMAIN_RULE.fullmatch(rule.pattern)
+        if m and not rule.has_options:
+            node = 0
+            for label in reversed(m.group(1).split(".")):
+                child = trie[node].get(label)
+                if child is None:
+                    child = len(trie)
+                    trie[node][label] = child
+                    trie.append({})
+                    trie_flags.append(0)
+                node = child
+            trie_flags[node] |= _TRIE_ALLOW if rule.exception else _TRIE_BLOCK
+            continue
+        rule_id = len(texts)
+        texts.append(rule.text.encode("utf-8"))
+        key = rule.key()
+        if len(key) >= _MIN_KEY_LEN:
+            ac.add(key.encode("utf-8"), rule_id)
+        else:
+            generic.append(rule_id)
+
+    edges = sorted(
+        ((parent << 40) | _label_hash(label), child)
+        for parent, children in enumerate(trie)
+        for label, child in children.items()
+    )
+    trie_keys = array("Q", (k for k, _ in edges))
+    trie_children = array("I", (c for _, c in edges))
+    rule_offsets = array("I", [0])
+    for t in texts:
+        rule_offsets.append(rule_offsets[-1] + len(t) + 1)
+    rule_text = b"\n".join(texts) + b"\n" if texts else b""
+
+    sections = [trie_keys, trie_children, bytes(trie_flags), *ac.tables(),
+                generic, rule_offsets, rule_text]
+    blobs = [s.tobytes() if isinstance(s, array) else s for s in sections]
+    header_size = _HEADER.size + _SECTION.size * len(blobs)
+    offset = (header_size + 7) & ~7
+    table = b""
+    body = b""
+    for blob in blobs:
+        table += _SECTION.pack(offset, len(blob))
+        pad = (-len(blob)) % 8
+        body += blob + b"\0" * pad
+        offset += len(blob) + pad
+    header = _HEADER.pack(_MAGIC, ENGINE_VERSION, len(blobs), b"\0" * 20) + table
+    return header + b"\0" * ((-len(header)) % 8) + body
+
+
+class AdblockMatcher:
+    """Read-only matcher over a compiled filter list (bytes or an mmap).
+
+    Instances are immutable apart from the lazily parsed rule cache, so one
+    matcher can be shared by every interceptor and used from QtWebEngine's
+    IO thread.
+    """
+
+    def __init__(self, buffer, _keepalive=None) -> None:
+        self._buffer = buffer
+        self._keepalive = _keepalive
+        magic, version, count, _ = _HEADER.unpack_from(buffer, 0)
+        if magic != _MAGIC or version != ENGINE_VERSION:
+            raise ValueError("not a compiled adblock list for this engine version")
+        mv = memoryview(buffer)
+        sections = []
+        for i in range(count):
+            off, length = _SECTION.unpack_from(buffer, _HEADER.size + i * _SECTION.size)
+            sections.append(mv[off:off + length])
+        (trie_keys, trie_children, trie_flags, root, edge_start, edge_chars,
+         edge_targets, fail, dict_link, out_start, out_rules, generic,
+         rule_offsets, rule_text) = sections
+        self._trie_keys = trie_keys.cast("Q")
+        self._trie_children = trie_children.cast("I")
+        self._trie_flags = trie_flags
+        self._root = root.cast("I")
+        self._edge_start = edge_start.cast("I")
+        # bytes.find() scans the outgoing edges of a state in C
+        self._edge_chars = edge_chars.tobytes()
+        self._edge_targets = edge_targets.cast("I")
+        self._fail = fail.cast("I")
+        self._dict_link = dict_link.cast("I")
+        self._out_start = out_start.cast("I")
+        self._out_rules = out_rules.cast("I")
+        self._generic = frozenset(generic.cast("I"))
+        self._rule_offsets = rule_offsets.cast("I")
+        self._rule_text = rule_text
+        self._rules: Dict[int, Optional[NetworkRule]] = {}
+
+    @classmethod
+    def from_rules(cls, lines: Iterable[str]) -> "AdblockMatcher":
+        return cls(compile_rules(lines))
+
+    @classmethod
+    def load(cls, path: str) -> "AdblockMatcher":
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mm, _keepalive=mm)
+
+    def __len__(self) -> int:
+        return len(self._rule_offsets) - 1 + sum(1 for f in self._trie_flags if f)
+
+    def _rule(self, rule_id: int) -> Optional[NetworkRule]:
+        rule = self._rules.get(rule_id)
+        if rule is None and rule_id not in self._rules:
+            start = self._rule_offsets[rule_id]
+            end = self._rule_offsets[rule_id + 1] - 1
+            rule = parse_rule(bytes(self._rule_text[start:end]).decode("utf-8"))
+            self._rules[rule_id] = rule
+        return rule
+
+    def _host_flags(self, host: str) -> int:
+        keys = self._trie_keys
+        n = len(keys)
+        node = 0
+        flags = 0
+        for label in reversed(host.split(".")):
+            key = (node << 40) | _label_hash(label)
+            i = bisect_left(keys, key)
+            if i == n or keys[i] != key:
+                break
+            node = self._trie_children[i]
+            flags |= self._trie_flags[node]
+        return flags
+
+    def _candidates(self, data: bytes) -> List[int]:
+        root = self._root
+        edge_start = self._edge_start
+        edge_chars = self._edge_chars
+        targets = self._edge_targets
+        fail = self._fail
+        dict_link = self._dict_link
+        out_start = self._out_start
+        out_rules = self._out_rules
+        found = []
+        s = 0
+        for c in data:
+            while True:
+                if s == 0:
+                    s = root[c]
+                    break
+                j = edge_chars.find(_BYTES[c], edge_start[s], edge_start[s + 1])
+                if j >= 0:
+                    s = targets[j]
+                    break
+                s = fail[s]
+            t = s if out_start[s] != out_start[s + 1] else dict_link[s]
+            while t:
+                found.extend(out_rules[out_start[t]:out_start[t + 1]])
+                t = dict_link[t]
+        return found
+
+    def should_block(self, url: str, host: str = "", first_party_url: str = "",
+                     resource_type: int = TYPE_OTHER) -> bool:
+        url = url.lower()
+        host = (host or _host_of(url)).lower()
+        first_party_host = _host_of(first_party_url.lower()) if first_party_url else ""
+
+        host_flags = self._host_flags(host) if host else 0
+        if host_flags & _TRIE_ALLOW:
+            return False
+        blocked = bool(host_flags & _TRIE_BLOCK) and (resource_type & TYPE_DEFAULT) != 0
+        exceptions = []
+        for rule_id in self._generic.union(self._candidates(url.encode("utf-8", "ignore"))):
+            rule = self._rule(rule_id)
+            if rule is None:
+                continue
+            if rule.exception:
+                exceptions.append(rule)
+            elif not blocked and rule.matches(url, host, first_party_host, resource_type):
+                blocked = True
+        if not blocked:
+            return False
+        for rule in exceptions:
+            if not rule.is_document_exception and rule.matches(url, host, first_party_host, resource_type):
+                return False
+        if first_party_url and self._page_allowed(first_party_url.lower(), first_party_host):
+            return False
+        return True
+
+    def _page_allowed(self, page_url: str, page_host: str) -> bool:
+        """True if an ``@@...$document`` rule exempts everything on this page."""
+        for rule_id in self._candidates(page_url.encode("utf-8", "ignore")):
+            rule = self._rule(rule_id)
+            if (rule is not None and rule.is_document_exception
+                    and rule.matches(page_url, page_host, page_host, TYPE_DOCUMENT)):
+                return True
+        return False
+
+
+def _list_digest(paths: Sequence[str]) -> str:
+    h = hashlib.sha1(f"{ENGINE_VERSION}:{sys.byteorder}".encode())
+    for path in paths:
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def load_filter_lists(paths: Sequence[str], cache_dir: str) -> AdblockMatcher:
+    """Return a matcher for ``paths``, compiling them only if the cache is stale.
+
+    The compiled list is cached under ``cache_dir`` keyed by a digest of the
+    list contents, so editing or adding a list triggers one recompile and
+    every later start just maps the cached file.
+    """
+    paths = [p for p in paths if os.path.exists(p)]
+    cache = os.path.join(cache_dir, f"adblock-{_list_digest(paths)}.bin")
+    if os.path.exists(cache):
+        try:
+            return AdblockMatcher.load(cache)
+        except (OSError, ValueError):
+            pass
+
+    def lines():
+        for path in paths:
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                yield from f
+
+    data = compile_rules(lines())
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = cache + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, cache)
+    return AdblockMatcher.load(cache)
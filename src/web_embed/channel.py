@@ -0,0 +1,57 @@
+from PyQt5.QtCore import QFile, QIODevice
+from PyQt5.QtWebChannel import QWebChannel
+from PyQt5.QtWebEngineWidgets import QWebEngineScript
+from src.web_embed.scripts import script_registry
+
+# Bridges run in the application world so page scripts cannot reach them
+CHANNEL_WORLD = QWebEngineScript.ApplicationWorld
+
+# One QWebChannel client per document; qwebchannel.js only supports one per
+# transport. Page scripts get the channel objects with puddleChannel(cb).
+_CHANNEL_JS = r"""
+(function(){
+  if (window.puddleChannel || typeof QWebChannel === 'undefined') return;
+  var objects = null, waiting = [];
+  window.puddleChannel = function(cb){ if (objects) cb(objects); else waiting.push(cb); };
+  new QWebChannel(qt.webChannelTransport, function(channel){
+    objects = channel.objects;
+    waiting.splice(0).forEach(function(cb){ cb(objects); });
+  });
+})();
+"""
+
+
+def _register_qwebchannel_js():
+    if script_registry.is_registered('qwebchannel'):
+        return
+    f = QFile(':/qtwebchannel/qwebchannel.js')
+    source = ''
+    if f.open(QIODevice.ReadOnly):
+        source = bytes(f.readAll()).decode('utf-8')
+        f.close()
+    else:
+        print("qwebchannel.js resource not found; web bridges disabled")
+    script_registry.register('qwebchannel', source,
+                             injection_point=QWebEngineScript.DocumentCreation,
+                             world=CHANNEL_WORLD)
+    script_registry.register('puddle-channel', _CHANNEL_JS,
+                             injection_point=QWebEngineScript.DocumentCreation,
+                             world=CHANNEL_WORLD)
+
+
+def attach_object(page, name, obj):
+    """Expose a QObject to ``page`` as ``channel.objects[name]``.
+
+    Every page gets a single QWebChannel, created on first use, and the
+    qwebchannel.js client is installed once through the script registry.
+    Objects must be attached before the page loads.
+    """
+    channel = getattr(page, '_web_channel', None)
+    if channel is None:
+        channel = QWebChannel(page)
+        page.setWebChannel(channel, CHANNEL_WORLD)
+        page._web_channel = channel
+        _register_qwebchannel_js()
+        script_registry.install(page, 'qwebchannel', 'puddle-channel')
+    channel.registerObject(name, obj)
+    return channel
@@ -3,7 +3,7 @@ from PyQt5.QtCore import Qt, QSize
 from PyQt5.QtGui import QFont
 from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage, QWebEngineSettings, QWebEngineProfile
 from PyQt5.QtCore import QUrl
-from src.keyboard import VirtualKeyboard
+from src.web_embed.keyboard_input import attach_keyboard
 from src.web_embed.adblock import enable_adblock
  
 
@@ -128,10 +128,9 @@ class IntellectualGamesWidget(QWidget):
         enable_adblock(self.web_view, target="auto")
         
         
-        # Add virtual keyboard
-        self.keyboard = VirtualKeyboard(self)
-        self.keyboard.hide()
-        self.keyboard.key_pressed.connect(self.handle_key_press)
+        # Keystrokes go to the view as native input events; the shared
+        # keyboard appears over this widget when an editable element has focus
+        self.keyboard_input = attach_keyboard(self.web_view, self, self.page)
         
         layout.addWidget(self.web_container)
         self.web_container.hide()
@@ -143,44 +142,12 @@ class IntellectualGamesWidget(QWidget):
         for button in self.buttons.values():
             button.hide()
         self.web_container.show()
-        
-        # Install event filter after web view is shown
-        if self.web_view.focusProxy():
-            self.web_view.focusProxy().installEventFilter(self)
-        
 
     def show_menu(self):
         self.web_container.hide()
         for button in self.buttons.values():
             button.show()
 
-    def handle_key_press(self, key):
-        # Handle special keys
-        if key == '\b':
-            # Simulate backspace
-            self.web_view.page().runJavaScript(
-                "document.activeElement.value = document.activeElement.value.slice(0, -1);"
-            )
-        elif key == '\n':
-            # Simulate enter
-            self.web_view.page().runJavaScript(
-                "document.activeElement.form && document.activeElement.form.submit();"
-            )
-        else:
-            # Insert regular text
-            self.web_view.page().runJavaScript(
-                f"document.activeElement.value += '{key}';"
-            )
-    
-    def eventFilter(self, obj, event):
-        if event.type() == event.FocusIn:
-            # Show keyboard when a text input is focused
-            self.web_view.page().runJavaScript(
-                "document.activeElement.tagName === 'INPUT' || document.activeElement.tagName === 'TEXTAREA'",
-                lambda result: self.keyboard.setVisible(result)
-            )
-        return super().eventFilter(obj, event)
-        
     def closeEvent(self, event):
         # Properly cleanup web engine resources
         if self.web_view:
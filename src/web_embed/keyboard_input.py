@@ -0,0 +1,133 @@
+from PyQt5.QtCore import QObject, QEvent, QTimer, Qt, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import QInputMethodEvent, QKeyEvent
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtWebEngineWidgets import QWebEngineScript
+from src.keyboard import shared_keyboard
+from src.web_embed.channel import CHANNEL_WORLD, attach_object
+from src.web_embed.scripts import script_registry
+
+# Keys typed within one frame are sent together
+_FRAME_MS = 16
+
+_SPECIAL_KEYS = {
+    '\b': (Qt.Key_Backspace, ''),
+    '\n': (Qt.Key_Return, '\r'),
+}
+
+# Tells Python when an editable element gains or loses focus. focusout is
+# checked on the next tick so moving between two fields does not flicker.
+_EDITABLE_FOCUS_JS = r"""
+(function(){
+  if (window.__puddleEditableFocus || typeof puddleChannel === 'undefined') return;
+  window.__puddleEditableFocus = 1;
+  var TEXT_TYPES = /^(text|search|email|url|password|number|tel)$/i;
+  function editable(el){
+    if (!el) return false;
+    if (el.isContentEditable) return true;
+    if (el.tagName === 'TEXTAREA') return !el.readOnly && !el.disabled;
+    if (el.tagName === 'INPUT') return TEXT_TYPES.test(el.type || 'text') && !el.readOnly && !el.disabled;
+    return false;
+  }
+  puddleChannel(function(objects){
+    var bridge = objects.editableFocus;
+    if (!bridge) return;
+    var last = null;
+    function push(){
+      var now = editable(document.activeElement);
+      if (now === last) return;
+      last = now;
+      bridge.focusChanged(now);
+    }
+    document.addEventListener('focusin', push, true);
+    document.addEventListener('focusout', function(){ setTimeout(push, 0); }, true);
+    push();
+  });
+})();
+"""
+
+script_registry.register('editable-focus', _EDITABLE_FOCUS_JS,
+                         injection_point=QWebEngineScript.DocumentReady,
+                         world=CHANNEL_WORLD)
+
+
+class EditableFocusBridge(QObject):
+    """Receives focus changes on editable elements from the page."""
+
+    editable_focus_changed = pyqtSignal(bool)
+
+    @pyqtSlot(bool)
+    def focusChanged(self, editable):
+        self.editable_focus_changed.emit(editable)
+
+
+class KeyInjector(QObject):
+    """Types into a web view by sending native input events to its focus proxy.
+
+    Text goes in as a QInputMethodEvent commit, so the page sees real input
+    events; backspace and enter are sent as key presses. Keys queued within
+    one frame are flushed together.
+    """
+
+    def __init__(self, web_view, parent=None):
+        super().__init__(parent or web_view)
+        self.web_view = web_view
+        self._pending = []
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(_FRAME_MS)
+        self._flush_timer.timeout.connect(self.flush)
+
+    def send(self, key):
+        self._pending.append(key)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self):
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        # The proxy changes if the renderer is recreated, so look it up now
+        target = self.web_view.focusProxy() or self.web_view
+        text = ''
+        for key in pending:
+            if key in _SPECIAL_KEYS:
+                if text:
+                    self._commit(target, text)
+                    text = ''
+                self._press(target, *_SPECIAL_KEYS[key])
+            else:
+                text += key
+        if text:
+            self._commit(target, text)
+
+    def _commit(self, target, text):
+        event = QInputMethodEvent()
+        event.setCommitString(text)
+        QApplication.sendEvent(target, event)
+
+    def _press(self, target, key, text):
+        QApplication.sendEvent(target, QKeyEvent(QEvent.KeyPress, key, Qt.NoModifier, text))
+        QApplication.sendEvent(target, QKeyEvent(QEvent.KeyRelease, key, Qt.NoModifier, text))
+
+
+def attach_keyboard(web_view, host, page=None):
+    """Hook a web view up to the shared virtual keyboard.
+
+    Keystrokes are injected natively, and the keyboard is shown over
+    ``host`` when the page reports focus on an editable element.
+    """
+    page = page or web_view.page()
+    injector = KeyInjector(web_view)
+
+    def _on_focus(editable):
+        if editable:
+            shared_keyboard().show_for(host, injector.send)
+        else:
+            shared_keyboard().release(host)
+
+    bridge = EditableFocusBridge(injector)
+    bridge.editable_focus_changed.connect(_on_focus)
+    attach_object(page, 'editableFocus', bridge)
+    script_registry.install(page, 'editable-focus')
+    injector.focus_bridge = bridge
+    return injector
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from typing import Optional
 
 try:
@@ -12,16 +13,61 @@ except Exception:  # pragma: no cover - typing fallback in non-Qt envs
             pass
 
 
+def _renderer_rss_mb(pid: int) -> float:
+    """Resident memory of a renderer process in MB (Linux only, 0 elsewhere)."""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024.0
+    except Exception:
+        pass
+    return 0.0
+
+
+class _SuspendedEmbed:
+    def __init__(self, widget: QWidget) -> None:
+        self.widget = widget
+        self.url = ''
+        self.scroll = (0.0, 0.0)
+        self.discarded = False
+
+
 class WebEmbedManager:
     """Tracks which web-embedded widget is currently open.
 
     Exactly one non-map web embed can be visible at a time. The maps widget
     is not tracked here and can be shown independently.
+
+    In suspend mode (the default) closing an embed keeps its page in memory
+    in the QtWebEngine ``Frozen`` lifecycle state, so switching back to it
+    is instant and keeps the user's place. Suspended embeds are kept in LRU
+    order; once more than ``max_live`` renderers are alive, or their
+    combined memory goes over ``memory_budget_mb``, the least recently used
+    ones are moved to ``Discarded`` with their URL and scroll position
+    saved. With suspend mode off, closing an embed stops it and navigates
+    to ``about:blank`` as before.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, suspend: bool = True, max_live: int = 3,
+                 memory_budget_mb: float = 1024.0) -> None:
         self._current_name: Optional[str] = None
         self._current_widget: Optional[QWidget] = None
+        self.suspend = suspend
+        self.max_live = max_live
+        self.memory_budget_mb = memory_budget_mb
+        # name -> _SuspendedEmbed, least recently used first
+        self._suspended: OrderedDict[str, _SuspendedEmbed] = OrderedDict()
+
+    def configure(self, suspend: Optional[bool] = None, max_live: Optional[int] = None,
+                  memory_budget_mb: Optional[float] = None) -> None:
+        if suspend is not None:
+            self.suspend = suspend
+        if max_live is not None:
+            self.max_live = max(1, max_live)
+        if memory_budget_mb is not None:
+            self.memory_budget_mb = memory_budget_mb
+        self._enforce_budget()
 
     def current(self) -> Optional[str]:
         return self._current_name
@@ -29,31 +75,17 @@ class WebEmbedManager:
     def is_open(self, name: str) -> bool:
         return self._current_name == name
 
+    def is_suspended(self, name: str) -> bool:
+        return name in self._suspended
+
     def close_current(self) -> None:
         if self._current_widget is not None:
             w = self._current_widget
-            try:
-                web_view = getattr(w, 'web_view', None)
-                if web_view is not None:
-                    try:
-                        page = web_view.page()
-                        if hasattr(page, 'setAudioMuted'):
-                            page.setAudioMuted(True)
-                        if hasattr(page, 'triggerAction'):
-                            from PyQt5.QtWebEngineWidgets import QWebEnginePage
-                            page.triggerAction(QWebEnginePage.Stop)
-                    except Exception:
-                        pass
-                    try:
-                        if hasattr(web_view, 'setUrl'):
-                            web_view.setUrl(QUrl('about:blank'))
-                        elif hasattr(web_view, 'setHtml'):
-                            web_view.setHtml('<html><body></body></html>')
-                    except Exception:
-                        pass
-                w.hide()
-            except Exception:
-                pass
+            page = self._page(w)
+            if self.suspend and page is not None and hasattr(page, 'setLifecycleState'):
+                self._suspend(self._current_name, w, page)
+            else:
+                self._teardown(w)
         self._current_name = None
         self._current_widget = None
 
@@ -73,6 +105,129 @@ class WebEmbedManager:
 
         self.close_current()
 
+        suspended = self._suspended.pop(name, None)
+        if suspended is not None and suspended.widget is widget:
+            self._resume(suspended)
+        else:
+            self._load(widget)
+
+        self._current_name = name
+        self._current_widget = widget
+
+    def _page(self, widget: QWidget):
+        web_view = getattr(widget, 'web_view', None)
+        if web_view is None:
+            return None
+        try:
+            return web_view.page()
+        except Exception:
+            return None
+
+    def _teardown(self, w: QWidget) -> None:
+        try:
+            web_view = getattr(w, 'web_view', None)
+            if web_view is not None:
+                try:
+                    page = web_view.page()
+                    if hasattr(page, 'setAudioMuted'):
+                        page.setAudioMuted(True)
+                    if hasattr(page, 'triggerAction'):
+                        from PyQt5.QtWebEngineWidgets import QWebEnginePage
+                        page.triggerAction(QWebEnginePage.Stop)
+                except Exception:
+                    pass
+                try:
+                    if hasattr(web_view, 'setUrl'):
+                        web_view.setUrl(QUrl('about:blank'))
+                    elif hasattr(web_view, 'setHtml'):
+                        web_view.setHtml('<html><body></body></html>')
+                except Exception:
+                    pass
+            w.hide()
+        except Exception:
+            pass
+
+    def _suspend(self, name: str, w: QWidget, page) -> None:
+        entry = _SuspendedEmbed(w)
+        try:
+            page.setAudioMuted(True)
+            w.hide()
+            # Only hidden pages may be frozen
+            if not page.isVisible():
+                page.setLifecycleState(page.LifecycleState.Frozen)
+        except (AttributeError, RuntimeError) as e:
+            print(f"Could not freeze web embed {name}: {e}")
+        self._suspended[name] = entry
+        self._enforce_budget()
+
+    def _discard(self, entry: _SuspendedEmbed) -> None:
+        page = self._page(entry.widget)
+        if page is None or entry.discarded:
+            return
+        try:
+            entry.url = page.url().toString()
+            pos = page.scrollPosition()
+            entry.scroll = (pos.x(), pos.y())
+            page.setLifecycleState(page.LifecycleState.Discarded)
+            entry.discarded = True
+        except (AttributeError, RuntimeError) as e:
+            print(f"Could not discard web embed page: {e}")
+
+    def _enforce_budget(self) -> None:
+        live = [e for e in self._suspended.values() if not e.discarded]
+        # The open embed always counts as one live renderer
+        while live and len(live) + 1 > self.max_live:
+            self._discard(live.pop(0))
+        while live and self._live_memory_mb(live) > self.memory_budget_mb:
+            self._discard(live.pop(0))
+
+    def _live_memory_mb(self, live) -> float:
+        pids = set()
+        widgets = [e.widget for e in live]
+        if self._current_widget is not None:
+            widgets.append(self._current_widget)
+        for w in widgets:
+            page = self._page(w)
+            try:
+                pid = page.renderProcessPid()
+                if pid > 0:
+                    pids.add(pid)
+            except Exception:
+                pass
+        # Pages of the same site can share a renderer; count each process once
+        return sum(_renderer_rss_mb(pid) for pid in pids)
+
+    def _resume(self, entry: _SuspendedEmbed) -> None:
+        w = entry.widget
+        page = self._page(w)
+        try:
+            if page is not None:
+                page.setLifecycleState(page.LifecycleState.Active)
+                page.setAudioMuted(False)
+                if entry.discarded:
+                    # Go back to where the user was, unless the page is already reloading it
+                    if entry.url and page.url().toString() != entry.url:
+                        page.setUrl(QUrl(entry.url))
+                    if any(entry.scroll):
+                        self._restore_scroll(w.web_view, entry.scroll)
+        except (AttributeError, RuntimeError) as e:
+            print(f"Could not resume web embed page: {e}")
+        w.show()
+
+    def _restore_scroll(self, web_view, scroll) -> None:
+        x, y = scroll
+
+        def _on_loaded(ok):
+            try:
+                web_view.loadFinished.disconnect(_on_loaded)
+            except Exception:
+                pass
+            if ok:
+                web_view.page().runJavaScript(f"window.scrollTo({x}, {y});")
+
+        web_view.loadFinished.connect(_on_loaded)
+
+    def _load(self, widget: QWidget) -> None:
         try:
             web_view = getattr(widget, 'web_view', None)
             if web_view is not None:
@@ -98,8 +253,5 @@ class WebEmbedManager:
         except Exception:
             pass
 
-        self._current_name = name
-        self._current_widget = widget
-
 
 web_embed_manager = WebEmbedManager()
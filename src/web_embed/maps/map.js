@@ -3,6 +3,12 @@ let map,
   directionsRenderer,
   origin = null,
   userMarker = null,
+  userIcon = null,
+  following = false,
+  pendingUser = null,
+  destination = null,
+  cachedLine = null,
+  routeLookupId = 0,
   navigating = false,
   placesService;
 
@@ -31,9 +37,14 @@ function bearing(a, b) {
   return ((Math.atan2(y, x) * 180) / Math.PI + 360) % 360;
 }
 
+// Called every frame the car moves (see MapsWidget.set_position), so only
+// touch what changed: the icon is re-rendered when the heading turns and
+// the zoom is set once when following starts.
 function updateUser(lat, lng, hd = 0) {
-  const pos = { lat, lng },
-    icon = {
+  const pos = { lat, lng };
+  origin = pos;
+  if (!userMarker) {
+    userIcon = {
       path: google.maps.SymbolPath.FORWARD_CLOSED_ARROW,
       scale: 6,
       fillColor: "#4285f4",
@@ -42,21 +53,33 @@ function updateUser(lat, lng, hd = 0) {
       strokeWeight: 1,
       rotation: hd,
     };
-  if (!userMarker) {
-    userMarker = new google.maps.Marker({ map, position: pos, icon });
+    userMarker = new google.maps.Marker({ map, position: pos, icon: userIcon });
   } else {
     userMarker.setPosition(pos);
-    userMarker.setIcon(icon);
+    if (Math.abs(((hd - userIcon.rotation + 540) % 360) - 180) >= 2) {
+      userIcon.rotation = hd;
+      userMarker.setIcon(userIcon);
+    }
   }
   if (navigating) {
-    map.panTo(pos);
-    map.setZoom(18);
+    if (!following) {
+      map.setZoom(18);
+      following = true;
+    }
+    map.moveCamera({ center: pos });
   }
 }
 
+// Entry point for the app; positions sent before the map exists wait for it
+function setUserPosition(lat, lng, hd) {
+  if (map) updateUser(lat, lng, hd);
+  else pendingUser = [lat, lng, hd];
+}
+
 function recenter() {
   if (origin) {
     navigating = true;
+    following = true;
     map.panTo(origin);
     map.setZoom(18);
   }
@@ -185,27 +208,132 @@ function showInfo(placeId, location) {
   }
 }
 
-function routeTo(dest) {
+function latLngLiteral(p) {
+  return typeof p.lat === "function" ? { lat: p.lat(), lng: p.lng() } : p;
+}
+
+// Asks the app's route cache; resolves null on a miss or if nobody answers
+function cachedRoute(from, to) {
+  return new Promise((resolve) => {
+    const id = ++routeLookupId;
+    const timer = setTimeout(() => finish(null), 500);
+    function finish(reply) {
+      clearTimeout(timer);
+      document.removeEventListener("puddle-route-cached", onReply);
+      resolve(reply && reply.route ? reply : null);
+    }
+    function onReply(e) {
+      const reply = JSON.parse(e.detail);
+      if (reply.id === id) finish(reply);
+    }
+    document.addEventListener("puddle-route-cached", onReply);
+    document.dispatchEvent(
+      new CustomEvent("puddle-route-lookup", {
+        detail: JSON.stringify({
+          id,
+          origin: [from.lat, from.lng],
+          destination: [to.lat, to.lng],
+        }),
+      })
+    );
+  });
+}
+
+function publishRoute(from, to, steps, cached) {
+  document.dispatchEvent(
+    new CustomEvent("puddle-route", {
+      detail: JSON.stringify({
+        origin: [from.lat, from.lng],
+        destination: [to.lat, to.lng],
+        cached,
+        steps,
+      }),
+    })
+  );
+}
+
+// A cached route has no DirectionsResult; draw its line ourselves
+function showCachedRoute(route) {
+  directionsRenderer.set("directions", null);
+  if (cachedLine) cachedLine.setMap(null);
+  const path = [];
+  route.steps.forEach((step) =>
+    step.path.forEach(([lat, lng]) => path.push({ lat, lng }))
+  );
+  cachedLine = new google.maps.Polyline({
+    map,
+    path,
+    strokeColor: "#4285f4",
+    strokeOpacity: 0.8,
+    strokeWeight: 6,
+  });
+  const first = route.steps[0];
+  showTurn(first.maneuver, first.instruction, first.distance || 0);
+}
+
+async function routeTo(dest, fresh = false) {
   navigating = true;
+  following = false;
+  destination = dest;
+  const from = latLngLiteral(origin || map.getCenter()),
+    to = latLngLiteral(dest);
+  // Trips taken before come from the device, offline too
+  const cached = fresh ? null : await cachedRoute(from, to);
+  if (cached) {
+    showCachedRoute(cached.route);
+    publishRoute(from, to, cached.route.steps, true);
+    // Refresh old entries in the background when there is a network
+    if (!cached.stale || !navigator.onLine) return;
+  }
   directionsService
     .route({
-      origin: origin || map.getCenter(),
-      destination: dest,
+      origin: from,
+      destination: to,
       travelMode: google.maps.TravelMode.DRIVING,
     })
     .then((r) => {
+      if (cachedLine) {
+        cachedLine.setMap(null);
+        cachedLine = null;
+      }
       directionsRenderer.setDirections(r);
       displayNextTurn(r.routes[0].legs[0].steps[0]);
+      // The app follows the route from here on (turns, tiles, rerouting)
+      const steps = [];
+      r.routes[0].legs.forEach((leg) =>
+        leg.steps.forEach((step) =>
+          steps.push({
+            instruction: step.instructions.replace(/<[^>]+>/g, ""),
+            maneuver: step.maneuver || "",
+            distance: step.distance.value,
+            path: step.path.map((p) => [p.lat(), p.lng()]),
+          })
+        )
+      );
+      publishRoute(from, to, steps, false);
     })
     .catch(console.error);
 }
 
+// Called by the app once the car has left the route
+function reroute() {
+  // Not from the cache: that may be the route we just left
+  if (destination) routeTo(destination, true);
+}
+
 function displayNextTurn(step) {
+  showTurn(
+    step.maneuver || "",
+    step.instructions.replace(/<[^>]+>/g, ""),
+    step.distance.value
+  );
+}
+
+// Also called by the app as the car moves along the route
+function showTurn(maneuver, text, meters) {
   const box = document.getElementById("nextTurn"),
-    arc = step.maneuver || "",
-    arrow = arc.includes("left") ? "←" : arc.includes("right") ? "→" : "↑",
-    text = step.instructions.replace(/<[^>]+>/g, ""),
-    distMi = (step.distance.value / 1609.34).toFixed(2) + " mi";
+    arrow = maneuver.includes("left") ? "←" : maneuver.includes("right") ? "→" : "↑",
+    distMi = (meters / 1609.34).toFixed(2) + " mi";
 
   box.innerHTML = `<span class="arrow">${arrow}</span> ${text} — ${distMi}`;
   box.style.display = "block";
@@ -243,6 +371,12 @@ function init() {
   }
 
 
+  // Show the car if the app sent a position while the map was loading
+  if (pendingUser) {
+    updateUser(...pendingUser);
+    pendingUser = null;
+  }
+
   // IP-based location fallback (disabled for Windows compatibility)
   // (async function ipFallback() {
   //   try {
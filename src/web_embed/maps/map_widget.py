@@ -1,10 +1,17 @@
+import json
+import math
 import os
+import time
 from typing import Tuple
 from PyQt5.QtCore import QUrl
 from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage
+from .route_bridge import RouteBridge
+from src.navigation import TurnByTurn
 # from debug_logger import debug_logger
 
 VECTOR_MAP_ID = "8ffd5464ed7851a4af500474"
+# Seconds between asking the page for a new route while off route
+REROUTE_INTERVAL = 15.0
 
 class _GeoPage(QWebEnginePage):
     def featurePermissionRequested(self, origin, feature):
@@ -25,6 +32,14 @@ class MapsWidget(QWebEngineView):
         try:
             # debug_logger.log_function_entry("__init__", "MapsWidget", api_key=api_key, center=center, parent=parent)
             super().__init__(parent)
+            self.route_bridge = RouteBridge(self)
+            self.route_bridge.route_changed.connect(self._on_route)
+            self.navigation = None
+            self._turn_shown = None
+            self._rerouted_at = -math.inf
+            self._position = None     # newest (lat, lng, heading) not sent yet
+            self._loaded = False
+            self.loadFinished.connect(self._on_load_finished)
             key  = api_key or os.getenv("GOOGLE_MAPS_API_KEY", "")
             
             # Debug: Check API key
@@ -76,7 +91,10 @@ class MapsWidget(QWebEngineView):
                 .replace("//INLINE_JS",  js)
             )
             # debug_logger.log_info("Setting up map web page", "MapsWidget")
-            self.setPage(_GeoPage(self))
+            page = _GeoPage(self)
+            # Routes the user picks are passed on to the app
+            self.route_bridge.attach(page)
+            self.setPage(page)
             self.setHtml(html, QUrl("https://localhost/"))
             # debug_logger.log_info("Map widget initialization completed", "MapsWidget")
             # debug_logger.log_function_exit("__init__", "MapsWidget")
@@ -85,7 +103,63 @@ class MapsWidget(QWebEngineView):
             print(f"Error initializing MapsWidget: {str(e)}")
             # Create a simple fallback widget instead of crashing
             super().__init__(parent)
+            self.route_bridge = RouteBridge(self)
+            self.navigation = None
+            self._position = None
+            self._loaded = False
             self.setHtml("<html><body style='background:#000;color:#fff;text-align:center;padding:50px;'><h2>Map Loading Error</h2><p>Unable to load Google Maps</p></body></html>")
 
+    def set_position(self, lat, lng, heading=0.0):
+        """Move the car marker; one page call, made only while the map is on screen."""
+        self._position = (lat, lng, heading)
+        if self.navigation is not None:
+            self._navigate(lat, lng)
+        if self.isVisible():
+            self._flush_position()
 
+    def _on_route(self, route):
+        self.navigation = TurnByTurn(route)
+        self._turn_shown = None
 
+    def _navigate(self, lat, lng):
+        now = time.monotonic()
+        state = self.navigation.update(lat, lng, now)
+        if state.off_route:
+            # Only now is the network needed again
+            if self._loaded and now - self._rerouted_at >= REROUTE_INTERVAL:
+                self._rerouted_at = now
+                self.page().runJavaScript("reroute();")
+            return
+        if self.isVisible():
+            self._show_turn(state)
+
+    def _show_turn(self, state):
+        # The next maneuver, or on the last step the way to the destination
+        step = state.next_step or state.step
+        meters = state.distance_to_maneuver if state.next_step else state.remaining_m
+        # The box shows hundredths of a mile; nothing to send until that changes
+        turn = (state.step_index, round(meters / 16.0934))
+        if not self._loaded or turn == self._turn_shown:
+            return
+        self._turn_shown = turn
+        self.page().runJavaScript(
+            f"showTurn({json.dumps(step.maneuver)}, {json.dumps(step.instruction)}, {meters:.0f});")
+
+    def _flush_position(self):
+        if self._position is None or not self._loaded:
+            return
+        lat, lng, heading = self._position
+        self._position = None
+        self.page().runJavaScript(f"setUserPosition({lat:.7f}, {lng:.7f}, {heading:.1f});")
+
+    def _on_load_finished(self, ok):
+        self._loaded = ok
+        if self.isVisible():
+            self._flush_position()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._flush_position()
+        if self.navigation is not None and self.navigation.state is not None:
+            self._turn_shown = None
+            self._show_turn(self.navigation.state)
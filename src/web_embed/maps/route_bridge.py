@@ -0,0 +1,85 @@
+import json
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+from PyQt5.QtWebEngineWidgets import QWebEngineScript
+from src.web_embed.channel import CHANNEL_WORLD, attach_object
+from src.web_embed.scripts import script_registry
+from src.navigation import Route
+from src.route_cache import route_cache
+
+# Runs next to map.js. The map announces a new route with a 'puddle-route'
+# event whose detail is the route as JSON (see Route.from_json); the DOM is
+# shared between worlds, so the event is seen here and passed on as is.
+# Before asking Google, the map looks for a cached route with a
+# 'puddle-route-lookup' event and gets the answer in 'puddle-route-cached'.
+# Details are JSON strings because objects do not cross worlds.
+_ROUTE_JS = r"""
+(function(){
+  if (window.__puddleRoute || typeof puddleChannel === 'undefined') return;
+  window.__puddleRoute = 1;
+  puddleChannel(function(objects){
+    var bridge = objects.mapRoute;
+    if (!bridge) return;
+    document.addEventListener('puddle-route', function(e){
+      if (typeof e.detail === 'string') bridge.routeChanged(e.detail);
+    });
+    document.addEventListener('puddle-route-lookup', function(e){
+      if (typeof e.detail !== 'string') return;
+      bridge.lookupRoute(e.detail, function(reply){
+        document.dispatchEvent(new CustomEvent('puddle-route-cached', {detail: reply}));
+      });
+    });
+  });
+})();
+"""
+
+script_registry.register('map-route', _ROUTE_JS,
+                         injection_point=QWebEngineScript.DocumentReady,
+                         world=CHANNEL_WORLD)
+
+
+class RouteBridge(QObject):
+    """The active route of the maps page, as a ``Route``.
+
+    Routes the page fetched from Google are also stored in the route
+    cache, and the page looks up trips there before fetching.
+    """
+
+    route_changed = pyqtSignal(object)
+
+    def __init__(self, parent=None, cache=None):
+        super().__init__(parent)
+        self.route = None
+        self._cache = cache
+
+    @property
+    def cache(self):
+        return self._cache or route_cache()
+
+    def attach(self, page):
+        attach_object(page, 'mapRoute', self)
+        script_registry.install(page, 'map-route')
+
+    @pyqtSlot(str)
+    def routeChanged(self, payload):
+        try:
+            data = json.loads(payload)
+            route = Route.from_json(payload)
+        except (ValueError, TypeError, AttributeError) as e:
+            print(f"Ignoring malformed route from the map: {e}")
+            return
+        if isinstance(data, dict) and not data.get('cached') and 'origin' in data and 'destination' in data:
+            self.cache.put(tuple(data['origin']), tuple(data['destination']), data)
+        self.route = route
+        self.route_changed.emit(route)
+
+    @pyqtSlot(str, result=str)
+    def lookupRoute(self, request):
+        """``{id, origin, destination}`` -> ``{id, route, stale}``; route is null on a miss."""
+        try:
+            request = json.loads(request)
+            hit = self.cache.get(tuple(request['origin']), tuple(request['destination']))
+        except (ValueError, TypeError, KeyError) as e:
+            print(f"Route cache lookup failed: {e}")
+            return json.dumps({'id': None, 'route': None})
+        route, stale = hit if hit is not None else (None, False)
+        return json.dumps({'id': request.get('id'), 'route': route, 'stale': stale})
@@ -1,32 +1,63 @@
-import os
+import math
+import time
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QFrame
 from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage, QWebEngineProfile, QWebEngineSettings
-from PyQt5.QtCore import QUrl, QSize, Qt
+from PyQt5.QtCore import QUrl, QSize, Qt, QTimer
 from PyQt5.QtGui import QFont
+from src.web_embed.tile_scheme import install_tile_scheme, TILE_URL, ASSET_URL
 # from debug_logger import debug_logger
 
+# Position updates closer than this (metres) are not worth a repaint
+MIN_MOVE_M = 5.0
+# At most one position update per this interval reaches the page
+UPDATE_INTERVAL_MS = 1000
+
+
+def _distance_m(a, b):
+    """Equirectangular distance, plenty for a few metres."""
+    x = math.radians(b[1] - a[1]) * math.cos(math.radians((a[0] + b[0]) / 2))
+    y = math.radians(b[0] - a[0])
+    return 6371000 * math.hypot(x, y)
+
+
 class MiniMapPage(QWebEnginePage):
     def __init__(self, profile, parent=None):
         super().__init__(profile, parent)
         # Enable touch-friendly settings
         settings = self.settings()
         settings.setAttribute(QWebEngineSettings.JavascriptEnabled, True)
-        settings.setAttribute(QWebEngineSettings.ScrollAnimatorEnabled, True)
-        settings.setAttribute(QWebEngineSettings.PluginsEnabled, True)
-        settings.setAttribute(QWebEngineSettings.FullScreenSupportEnabled, True)
+        settings.setAttribute(QWebEngineSettings.ScrollAnimatorEnabled, False)
+        settings.setAttribute(QWebEngineSettings.PluginsEnabled, False)
         # Set touch-optimized defaults
         settings.setFontSize(QWebEngineSettings.DefaultFontSize, 16)
         settings.setFontSize(QWebEngineSettings.MinimumFontSize, 14)
 
 class MiniMapWidget(QWidget):
+    """Small always-visible map next to the gauges.
+
+    A separate, fixed-size Leaflet page rather than the full Google Maps
+    view, so switching screens never reparents or resizes the big map.
+    The page only repaints when ``set_position`` moves the marker, and
+    position updates are thinned out to what can be seen at this size.
+    """
+
     def __init__(self, parent=None):
         try:
             # debug_logger.log_function_entry("__init__", "MiniMapWidget", parent=parent)
             super().__init__(parent)
+            self.position = None      # last (lat, lng, heading) sent to the page
+            self._pending = None      # newest position not sent yet
+            self._loaded = False
+            self._last_sent = 0.0
+            self._flush_timer = QTimer(self)
+            self._flush_timer.setSingleShot(True)
+            self._flush_timer.timeout.connect(self._flush)
             # Create custom profile with modified settings
             # debug_logger.log_info("Creating mini map web engine profile", "MiniMapWidget")
             self.profile = QWebEngineProfile("minimap_profile")
             self.profile.setHttpUserAgent("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+            # Leaflet and tiles come from the on-device tile store, not the network
+            self.tile_handler = install_tile_scheme(self.profile)
             self.setup_ui()
             self.hide()  # Hidden by default
             # debug_logger.log_function_exit("__init__", "MiniMapWidget")
@@ -42,69 +73,108 @@ class MiniMapWidget(QWidget):
     def setup_ui(self):
         # Main layout
         layout = QVBoxLayout()
-        layout.setContentsMargins(2, 2, 2, 2)
+        layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(0)
-        
+
         # Container for web view
         web_container = QFrame()
         web_layout = QVBoxLayout(web_container)
         web_layout.setContentsMargins(0, 0, 0, 0)
-        
+
         # Create web view for Mini Map with touch-optimized page
         # debug_logger.log_info("Creating mini map web view", "MiniMapWidget")
         self.web_view = QWebEngineView()
         self.page = MiniMapPage(self.profile, self.web_view)
         self.web_view.setPage(self.page)
+        self.page.loadFinished.connect(self._on_load_finished)
         # debug_logger.log_info("Loading Leaflet map", "MiniMapWidget")
         self._load_leaflet()
-        self.web_view.setMinimumSize(QSize(296, 296))  # Slightly smaller than container
+        # Fixed size: the page never has to re-layout
+        self.web_view.setFixedSize(QSize(296, 296))  # Slightly smaller than container
         web_layout.addWidget(self.web_view)
-        
+
         # Add web container to main layout
         layout.addWidget(web_container)
         self.setLayout(layout)
-        
+
     def _load_leaflet(self):
         # debug_logger.log_function_entry("_load_leaflet", "MiniMapWidget")
         # Create a simple Leaflet map HTML
-        html = """
+        html = ("""
         <!DOCTYPE html>
         <html>
         <head>
             <meta charset="utf-8">
             <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css" />
-            <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
+            <link rel="stylesheet" href="__LEAFLET_CSS__" />
+            <script src="__LEAFLET_JS__"></script>
             <style>
-                body { margin: 0; padding: 0; }
-                #map { height: 100vh; width: 100vw; }
+                body { margin: 0; padding: 0; background: #000; }
+                #map { height: 100vh; width: 100vw; background: #000; }
+                .leaflet-control-attribution { font-size: 8px; }
             </style>
         </head>
         <body>
             <div id="map"></div>
             <script>
-                // Initialize the map
-                var map = L.map('map').setView([40.758, -73.9855], 13);
-                
-                // Add OpenStreetMap tiles
-                L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
+                // A view only map: no zoom animation, dragging or wheel zoom
+                var map = L.map('map', {
+                    zoomControl: false, dragging: false, scrollWheelZoom: false,
+                    doubleClickZoom: false, touchZoom: false, boxZoom: false,
+                    keyboard: false, zoomAnimation: false, fadeAnimation: false
+                }).setView([40.758, -73.9855], 16);
+
+                // OpenStreetMap tiles through the local tile store
+                L.tileLayer('__TILE_URL__', {
                     maxZoom: 19,
                     attribution: '© OpenStreetMap contributors'
                 }).addTo(map);
-                
-                // Add a marker for current location (placeholder)
-                var marker = L.marker([40.758, -73.9855]).addTo(map);
-                marker.bindPopup("<b>Current Location</b><br>New York, NY").openPopup();
-                
-                // Disable scroll wheel zoom to prevent accidental zooming
-                map.scrollWheelZoom.disable();
-                
-                // Disable dragging to prevent map movement
-                map.dragging.disable();
+
+                // Current location
+                var marker = L.circleMarker([40.758, -73.9855], {
+                    radius: 7, color: '#fff', weight: 2, fillColor: '#4285f4', fillOpacity: 1
+                }).addTo(map);
+
+                function setPosition(lat, lng) {
+                    marker.setLatLng([lat, lng]);
+                    map.setView([lat, lng], map.getZoom(), { animate: false });
+                }
             </script>
         </body>
         </html>
         """
-        
+            .replace("__LEAFLET_CSS__", ASSET_URL.format(name="leaflet.css"))
+            .replace("__LEAFLET_JS__", ASSET_URL.format(name="leaflet.js"))
+            .replace("__TILE_URL__", TILE_URL.format(layer="osm", z="{z}", x="{x}", y="{y}")))
+
         self.web_view.setHtml(html, QUrl("https://localhost/"))
         # debug_logger.log_function_exit("_load_leaflet", "MiniMapWidget")
+
+    def set_position(self, lat, lng, heading=0.0):
+        """Move the map to the car; cheap to call at the GPS rate."""
+        position = (lat, lng, heading)
+        # The marker has no heading, so only a move is worth a page call
+        if self.position is not None and _distance_m(self.position, position) < MIN_MOVE_M:
+            return
+        self._pending = position
+        if not self._flush_timer.isActive():
+            wait = UPDATE_INTERVAL_MS - (time.monotonic() - self._last_sent) * 1000
+            self._flush_timer.start(max(0, int(wait)))
+
+    def _flush(self):
+        # Hidden or still loading: the newest position is sent once it can be seen
+        if self._pending is None or not self._loaded or not self.isVisible():
+            return
+        lat, lng, heading = self._pending
+        self.page.runJavaScript(f"setPosition({lat:.7f}, {lng:.7f});")
+        self.position = self._pending
+        self._pending = None
+        self._last_sent = time.monotonic()
+
+    def _on_load_finished(self, ok):
+        self._loaded = ok
+        self._flush()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._flush()
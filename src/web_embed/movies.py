@@ -1,12 +1,31 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QFrame
-from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage, QWebEngineProfile, QWebEngineSettings
+from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage, QWebEngineProfile, QWebEngineSettings, QWebEngineScript
 from PyQt5.QtCore import QUrl, QSize, Qt
-from src.keyboard import VirtualKeyboard
+from src.web_embed.keyboard_input import attach_keyboard
 from src.web_embed.adblock import enable_adblock
+from src.web_embed.scripts import script_registry
 # from src.debug_logger import debug_logger
 from src.web_embed.web_view import WebAppWidget
 from src.widget_config import WIDGET_WIDTH, WIDGET_HEIGHT
 
+script_registry.register('anti-frame-busting', """
+    // Override properties that could detect framing
+    try {
+        Object.defineProperty(window, 'self', {
+            get: function() { return window.top; }
+        });
+        Object.defineProperty(window, 'top', {
+            get: function() { return window.self; }
+        });
+        Object.defineProperty(window, 'parent', {
+            get: function() { return window.self; }
+        });
+        Object.defineProperty(window, 'frameElement', {
+            get: function() { return null; }
+        });
+    } catch(e) {}
+""", injection_point=QWebEngineScript.DocumentCreation, world=QWebEngineScript.MainWorld)
+
 class MoviesPage(QWebEnginePage):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -26,29 +45,8 @@ class MoviesPage(QWebEnginePage):
         # Set touch-optimized defaults
         settings.setFontSize(QWebEngineSettings.DefaultFontSize, 16)
         settings.setFontSize(QWebEngineSettings.MinimumFontSize, 14)
-
-    def acceptNavigationRequest(self, url, _type, isMainFrame):
-        # Inject anti-frame-busting code
-        if isMainFrame:
-            script = """
-                // Override properties that could detect framing
-                try {
-                    Object.defineProperty(window, 'self', {
-                        get: function() { return window.top; }
-                    });
-                    Object.defineProperty(window, 'top', {
-                        get: function() { return window.self; }
-                    });
-                    Object.defineProperty(window, 'parent', {
-                        get: function() { return window.self; }
-                    });
-                    Object.defineProperty(window, 'frameElement', {
-                        get: function() { return null; }
-                    });
-                } catch(e) {}
-            """
-            self.runJavaScript(script)
-        return super().acceptNavigationRequest(url, _type, isMainFrame)
+        # Anti-frame-busting code has to run before the page's own scripts
+        script_registry.install(self, 'anti-frame-busting')
 
     def javaScriptConsoleMessage(self, level, message, lineNumber, sourceID):
         msg = str(message)
@@ -88,62 +86,24 @@ class MoviesWidget(WebAppWidget):
         self.web_view = QWebEngineView()
         self.page = MoviesPage(self.web_view)
         self.web_view.setPage(self.page)
-        # debug_logger.log_info("Loading movie website: https://rivestream.org", "MoviesWidget")
-        self.web_view.setUrl(QUrl(self.url))
         # Uses WIDGET_WIDTH x WIDGET_HEIGHT from configuration for consistent sizing
         self.web_view.setMinimumSize(QSize(WIDGET_WIDTH, WIDGET_HEIGHT))
         web_layout.addWidget(self.web_view)
         enable_adblock(self.web_view, target="auto")
         
-        # Add virtual keyboard
-        self.keyboard = VirtualKeyboard(self)
-        self.keyboard.hide()  # Hidden by default
-        
-        # Connect keyboard events to web view
-        self.keyboard.key_pressed.connect(self.handle_key_press)
+        # Keystrokes go to the view as native input events; the shared
+        # keyboard appears over this widget when an editable element has focus
+        self.keyboard_input = attach_keyboard(self.web_view, self, self.page)
+        # debug_logger.log_info("Loading movie website: https://rivestream.org", "MoviesWidget")
+        self.web_view.setUrl(QUrl(self.url))
         
         # Add web container to main layout
         layout.addWidget(web_container)
         self.setLayout(layout)
         # debug_logger.log_function_exit("setup_ui", "MoviesWidget")
         
-        # Handle focus changes to show/hide keyboard
-        self.web_view.focusProxy().installEventFilter(self)
 
     
-    def handle_key_press(self, key):
-        # Handle special keys
-        if key == '\b':
-            # Simulate backspace
-            self.web_view.page().runJavaScript(
-                "document.activeElement.value = document.activeElement.value.slice(0, -1);"
-            )
-        elif key == '\n':
-            # Simulate enter
-            self.web_view.page().runJavaScript(
-                "document.activeElement.form && document.activeElement.form.submit();"
-            )
-        else:
-            # Insert regular text
-            self.web_view.page().runJavaScript(
-                f"document.activeElement.value += '{key}';"
-            )
-    
-    def eventFilter(self, obj, event):
-        if event.type() == event.FocusIn:
-            # Show keyboard when a text input is focused
-            self.web_view.page().runJavaScript(
-                "document.activeElement.tagName === 'INPUT' || document.activeElement.tagName === 'TEXTAREA'",
-                lambda result: self.keyboard.setVisible(result)
-            )
-        return super().eventFilter(obj, event)
-        
-    def showEvent(self, event):
-        super().showEvent(event)
-        # Ensure keyboard is properly positioned when widget is shown
-        if self.keyboard.isVisible():
-            self.keyboard.move(0, self.height() - self.keyboard.height())
-
     def closeEvent(self, event):
         # Properly cleanup web engine resources
         if self.web_view:
@@ -0,0 +1,136 @@
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+from PyQt5.QtWebEngineWidgets import QWebEngineScript
+from src.web_embed.channel import CHANNEL_WORLD, attach_object
+from src.web_embed.scripts import script_registry
+
+# Runs in the page. Follows the media element and the document title and
+# pushes only what changed; position updates are limited to two a second.
+_NOW_PLAYING_JS = r"""
+(function(){
+  if (window.__puddleNowPlaying || typeof puddleChannel === 'undefined') return;
+  window.__puddleNowPlaying = 1;
+  puddleChannel(function(objects){
+    var bridge = objects.nowPlaying;
+    if (!bridge) return;
+    var media = null;
+    var last = {title: null, playing: null, dur: null};
+    var lastPosAt = 0;
+
+    function title(){
+      var bar = document.querySelector('ytmusic-player-bar');
+      var el = bar && (bar.querySelector('.title') || bar.querySelector('#song-title'));
+      var t = el ? el.textContent : document.title;
+      return (t || '').replace(/ - You\u200b?Tube Music$/, '').trim();
+    }
+    function pushState(){
+      var t = title();
+      var playing = !!(media && !media.paused && !media.ended);
+      var dur = (media && isFinite(media.duration)) ? media.duration : 0;
+      if (t === last.title && playing === last.playing && dur === last.dur) return;
+      last = {title: t, playing: playing, dur: dur};
+      bridge.stateChanged(t, playing, dur);
+    }
+    function pushPosition(force){
+      if (!media) return;
+      var now = Date.now();
+      if (!force && now - lastPosAt < 500) return;
+      lastPosAt = now;
+      bridge.positionChanged(media.currentTime || 0);
+    }
+    function bind(m){
+      if (!m || m === media) return;
+      media = m;
+      ['play', 'pause', 'ended', 'durationchange', 'loadedmetadata'].forEach(function(e){
+        m.addEventListener(e, pushState);
+      });
+      m.addEventListener('timeupdate', function(){ pushPosition(false); });
+      m.addEventListener('seeked', function(){ pushPosition(true); });
+      pushState();
+      pushPosition(true);
+    }
+    // Media events do not bubble, but they can be caught on the way down
+    document.addEventListener('play', function(e){ bind(e.target); }, true);
+    bind(document.querySelector('video, audio'));
+
+    var titleEl = document.querySelector('title');
+    if (titleEl) new MutationObserver(pushState).observe(titleEl, {childList: true, characterData: true, subtree: true});
+    pushState();
+
+    function click(sel){
+      var b = document.querySelector('ytmusic-player-bar ' + sel) || document.querySelector('#left-controls ' + sel);
+      if (b) { b.click(); return true; }
+      return false;
+    }
+    bridge.command.connect(function(name, arg){
+      var m = media || document.querySelector('video, audio');
+      if (name === 'toggle') {
+        if (!click('#play-pause-button') && m) { if (m.paused) m.play(); else m.pause(); }
+      } else if (name === 'next') {
+        click('#next-button');
+      } else if (name === 'prev') {
+        click('#previous-button');
+      } else if (name === 'seek' && m) {
+        m.currentTime = Math.max(0, arg);
+      } else if (name === 'seek_fraction' && m && isFinite(m.duration)) {
+        m.currentTime = Math.max(0, Math.min(1, arg)) * m.duration;
+      }
+    });
+  });
+})();
+"""
+
+script_registry.register('now-playing', _NOW_PLAYING_JS,
+                         injection_point=QWebEngineScript.DocumentReady,
+                         world=CHANNEL_WORLD)
+
+
+class NowPlayingBridge(QObject):
+    """Now-playing state pushed from a music page over QWebChannel.
+
+    The page script calls ``stateChanged``/``positionChanged`` only when
+    something changes. Commands are sent as a single ``command`` signal, so
+    they never wait on a status round-trip.
+    """
+
+    state_changed = pyqtSignal(str, bool, float)
+    position_changed = pyqtSignal(float, float)
+    # Delivered to the page script
+    command = pyqtSignal(str, float)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.title = ''
+        self.playing = False
+        self.duration = 0.0
+        self.position = 0.0
+
+    def attach(self, page):
+        attach_object(page, 'nowPlaying', self)
+        script_registry.install(page, 'now-playing')
+
+    @pyqtSlot(str, bool, float)
+    def stateChanged(self, title, playing, duration):
+        self.title = title
+        self.playing = playing
+        self.duration = duration
+        self.state_changed.emit(title, playing, duration)
+
+    @pyqtSlot(float)
+    def positionChanged(self, position):
+        self.position = position
+        self.position_changed.emit(position, self.duration)
+
+    def toggle(self):
+        self.command.emit('toggle', 0.0)
+
+    def next(self):
+        self.command.emit('next', 0.0)
+
+    def prev(self):
+        self.command.emit('prev', 0.0)
+
+    def seek(self, seconds):
+        self.command.emit('seek', float(seconds))
+
+    def seek_fraction(self, fraction):
+        self.command.emit('seek_fraction', float(fraction))
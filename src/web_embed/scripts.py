@@ -0,0 +1,69 @@
+from typing import Dict, Set
+
+from PyQt5.QtWebEngineWidgets import QWebEngineScript
+
+
+class ScriptRegistry:
+    """Central place for JavaScript that is injected into web embeds.
+
+    Scripts are registered once by name together with where and when they
+    should run. ``install`` adds them to a page's or profile's script
+    collection, so QtWebEngine runs them on every matching load by itself
+    and Python never has to resend them with ``runJavaScript``.
+    """
+
+    def __init__(self) -> None:
+        self._scripts: Dict[str, QWebEngineScript] = {}
+
+    def register(self, name: str, source: str,
+                 injection_point=QWebEngineScript.DocumentReady,
+                 world=QWebEngineScript.ApplicationWorld,
+                 subframes: bool = False) -> None:
+        script = QWebEngineScript()
+        script.setName(name)
+        script.setSourceCode(source)
+        script.setInjectionPoint(injection_point)
+        script.setWorldId(world)
+        script.setRunsOnSubFrames(subframes)
+        self._scripts[name] = script
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._scripts
+
+    def install(self, target, *names: str) -> None:
+        """Install scripts on a QWebEnginePage or QWebEngineProfile.
+
+        Installing a script that is already on the target does nothing.
+        Scripts take effect from the next load of the page.
+        """
+        installed = self.installed(target)
+        collection = target.scripts()
+        for name in names:
+            script = self._scripts.get(name)
+            if script is None:
+                print(f"Unknown injected script: {name}")
+                continue
+            if name in installed or not collection.findScript(name).isNull():
+                installed.add(name)
+                continue
+            collection.insert(script)
+            installed.add(name)
+
+    def uninstall(self, target, name: str) -> None:
+        installed = self.installed(target)
+        collection = target.scripts()
+        existing = collection.findScript(name)
+        if not existing.isNull():
+            collection.remove(existing)
+        installed.discard(name)
+
+    def installed(self, target) -> Set[str]:
+        """Names of scripts installed on ``target`` through this registry."""
+        names = getattr(target, '_installed_scripts', None)
+        if names is None:
+            names = set()
+            target._installed_scripts = names
+        return names
+
+
+script_registry = ScriptRegistry()
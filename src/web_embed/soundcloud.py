@@ -1,7 +1,7 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QFrame
 from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage, QWebEngineSettings, QWebEngineProfile
 from PyQt5.QtCore import QUrl, QSize, Qt
-from src.keyboard import VirtualKeyboard
+from src.web_embed.keyboard_input import attach_keyboard
 from src.web_embed.adblock import enable_adblock
  
 
@@ -63,64 +63,24 @@ class SoundCloudWidget(QWidget):
         self.web_view = QWebEngineView()
         self.page = SoundCloudPage(self.profile, self.web_view)
         self.web_view.setPage(self.page)
-        self.web_view.setUrl(QUrl(self.default_url))
         self.web_view.setMinimumSize(QSize(1280, 768))
         web_layout.addWidget(self.web_view)
         enable_adblock(self.web_view, target="auto")
         
-        # Add virtual keyboard
-        self.keyboard = VirtualKeyboard(self)
-        self.keyboard.hide()  # Hidden by default
-        
-        # Connect keyboard events to web view
-        self.keyboard.key_pressed.connect(self.handle_key_press)
+        # Keystrokes go to the view as native input events; the shared
+        # keyboard appears over this widget when an editable element has focus
+        self.keyboard_input = attach_keyboard(self.web_view, self, self.page)
+        self.web_view.setUrl(QUrl(self.default_url))
         
         # Add web container to main layout
         layout.addWidget(web_container)
         self.setLayout(layout)
-        
-        # Handle focus changes to show/hide keyboard
-        self.web_view.focusProxy().installEventFilter(self)
-        
-    
+
     def showEvent(self, event):
         super().showEvent(event)
         self.web_view.loadStarted.connect(lambda: self.stack.setCurrentIndex(0))
         self.web_view.loadFinished.connect(lambda ok: self.stack.setCurrentIndex(1))
         
-    def handle_key_press(self, key):
-        # Handle special keys
-        if key == '\b':
-            # Simulate backspace
-            self.web_view.page().runJavaScript(
-                "document.activeElement.value = document.activeElement.value.slice(0, -1);"
-            )
-        elif key == '\n':
-            # Simulate enter
-            self.web_view.page().runJavaScript(
-                "document.activeElement.form && document.activeElement.form.submit();"
-            )
-        else:
-            # Insert regular text
-            self.web_view.page().runJavaScript(
-                f"document.activeElement.value += '{key}';"
-            )
-    
-    def eventFilter(self, obj, event):
-        if event.type() == event.FocusIn:
-            # Show keyboard when a text input is focused
-            self.web_view.page().runJavaScript(
-                "document.activeElement.tagName === 'INPUT' || document.activeElement.tagName === 'TEXTAREA'",
-                lambda result: self.keyboard.setVisible(result)
-            )
-        return super().eventFilter(obj, event)
-        
-    def showEvent(self, event):
-        super().showEvent(event)
-        # Ensure keyboard is properly positioned when widget is shown
-        if self.keyboard.isVisible():
-            self.keyboard.move(0, self.height() - self.keyboard.height())
-
     def closeEvent(self, event):
         # Properly cleanup web engine resources
         if self.web_view:
@@ -0,0 +1,114 @@
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtWebEngineCore import QWebEngineUrlScheme, QWebEngineUrlSchemeHandler, QWebEngineUrlRequestJob
+from src.tile_store import tile_store
+
+# puddle-tiles://tiles/<layer>/<z>/<x>/<y>.png and puddle-tiles://assets/<name>
+SCHEME = b"puddle-tiles"
+TILE_URL = "puddle-tiles://tiles/{layer}/{z}/{x}/{y}.png"
+ASSET_URL = "puddle-tiles://assets/{name}"
+
+# Downloads of misses run on their own small pool
+MAX_FETCHES = 4
+
+
+def register_scheme():
+    """Declare the scheme to QtWebEngine; must run before the QApplication exists."""
+    scheme = QWebEngineUrlScheme(SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+    # Secure so https pages may load from it, CORS so tiles can be read back by scripts
+    scheme.setFlags(QWebEngineUrlScheme.SecureScheme | QWebEngineUrlScheme.CorsEnabled)
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+
+class _FetchSignals(QObject):
+    done = pyqtSignal(int, object)
+
+
+class _FetchTask(QRunnable):
+    def __init__(self, token, fetch, signals):
+        super().__init__()
+        self.token = token
+        self.fetch = fetch
+        self.signals = signals
+
+    def run(self):
+        try:
+            result = self.fetch()
+        except Exception as e:
+            print(f"Tile fetch error: {e}")
+            result = None
+        self.signals.done.emit(self.token, result)
+
+
+class TileSchemeHandler(QWebEngineUrlSchemeHandler):
+    """Serves map tiles and Leaflet from the tile store.
+
+    Tiles in MBTiles or the disk cache are answered straight away with a
+    local read. Misses are downloaded on a worker pool into the cache and
+    answered when they arrive; when offline they fail at once so Leaflet
+    can keep the tile it had.
+    """
+
+    def __init__(self, store=None, parent=None):
+        super().__init__(parent)
+        self.store = store or tile_store()
+        self._jobs = {}
+        self._next_token = 0
+        self._signals = _FetchSignals(self)
+        self._signals.done.connect(self._on_fetched)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(MAX_FETCHES)
+
+    def requestStarted(self, job):
+        url = job.requestUrl()
+        parts = url.path().strip("/").split("/")
+        store = self.store
+        if url.host() == "tiles" and len(parts) == 4:
+            try:
+                layer, z, x, y = parts[0], int(parts[1]), int(parts[2]), int(parts[3].split(".")[0])
+            except ValueError:
+                job.fail(QWebEngineUrlRequestJob.UrlInvalid)
+                return
+            local = store.local_tile(layer, z, x, y)
+            fetch = lambda: store.fetch_tile(layer, z, x, y)
+        elif url.host() == "assets" and len(parts) == 1:
+            local = store.local_asset(parts[0])
+            fetch = lambda: store.fetch_asset(parts[0])
+        else:
+            job.fail(QWebEngineUrlRequestJob.UrlInvalid)
+            return
+        if local is not None:
+            self._reply(job, *local)
+        elif not store.online:
+            job.fail(QWebEngineUrlRequestJob.UrlNotFound)
+        else:
+            token = self._next_token
+            self._next_token += 1
+            self._jobs[token] = job
+            # The page may cancel the request before the download is done
+            job.destroyed.connect(lambda _=None, t=token: self._jobs.pop(t, None))
+            self._pool.start(_FetchTask(token, fetch, self._signals))
+
+    def _on_fetched(self, token, result):
+        job = self._jobs.pop(token, None)
+        if job is None:
+            return
+        if result is None:
+            job.fail(QWebEngineUrlRequestJob.RequestFailed)
+        else:
+            self._reply(job, *result)
+
+    @staticmethod
+    def _reply(job, data, mime):
+        # The buffer belongs to the job and goes away with it
+        buffer = QBuffer(job)
+        buffer.setData(QByteArray(data))
+        buffer.open(QIODevice.ReadOnly)
+        job.reply(mime.encode(), buffer)
+
+
+def install_tile_scheme(profile, store=None):
+    """Serve ``puddle-tiles://`` URLs for pages of ``profile``."""
+    handler = TileSchemeHandler(store, profile)
+    profile.installUrlSchemeHandler(SCHEME, handler)
+    return handler
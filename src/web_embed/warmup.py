@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from PyQt5.QtCore import QUrl
+from PyQt5.QtWebEngineWidgets import QWebEnginePage
+
+_warmup_page: Optional[QWebEnginePage] = None
+
+
+def prewarm_web_engine() -> None:
+    """Start QtWebEngine while the splash is up, before the first embed needs it.
+
+    Bringing up the Chromium browser process is the slow part of the first
+    embed. It is shared by every profile, so one throwaway about:blank page
+    on the default profile is enough. Embeds build their own views and
+    pages, usually on a named profile. The warm-up page is deleted once it
+    has loaded, so no renderer is kept around for it.
+    """
+    global _warmup_page
+    if _warmup_page is not None:
+        return
+    _warmup_page = QWebEnginePage()
+    _warmup_page.loadFinished.connect(lambda ok: _warmup_page.deleteLater())
+    _warmup_page.setUrl(QUrl('about:blank'))
@@ -1,8 +1,8 @@
 import os
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QFrame, QPushButton, QLabel, QSlider
-from PyQt5.QtCore import Qt, QSize, QTimer, QRectF
-from PyQt5.QtGui import QIcon, QPixmap, QPainter, QColor
-from PyQt5.QtSvg import QSvgRenderer
+from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtGui import QIcon, QColor
+from src import icon_cache
 from src.style.mini_player import (
     mini_player_container_style,
     mini_player_title_style,
@@ -11,15 +11,36 @@ from src.style.mini_player import (
     mini_player_slider_style,
 )
 
+_MEDIA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'Media')
+ICON_PREV = os.path.join(_MEDIA_DIR, 'previous.svg')
+ICON_NEXT = os.path.join(_MEDIA_DIR, 'next.svg')
+ICON_PLAY = os.path.join(_MEDIA_DIR, 'playing.svg')
+ICON_PAUSE = os.path.join(_MEDIA_DIR, 'pause.svg')
+MINI_PLAYER_ICONS = [ICON_PREV, ICON_NEXT, ICON_PLAY, ICON_PAUSE]
+MINI_PLAYER_ICON_SIZE = 20
+
 
 class YouTubeMusicMiniPlayer(QWidget):
 
     def __init__(self, yt_music_widget, parent=None):
         super().__init__(parent)
-        self.yt_music_widget = yt_music_widget
+        self.yt_music_widget = None
         self._build_ui()
         self._wire_controls()
-        self._start_status_timer()
+        if yt_music_widget is not None:
+            self.attach(yt_music_widget)
+
+    def attach(self, yt_music_widget):
+        """Start following a YouTube Music widget once it has been built."""
+        if self.yt_music_widget is yt_music_widget:
+            return
+        self.yt_music_widget = yt_music_widget
+        bridge = self._bridge()
+        if bridge is not None:
+            bridge.state_changed.connect(self._on_state_changed)
+            bridge.position_changed.connect(self._on_position_changed)
+            if bridge.title:
+                self._on_state_changed(bridge.title, bridge.playing, bridge.duration)
 
     def _build_ui(self):
         container = QFrame(self)
@@ -86,208 +107,50 @@ class YouTubeMusicMiniPlayer(QWidget):
         self.btn_playpause.clicked.connect(self.youtube_music_toggle)
         self.btn_next.clicked.connect(self.youtube_music_next)
 
-    def _start_status_timer(self):
-        self.status_timer = QTimer(self)
-        self.status_timer.setInterval(700)
-        self.status_timer.timeout.connect(self.update_youtube_music_status)
-        self.status_timer.start()
-
-    def _ytmusic_run_js(self, script: str, callback=None):
-        try:
-            page = self.yt_music_widget.web_view.page()
-            if callback:
-                page.runJavaScript(script, callback)
-            else:
-                page.runJavaScript(script)
-        except Exception as e:
-            print(f"YouTube Music JS error: {e}")
+    def _bridge(self):
+        if self.yt_music_widget is None:
+            return None
+        return getattr(self.yt_music_widget, 'now_playing', None)
 
     def youtube_music_prev(self):
-        js = (
-            "(function(){\n"
-            "  function api(){\n"
-            "    var app=document.querySelector('ytmusic-app');\n"
-            "    return app && (app.playerApi || app.playerApi_);\n"
-            "  }\n"
-            "  var p=api();\n"
-            "  if(p && p.previousTrack){ p.previousTrack(); return 'api'; }\n"
-            "  var btn = document.querySelector('ytmusic-player-bar #previous-button') ||\n"
-            "            document.querySelector('#left-controls #previous-button');\n"
-            "  if(btn){ btn.click(); return 'btn'; }\n"
-            "  // fallback to keyboard\n"
-            "  var e=new KeyboardEvent('keydown',{key:'P',shiftKey:true,bubbles:true,cancelable:true});\n"
-            "  document.body.dispatchEvent(e);\n"
-            "  return 'kbd';\n"
-            "})()"
-        )
-        self._ytmusic_run_js(js)
+        bridge = self._bridge()
+        if bridge is not None:
+            bridge.prev()
 
     def youtube_music_next(self):
-        js = (
-            "(function(){\n"
-            "  function api(){\n"
-            "    var app=document.querySelector('ytmusic-app');\n"
-            "    return app && (app.playerApi || app.playerApi_);\n"
-            "  }\n"
-            "  var p=api();\n"
-            "  if(p && p.nextTrack){ p.nextTrack(); return 'api'; }\n"
-            "  var btn = document.querySelector('ytmusic-player-bar #next-button') ||\n"
-            "            document.querySelector('#left-controls #next-button');\n"
-            "  if(btn){ btn.click(); return 'btn'; }\n"
-            "  // fallback to keyboard\n"
-            "  var e=new KeyboardEvent('keydown',{key:'N',shiftKey:true,bubbles:true,cancelable:true});\n"
-            "  document.body.dispatchEvent(e);\n"
-            "  return 'kbd';\n"
-            "})()"
-        )
-        self._ytmusic_run_js(js)
+        bridge = self._bridge()
+        if bridge is not None:
+            bridge.next()
 
     def youtube_music_toggle(self):
-        js = (
-            "(function(){\n"
-            "  function api(){\n"
-            "    var app=document.querySelector('ytmusic-app');\n"
-            "    return app && (app.playerApi || app.playerApi_);\n"
-            "  }\n"
-            "  var p=api();\n"
-            "  if(p && p.playPause){ p.playPause(); return 'api'; }\n"
-            "  var btn = document.querySelector('ytmusic-player-bar #play-pause-button') ||\n"
-            "            document.querySelector('#left-controls #play-pause-button');\n"
-            "  if(btn){ btn.click(); return 'btn'; }\n"
-            "  // fallback to keyboard\n"
-            "  var e=new KeyboardEvent('keydown',{key:' ',bubbles:true,cancelable:true});\n"
-            "  document.body.dispatchEvent(e);\n"
-            "  return 'kbd';\n"
-            "})()"
-        )
-        self._ytmusic_run_js(js)
-
-    def update_youtube_music_status(self):
-        js = (
-            "(function(){\n"
-            "  function api(){ var app=document.querySelector('ytmusic-app'); return app && (app.playerApi||app.playerApi_); }\n"
-            "  function getTitle(){\n"
-            "    var bar=document.querySelector('ytmusic-player-bar');\n"
-            "    var tEl = (bar && (bar.querySelector('.title') || bar.querySelector('#song-title'))) ||\n"
-            "              document.querySelector('ytmusic-player-page #header .title');\n"
-            "    var t = tEl ? tEl.textContent.trim() : (document.title || '').replace(/ - You\\u200b?Tube Music$/, '');\n"
-            "    return t;\n"
-            "  }\n"
-            "  function getState(){\n"
-            "    var btn = document.querySelector('ytmusic-player-bar #play-pause-button') ||\n"
-            "              document.querySelector('#left-controls #play-pause-button') ||\n"
-            "              document.querySelector('tp-yt-paper-icon-button#play-pause-button');\n"
-            "    if(!btn) return 'paused';\n"
-            "    var t = btn.getAttribute('title') || btn.getAttribute('aria-label') || '';\n"
-            "    return (/pause/i.test(t)) ? 'playing' : 'paused';\n"
-            "  }\n"
-            "  function getProgress(){\n"
-            "    var p=api(); var cur=0,dur=0;\n"
-            "    if(p){\n"
-            "      try{ if(p.getCurrentTime) cur=p.getCurrentTime(); }catch(e){}\n"
-            "      try{ if(p.getDuration) dur=p.getDuration(); }catch(e){}\n"
-            "      if((!cur||!dur) && p.getProgressState){ try{ var s=p.getProgressState(); if(s){cur=s.current||s.currentTime||0; dur=s.duration||s.total||0;} }catch(e){} }\n"
-            "    }\n"
-            "    if(!dur){ var a=document.querySelector('audio'); if(a){ cur=a.currentTime||0; dur=a.duration||0; } }\n"
-            "    return {cur:cur, dur:dur};\n"
-            "  }\n"
-            "  var pr=getProgress();\n"
-            "  return {title:getTitle(), state:getState(), cur:pr.cur, dur:pr.dur};\n"
-            "})()"
-        )
-
-        def _apply(status):
-            try:
-                title = ''
-                state = 'paused'
-                if isinstance(status, dict):
-                    title = (status.get('title') or '').strip()
-                    state = status.get('state') or 'paused'
-                else:
-                    title = (status or '').strip()
+        bridge = self._bridge()
+        if bridge is not None:
+            bridge.toggle()
 
-                if title.endswith(' - YouTube Music'):
-                    title = title[:-18]
-                if not title:
-                    title = '—'
-                self.lbl_now_playing.setText(title)
+    def _on_state_changed(self, title: str, playing: bool, duration: float):
+        self.lbl_now_playing.setText(title or '—')
+        self.btn_playpause.setIcon(self.icon_pause if playing else self.icon_play)
 
-                self.btn_playpause.setIcon(self.icon_pause if state == 'playing' else self.icon_play)
-
-                # Slider update
-                cur = float(status.get('cur') or 0)
-                dur = float(status.get('dur') or 0)
-                if not self._seeking and dur > 0:
-                    val = int(max(0, min(1000, (cur / dur) * 1000)))
-                    self.slider.setValue(val)
-            except Exception:
-                pass
-
-        self._ytmusic_run_js(js, _apply)
+    def _on_position_changed(self, position: float, duration: float):
+        if not self._seeking and duration > 0:
+            self.slider.setValue(int(max(0, min(1000, (position / duration) * 1000))))
 
     def _on_slider_moved(self, val: int):
         # Reserved for future preview display
         pass
 
     def _on_seek_released(self):
-        try:
-            val = self.slider.value()
-            def _seek_with_duration(d):
-                try:
-                    dur = float((d or {}).get('dur') or 0)
-                    if dur > 0:
-                        sec = max(0.0, min(dur, (val / 1000.0) * dur))
-                        js = (
-                            "(function(sec){\n"
-                            "  function api(){ var app=document.querySelector('ytmusic-app'); return app && (app.playerApi||app.playerApi_); }\n"
-                            "  var p=api();\n"
-                            "  if(p && p.seekTo){ p.seekTo(sec,true); return 'api.seekTo'; }\n"
-                            "  if(p && p.seek){ p.seek(sec); return 'api.seek'; }\n"
-                            "  var a=document.querySelector('audio'); if(a){ a.currentTime=sec; return 'audio'; }\n"
-                            "  return 'none';\n"
-                            "})(" + str(sec) + ")"
-                        )
-                        self._ytmusic_run_js(js)
-                finally:
-                    self._seeking = False
-
-            # Get duration quickly
-            status_js = (
-                "(function(){ var a=document.querySelector('audio'); var d=a&&a.duration||0;"
-                " var p=document.querySelector('ytmusic-app'); p=p&&(p.playerApi||p.playerApi_);"
-                " try{ if(p&&p.getDuration) d=p.getDuration(); }catch(e){} return {dur:d||0}; })()"
-            )
-            self._ytmusic_run_js(status_js, _seek_with_duration)
-        except Exception:
-            self._seeking = False
-
-
-    def _svg_icon(self, path: str, size: int = 20) -> QIcon:
-        mask = QPixmap(size, size)
-        mask.fill(Qt.transparent)
-        renderer = QSvgRenderer(path)
-        p = QPainter(mask)
-        try:
-            p.setRenderHint(QPainter.Antialiasing)
-            renderer.render(p, QRectF(0, 0, size, size))
-        finally:
-            p.end()
+        # The page knows the duration, so seeking is a single call
+        bridge = self._bridge()
+        if bridge is not None:
+            bridge.seek_fraction(self.slider.value() / 1000.0)
+        self._seeking = False
 
-        colored = QPixmap(size, size)
-        colored.fill(Qt.transparent)
-        p = QPainter(colored)
-        try:
-            p.fillRect(0, 0, size, size, QColor(255, 255, 255))
-            p.setCompositionMode(QPainter.CompositionMode_DestinationIn)
-            p.drawPixmap(0, 0, mask)
-        finally:
-            p.end()
-        return QIcon(colored)
+    def _svg_icon(self, path: str, size: int = MINI_PLAYER_ICON_SIZE) -> QIcon:
+        return icon_cache.icon(path, size, QColor(255, 255, 255))
 
     def _load_icons(self):
-        base_dir = os.path.dirname(os.path.dirname(__file__))
-        media_dir = os.path.join(base_dir, 'Media')
-        self.icon_prev = self._svg_icon(os.path.join(media_dir, 'previous.svg'))
-        self.icon_next = self._svg_icon(os.path.join(media_dir, 'next.svg'))
-        self.icon_play = self._svg_icon(os.path.join(media_dir, 'playing.svg'))
-        self.icon_pause = self._svg_icon(os.path.join(media_dir, 'pause.svg'))
+        self.icon_prev = self._svg_icon(ICON_PREV)
+        self.icon_next = self._svg_icon(ICON_NEXT)
+        self.icon_play = self._svg_icon(ICON_PLAY)
+        self.icon_pause = self._svg_icon(ICON_PAUSE)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+import sys, os, tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from src.web_embed.adblock_engine import (
+    AdblockMatcher, load_filter_lists, parse_rule,
+    TYPE_DOCUMENT, TYPE_IMAGE, TYPE_SCRIPT, TYPE_OTHER,
+)
+
+RULES = """
+[Adblock Plus 2.0]
+! comment
+##.ad-banner
+||ads.example.com^
+||tracker.net^$third-party
+/banner/*/img^$image
+&ad_type=
+@@||ads.example.com/allowed/*
+@@||trusted.org^$document
+|https://exact.com/ad.js|
+"""
+
+CASES = [
+    ("https://ads.example.com/x.js", TYPE_SCRIPT, "", True),
+    ("https://sub.ads.example.com/x.js", TYPE_SCRIPT, "", True),
+    ("https://notads.example.com/x.js", TYPE_SCRIPT, "", False),
+    ("https://ads.example.com/allowed/x.js", TYPE_SCRIPT, "", False),
+    ("https://tracker.net/p.gif", TYPE_IMAGE, "https://news.com/", True),
+    ("https://tracker.net/p.gif", TYPE_IMAGE, "https://tracker.net/", False),
+    ("https://x.com/banner/123/img?x", TYPE_IMAGE, "", True),
+    ("https://x.com/banner/123/img?x", TYPE_SCRIPT, "", False),
+    # ^ does not match '.', so this is not the rule's URL
+    ("https://x.com/banner/123/img.png", TYPE_IMAGE, "", False),
+    ("https://x.com/q?a=1&ad_type=video", TYPE_OTHER, "", True),
+    ("https://ads.example.com/x.js", TYPE_SCRIPT, "https://trusted.org/page", False),
+    ("https://ads.example.com/", TYPE_DOCUMENT, "", False),
+    ("https://exact.com/ad.js", TYPE_SCRIPT, "", True),
+    ("https://exact.com/ad.js?v=2", TYPE_SCRIPT, "", False),
+]
+
+
+def test_parse_rule():
+    assert parse_rule("! comment") is None
+    assert parse_rule("##.ad-banner") is None
+    rule = parse_rule("@@||trusted.org^$document")
+    assert rule.exception and rule.is_document_exception
+
+
+def test_matcher():
+    matcher = AdblockMatcher.from_rules(RULES.splitlines())
+    for url, rtype, page, expected in CASES:
+        assert matcher.should_block(url, first_party_url=page, resource_type=rtype) == expected, url
+
+
+def test_partial_domain_rules_are_not_whole_domains():
+    matcher = AdblockMatcher.from_rules(["||ads.", "||tracker.io"])
+    # A host that starts with "ads.", not the top-level domain "ads"
+    assert matcher.should_block("https://ads.example.com/x.js", resource_type=TYPE_SCRIPT)
+    assert not matcher.should_block("https://foo.ads/x", resource_type=TYPE_SCRIPT)
+    # Without ^ the rule goes on past the end of the domain
+    assert matcher.should_block("https://tracker.io.evil.com/p.gif", resource_type=TYPE_IMAGE)
+    assert matcher.should_block("https://tracker.io/p.gif", resource_type=TYPE_IMAGE)
+
+
+def test_cache_roundtrip():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "list.txt")
+        with open(path, "w") as f:
+            f.write(RULES)
+        cache_dir = os.path.join(tmp, "cache")
+        first = load_filter_lists([path], cache_dir)
+        assert len(os.listdir(cache_dir)) == 1
+        second = load_filter_lists([path], cache_dir)
+        assert len(os.listdir(cache_dir)) == 1
+        for url, rtype, page, expected in CASES:
+            assert second.should_block(url, first_party_url=page, resource_type=rtype) == expected, url
+        assert len(first) == len(second)
+
+
+if __name__ == "__main__":
+    test_parse_rule()
+    test_matcher()
+    test_partial_domain_rules_are_not_whole_domains()
+    test_cache_roundtrip()
+    print("adblock engine OK")
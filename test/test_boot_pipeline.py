@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+import sys, os, threading, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+import pytest
+from PyQt5.QtCore import QAbstractAnimation, QEventLoop, QTimer
+from PyQt5.QtWidgets import QApplication
+from src.boot_pipeline import BootPipeline
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+
+def _run(pipeline, timeout_ms=5000):
+    """Start the pipeline and spin the event loop until it has finished."""
+    loop = QEventLoop()
+    pipeline.finished.connect(loop.quit)
+    QTimer.singleShot(timeout_ms, loop.quit)
+    pipeline.start()
+    loop.exec_()
+    assert pipeline.is_finished
+    # Let the worker threads return before the pipeline and its pool are collected
+    pipeline._pool.waitForDone(timeout_ms)
+
+
+def test_stages_run_in_priority_order():
+    pipeline = BootPipeline()
+    ran, announced = [], []
+    pipeline.stage_finished.connect(lambda name, ms: announced.append(name))
+    pipeline.add_stage("gps", lambda: ran.append("gps"), priority=5)
+    # The first stage's worker is the slowest; nothing overtakes it
+    pipeline.add_stage("fonts", lambda fonts: ran.append("fonts"), priority=0,
+                       worker=lambda: time.sleep(0.1))
+    pipeline.add_stage("main_ui", lambda: ran.append("main_ui"), priority=3)
+    pipeline.add_stage("icons", lambda icons: ran.append("icons"), priority=1, worker=lambda: None)
+    _run(pipeline)
+    assert ran == announced == ["fonts", "icons", "main_ui", "gps"]
+
+
+def test_worker_results_are_handed_to_the_ui_thread():
+    pipeline = BootPipeline()
+    ui_thread = threading.get_ident()
+    seen = {}
+
+    def read():
+        seen["worker"] = threading.get_ident()
+        return b"font data"
+
+    def register(data):
+        seen["run"] = (threading.get_ident(), data)
+
+    def broken():
+        raise OSError("no such directory")
+
+    pipeline.add_stage("fonts", register, worker=read)
+    # A failed worker hands over None; later stages still run
+    pipeline.add_stage("icons", lambda icons: seen.setdefault("icons", icons), priority=1, worker=broken)
+    pipeline.add_stage("main_ui", lambda: seen.setdefault("main_ui", True), priority=2)
+    _run(pipeline)
+    assert seen["worker"] != ui_thread
+    assert seen["run"] == (ui_thread, b"font data")
+    assert seen["icons"] is None and seen["main_ui"]
+
+
+def test_timings_cover_every_stage():
+    pipeline = BootPipeline()
+    pipeline.add_stage("slow_worker", lambda _: None, priority=0, worker=lambda: time.sleep(0.05))
+    pipeline.add_stage("slow_ui", lambda: time.sleep(0.02), priority=1)
+    _run(pipeline)
+    (first, worker_ms, ui_ms, first_at), (second, _, second_ui_ms, second_at) = pipeline.timings()
+    assert (first, second) == ("slow_worker", "slow_ui")
+    assert worker_ms >= 45 and ui_ms < 20
+    assert second_ui_ms >= 18 and second_at >= first_at + second_ui_ms
+    # Without the splash everything runs on the spot, with the same timings
+    blocking = BootPipeline()
+    blocking.add_stage("slow_worker", lambda _: None, worker=lambda: time.sleep(0.05))
+    blocking.run_blocking()
+    assert blocking.is_finished and blocking.timings()[0][1] >= 45
+
+
+def test_splash_stays_up_until_the_pipeline_is_done():
+    pytest.importorskip("PyQt5.QtMultimedia", exc_type=ImportError)
+    from src.boot_animation import BootAnimation
+    pipeline = BootPipeline()
+    pipeline.add_stage("main_ui", lambda: time.sleep(0.05))
+    splash = BootAnimation()
+    splash.hold_until(pipeline.finished)
+    # Faded in before start-up is done: the splash waits
+    splash.on_fade_in_complete()
+    assert not hasattr(splash, "fade_animation")
+    _run(pipeline)
+    assert splash.fade_animation.state() == QAbstractAnimation.Running
+    # Ready before the fade in has finished: the fade out follows it at once
+    early = BootAnimation()
+    early.hold_until(pipeline.finished)
+    early.set_ready()
+    assert not hasattr(early, "fade_animation")
+    early.on_fade_in_complete()
+    assert early.fade_animation.state() == QAbstractAnimation.Running
+
+
+if __name__ == "__main__":
+    test_stages_run_in_priority_order()
+    test_worker_results_are_handed_to_the_ui_thread()
+    test_timings_cover_every_stage()
+    test_splash_stays_up_until_the_pipeline_is_done()
+    print("boot pipeline tests passed")
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt5.QtCore import QCoreApplication, QEvent
+from PyQt5.QtWidgets import QApplication, QLabel
+from src.clock_service import ClockService
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+
+def test_publishes_only_on_change():
+    service = ClockService()
+    seen = []
+    service.subscribe("%Y", seen.append)
+    assert len(seen) == 1
+    service.refresh()
+    service.refresh()
+    # The year did not change, so subscribers were not called again
+    assert len(seen) == 1
+
+
+def test_shared_format_and_owner_cleanup():
+    service = ClockService()
+    label = QLabel()
+    service.subscribe("%H:%M", label.setText, owner=label)
+    other = []
+    service.subscribe("%H:%M", other.append)
+    assert other == [label.text()]
+    label.deleteLater()
+    app.processEvents()
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    service.refresh()
+    assert list(service._subscribers.values())[0][1] == [other.append]
+
+
+if __name__ == "__main__":
+    test_publishes_only_on_change()
+    test_shared_format_and_owner_cleanup()
+    print("clock service OK")
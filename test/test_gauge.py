@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt5.QtWidgets import QApplication
+from src import gauge
+from src.gauge import GaugeSpec, GaugeWidget, SOC_SPEC, RPM_SPEC
+from src.speedometer import SpeedometerWidget
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+
+def test_static_layer_shared_between_gauges():
+    gauge.clear_static_cache()
+    gauges = [GaugeWidget(SOC_SPEC) for _ in range(3)] + [GaugeWidget(RPM_SPEC)]
+    for g in gauges:
+        g.resize(300, 300)
+        g.grab()
+    # One layer per distinct spec, whatever the number of gauges
+    assert len(gauge._static_cache) == 2
+    # An equal spec built separately hits the same entry
+    same = GaugeWidget(GaugeSpec(**SOC_SPEC.__dict__))
+    same.resize(300, 300)
+    same.grab()
+    assert len(gauge._static_cache) == 2
+
+
+def test_value_is_clamped_to_range():
+    g = GaugeWidget(GaugeSpec(min_value=-20, max_value=160, unit='°C'))
+    g.set_value(500)
+    assert g.value == 160
+    g.set_value(-100)
+    assert g.value == -20
+    assert g.value_text() == "-20 °C"
+
+
+def test_speedometer_api():
+    s = SpeedometerWidget()
+    s.set_speed(42.6)
+    s.set_power(1234.4)
+    assert s.speed == 43 and s.value_text() == "43 mph"
+    assert s.power == 1234 and s.secondary_text == "1234W"
+    s.set_speed(1000)
+    assert s.speed == 300
+
+
+if __name__ == "__main__":
+    test_static_layer_shared_between_gauges()
+    test_value_is_clamped_to_range()
+    test_speedometer_api()
+    print("gauge OK")
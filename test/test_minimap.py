@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+import sys, os
+from types import SimpleNamespace
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+import pytest
+# The minimap and the main window are web views; nothing to test without QtWebEngine
+pytest.importorskip("PyQt5.QtWebEngineWidgets", exc_type=ImportError)
+from PyQt5.QtWidgets import QApplication, QFrame, QStackedWidget, QVBoxLayout
+from src.screen_registry import ScreenRegistry
+from src.web_embed.mini_map import MiniMapWidget
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+
+def test_heading_alone_does_not_update_the_minimap():
+    minimap = MiniMapWidget()
+    minimap.position = (40.758, -73.9855, 0.0)
+    # The marker has no heading: turning on the spot is not a page call
+    minimap.set_position(40.758, -73.9855, 90.0)
+    assert minimap._pending is None and not minimap._flush_timer.isActive()
+    minimap.set_position(40.7581, -73.9855, 90.0)
+    assert minimap._pending == (40.7581, -73.9855, 90.0)
+
+
+def _main_ui():
+    """Just the parts of MainUI that show_map / show_minimap use."""
+    import main
+    stack = QStackedWidget()
+    maps = QFrame()
+    ui = SimpleNamespace(content_stack=stack, screens=ScreenRegistry(stack),
+                         minimap_container=QFrame())
+    ui.screens.register("Maps", lambda: maps)
+    ui.minimap = MiniMapWidget()
+    QVBoxLayout(ui.minimap_container).addWidget(ui.minimap)
+    for name in ("show_map", "show_minimap", "hide_minimap", "_hide_maps"):
+        setattr(ui, name, getattr(main.MainUI, name).__get__(ui))
+    return ui, maps
+
+
+def test_switching_screens_never_reparents_the_maps():
+    ui, maps = _main_ui()
+    ui.show_minimap()
+    assert not ui.screens.is_built("Maps") and not ui.minimap_container.isHidden()
+    for _ in range(2):
+        ui.show_map()
+        assert ui.content_stack.currentWidget() is maps and ui.minimap_container.isHidden()
+        ui._hide_maps()
+        ui.show_minimap()
+        # Both maps stay where they were built; only visibility changes
+        assert maps.parent() is ui.content_stack and ui.content_stack.count() == 1
+        assert ui.minimap.parent() is ui.minimap_container
+        assert not ui.minimap_container.isHidden() and maps.isHidden()
+
+
+if __name__ == "__main__":
+    test_heading_alone_does_not_update_the_minimap()
+    test_switching_screens_never_reparents_the_maps()
+    print("minimap tests passed")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+import sys, os, json, math, tempfile, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from src.navigation import Route, SegmentGrid, TurnByTurn
+from src.route_cache import RouteCache, decode_polyline, encode_polyline
+
+LAT0, LNG0 = 40.758, -73.9855
+M_LAT = 111194.9
+M_LNG = M_LAT * math.cos(math.radians(LAT0))
+
+
+def _pt(east, north):
+    return (LAT0 + north / M_LAT, LNG0 + east / M_LNG)
+
+
+def _l_route():
+    # 500 m east, then left and 300 m north, as the maps page sends it
+    east = [_pt(x, 0) for x in range(0, 501, 50)]
+    north = [_pt(500, y) for y in range(0, 301, 50)]
+    return Route.from_json(json.dumps({"steps": [
+        {"instruction": "Head east", "maneuver": "", "path": east},
+        {"instruction": "Turn left onto 5th Ave", "maneuver": "turn-left", "path": north},
+    ]}))
+
+
+def test_route_joins_step_paths():
+    route = _l_route()
+    assert len(route.path) == 11 + 6
+    assert [round(s.start_m) for s in route.steps] == [0, 500]
+    assert abs(route.length_m - 800) < 0.5
+    assert Route.from_json(json.dumps([_pt(0, 0), _pt(10, 0)])).steps[0].length_m > 9
+
+
+def test_progress_snaps_and_advances_steps():
+    nav = TurnByTurn(_l_route())
+    state = nav.update(*_pt(100, 8), 0.0)
+    assert state.step_index == 0 and not state.off_route
+    assert abs(state.distance_to_maneuver - 400) < 0.5 and abs(state.offset_m - 8) < 0.1
+    assert state.next_step.maneuver == "turn-left"
+    # GPS noise a few metres back does not move progress backwards
+    assert nav.update(*_pt(95, -5), 1.0).along_m == state.along_m
+    state = nav.update(*_pt(503, 120), 2.0)
+    assert state.step_index == 1 and state.next_step is None
+    assert abs(state.remaining_m - 180) < 0.5
+    assert nav.update(*_pt(500, 290), 3.0).arrived
+
+
+def test_off_route_needs_distance_and_time():
+    nav = TurnByTurn(_l_route())
+    nav.update(*_pt(100, 0), 0.0)
+    # A brief excursion (a bad fix, a parking lot) is not leaving the route
+    assert not nav.update(*_pt(200, 60), 1.0).off_route
+    assert not nav.update(*_pt(250, 0), 2.0).off_route
+    for t in (3.0, 4.0, 5.0, 6.0):
+        state = nav.update(*_pt(300, 80), t)
+    assert state.off_route and state.offset_m > 40
+    # Back on only once clearly on the road again
+    assert nav.update(*_pt(320, 30), 7.0).off_route
+    assert not nav.update(*_pt(340, 10), 8.0).off_route
+
+
+def test_out_and_back_keeps_the_current_pass():
+    out = [_pt(x, 0) for x in range(0, 1001, 100)]
+    back = [_pt(x, 0) for x in range(1000, -1, -100)]
+    nav = TurnByTurn(Route(out + back[1:], [("Out", "", 0), ("U-turn", "uturn-left", 10)]))
+    # The same spot is on both passes; on the way out it is the first one
+    assert abs(nav.update(*_pt(300, 2), 0.0).along_m - 300) < 1
+    assert abs(nav.update(*_pt(700, 2), 1.0).along_m - 700) < 1
+    assert nav.update(*_pt(1000, 0), 2.0).step_index == 1
+    assert abs(nav.update(*_pt(700, 2), 3.0).along_m - 1300) < 1
+
+
+def test_update_is_cheap():
+    nav = TurnByTurn(_l_route())
+    fixes = [_pt(x * 0.5, 3) for x in range(1000)]
+    start = time.perf_counter()
+    for i, (lat, lng) in enumerate(fixes):
+        nav.update(lat, lng, i * 0.1)
+    per_fix = (time.perf_counter() - start) / len(fixes)
+    assert per_fix < 1e-3
+
+
+def test_grid_indexes_a_band_along_diagonal_segments():
+    # One 10 km diagonal segment: its bounding box would be 200 x 200 cells
+    grid = SegmentGrid([(0.0, 0.0), (10000.0, 7000.0)], cell_m=50.0)
+    assert len(grid.cells) < 2000
+    for f in (0.0, 0.13, 0.5, 0.77, 1.0):
+        x, y = 10000.0 * f, 7000.0 * f
+        # Anything within a cell size of the line finds it
+        for ox, oy in ((0, 0), (35, -35), (-49, 0), (0, 49)):
+            assert grid.near(x + ox, y + oy) == [0]
+    assert grid.near(5000.0, 0.0) == []
+
+
+def test_polyline_codec():
+    points = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+    assert encode_polyline(points) == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+    assert decode_polyline(encode_polyline(points)) == points
+
+
+def test_route_cache_quantizes_expires_and_counts():
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "routes.sqlite")
+        cache = RouteCache(path, ttl=30 * 86400, refresh_after=86400)
+        home, office = _pt(0, 0), _pt(5000, 3000)
+        steps = json.loads(json.dumps({"steps": [
+            {"instruction": "Head east", "maneuver": "", "distance": 500, "path": [_pt(x, 0) for x in (0, 250, 500)]},
+            {"instruction": "Turn left", "maneuver": "turn-left", "distance": 300, "path": [_pt(500, 0), _pt(500, 300)]},
+        ]}))
+        assert cache.get(home, office, now=0) is None
+        cache.put(home, office, steps, now=0)
+        # Leaving from a few metres away is the same trip
+        route, stale = cache.get(_pt(20, 30), _pt(5030, 2980), now=3600)
+        assert not stale and [s["maneuver"] for s in route["steps"]] == ["", "turn-left"]
+        assert route["steps"][0]["path"][-1] == tuple(round(c, 5) for c in _pt(500, 0))
+        assert len(Route.from_json(json.dumps(route)).path) == 4
+        assert cache.get(home, _pt(9000, 0), now=3600) is None
+        # Old entries are still served, flagged for a refresh, until the TTL
+        assert cache.get(home, office, now=2 * 86400)[1]
+        assert cache.get(home, office, now=31 * 86400) is None
+        assert cache.stats == {"hits": 1, "stale": 1, "misses": 3, "stored": 1}
+        cache.close()
+        # The counters survive a restart; expired routes do not
+        reopened = RouteCache(path, ttl=30 * 86400)
+        assert reopened.stats["misses"] == 3 and len(reopened) == 0
+        reopened.close()
+
+
+if __name__ == "__main__":
+    test_route_joins_step_paths()
+    test_progress_snaps_and_advances_steps()
+    test_off_route_needs_distance_and_time()
+    test_out_and_back_keeps_the_current_pass()
+    test_update_is_cheap()
+    test_grid_indexes_a_band_along_diagonal_segments()
+    test_polyline_codec()
+    test_route_cache_quantizes_expires_and_counts()
+    print("navigation tests passed")
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+
+import sys, os, socket, tempfile, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+import numpy as np
+from src.telemetry.ring import RingBuffer, SAMPLE_DTYPE
+from src.telemetry.sources import ReplaySource, UDPSource, load_candump, parse_slcan, simulate_frames
+from src.telemetry.engine import TelemetryEngine
+from src.telemetry.dbc import DBCDecoder, load_decoder, parse_dbc
+from src.telemetry.simulator import write_candump
+from src.telemetry.lttb import lttb
+from src.telemetry.trip import RunningStats, TripComputer, WindowedSum
+from src.telemetry.history import HistoryStore
+from src.telemetry.recorder import LogReplaySource, TelemetryLog, TelemetryRecorder, index_path
+from src.telemetry.alerts import AlertMonitor, AlertRule, AlertRules, load_rules
+from src.telemetry.shared import SharedSnapshot
+from src.telemetry.gps import Fix, GpsTracker, NMEAParser, NMEAReplaySource, PositionFilter
+from src.telemetry.feed import PositionFeed
+
+
+def test_ring_wraps_and_reader_catches_up():
+    ring = RingBuffer(8, SAMPLE_DTYPE)
+    ring.push_columns(t=np.arange(5.0), v=np.arange(5.0))
+    records, seq = ring.read_since(0)
+    assert list(records['v']) == [0, 1, 2, 3, 4] and seq == 5
+    ring.push_columns(t=np.arange(5.0, 20.0), v=np.arange(5.0, 20.0))
+    # The reader fell behind by more than the capacity: only the last 8 are left
+    records, seq = ring.read_since(seq)
+    assert list(records['v']) == list(range(12, 20)) and seq == 20
+    assert ring.latest('v') == 19
+    assert ring.mean_since(18, 'v') == 18.5
+
+
+def test_decoder_round_trips_simulated_frames():
+    t = np.linspace(0, 60, 50)
+    decoded = load_decoder()(simulate_frames(t))
+    speed_t, speed = decoded['speed']
+    assert np.array_equal(speed_t, t)
+    expected = np.clip(35 + 30 * np.sin(t / 20.0) + 8 * np.sin(t / 3.1), 0, None)
+    assert np.allclose(speed, expected, atol=0.01)
+    assert set(decoded) == {'speed', 'power', 'soc'}
+
+
+TEST_DBC = """
+BO_ 2566844926 Inverter: 8 VCU
+ SG_ page M : 0|4@1+ (1,0) [0|15] "" DASH
+ SG_ motor_temp m0 : 8|12@1- (0.1,-40) [-40|200] "degC" DASH
+ SG_ current m1 : 15|16@0- (0.05,0) [-1600|1600] "A" DASH
+ SG_ torque : 39|10@0+ (1,0) [0|1023] "Nm" DASH
+"""
+
+
+def test_dbc_intel_motorola_signed_and_multiplexed():
+    messages = parse_dbc(TEST_DBC)
+    frame_id = 2566844926 & 0x1FFFFFFF
+    assert list(messages) == [frame_id]
+    frames = np.zeros(2, simulate_frames(np.zeros(1)).dtype)
+    frames['id'] = frame_id
+    frames['t'] = [1.0, 2.0]
+    # page 0: motor_temp = -5 raw (-> -40.5 degC), 12 bit Intel at bit 8
+    raw_temp = (-5) & 0xFFF
+    frames['data'][0, 0] = 0
+    frames['data'][0, 1] = raw_temp & 0xFF
+    frames['data'][0, 2] = raw_temp >> 8
+    # page 1: current = -200 raw (-> -10 A), 16 bit Motorola starting at bit 15
+    raw_current = (-200) & 0xFFFF
+    frames['data'][1, 0] = 1
+    frames['data'][1, 1] = raw_current >> 8
+    frames['data'][1, 2] = raw_current & 0xFF
+    # torque = 600, 10 bit Motorola with MSB at bit 39 (byte 4 bit 7)
+    frames['data'][:, 4] = 600 >> 2
+    frames['data'][:, 5] = (600 & 0x3) << 6
+    decoded = DBCDecoder(messages)(frames)
+    assert list(decoded['motor_temp'][0]) == [1.0]
+    assert np.isclose(decoded['motor_temp'][1][0], -40.5)
+    assert list(decoded['current'][0]) == [2.0]
+    assert np.isclose(decoded['current'][1][0], -10.0)
+    assert list(decoded['torque'][1]) == [600, 600]
+    records = DBCDecoder(messages).decode_messages(frames)['Inverter']
+    assert np.isnan(records['current'][0]) and np.isnan(records['motor_temp'][1])
+
+
+def test_slcan_lines():
+    assert parse_slcan(b't1002E803') == (0x100, b'\xe8\x03')
+    assert parse_slcan(b'T000001018AABBCCDD00112233') == (0x101, bytes.fromhex('AABBCCDD00112233'))
+    assert parse_slcan(b'z') is None
+
+
+def test_udp_keeps_frames_that_overflow_a_batch():
+    source = UDPSource('127.0.0.1', 0, max_batch=8)
+    source.open()
+    try:
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        address = source._sock.getsockname()
+        frames = simulate_frames(np.arange(10.0))     # 30 frames
+        sender.sendto(frames[:5].tobytes(), address)
+        sender.sendto(frames[5:].tobytes(), address)
+        sender.close()
+        received = []
+        while sum(map(len, received)) < len(frames):
+            batch = source.read(1.0)
+            assert len(batch) and len(batch) <= 8
+            received.append(batch.copy())
+        assert np.array_equal(np.concatenate(received), frames)
+    finally:
+        source.close()
+
+
+def test_candump_replay_feeds_engine():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'trip.log')
+        count = write_candump(path, seconds=2, rate_hz=50)
+        frames = load_candump(path)
+    assert len(frames) == count == 300
+    engine = TelemetryEngine(ReplaySource(frames, rate=0, loop=False))
+    engine.source.open()
+    while not engine.source.finished:
+        engine.process(engine.source.read())
+    assert engine.frames.written == 300
+    assert engine.channel('speed').written == 100
+    assert 0 < engine.channel('soc').latest('v') <= 100
+
+
+def test_recorder_round_trip_and_replay():
+    frames = simulate_frames(1000.0 + np.arange(3000) / 100.0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'trip.ptlog')
+        recorder = TelemetryRecorder(path, chunk_frames=1000, flush_interval=float('inf'))
+        for batch in np.array_split(frames, 7):
+            recorder.write(batch)
+        recorder.close()
+        assert recorder.bytes_written < frames.nbytes / 2
+
+        log = TelemetryLog(path)
+        assert len(log) == 9000 and len(log.index) == 9
+        assert np.array_equal(log.read()['data'], frames['data'])
+        assert np.allclose(log.read()['t'], frames['t'], atol=1e-6)
+        window = log.read(1010.0, 1012.0)
+        assert len(window) == 201 * 3 and window['t'].min() >= 1010.0
+        log.close()
+
+        # The index is rebuilt from the log if it goes missing
+        os.remove(index_path(path))
+        log = TelemetryLog(path)
+        assert len(log.index) == 9
+        log.close()
+
+        engine = TelemetryEngine(LogReplaySource(path, rate=0, restamp=False))
+        engine.source.open()
+        while not engine.source.finished:
+            engine.process(engine.source.read())
+        engine.source.close()
+        assert engine.frames.written == 9000
+        assert abs(engine.channel('speed').latest('t') - frames['t'][-1]) < 1e-5
+
+
+def test_recorder_survives_clock_steps():
+    frames = simulate_frames(np.array([1000.0, 1001.0, 999.5, 999.6, 6000.0]))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'trip.ptlog')
+        recorder = TelemetryRecorder(path, flush_interval=float('inf'))
+        # The step back lands inside one batch, the big jump in the next
+        recorder.write(frames[:12])
+        recorder.write(frames[12:])
+        recorder.close()
+        log = TelemetryLog(path)
+        assert np.allclose(log.read()['t'], frames['t'], atol=1e-6)
+        assert list(log.index['count']) == [6, 6, 3]
+        log.close()
+
+        # Chunks out of time order are still found by time
+        path = os.path.join(tmp, 'stepped.ptlog')
+        recorder = TelemetryRecorder(path, flush_interval=float('inf'))
+        runs = [simulate_frames(np.arange(start, start + 4.0)) for start in (1000.0, 500.0, 504.0)]
+        for run in runs:
+            recorder.write(run)
+            recorder.flush()
+        recorder.close()
+        log = TelemetryLog(path)
+        assert len(log.index) == 3 and log.time_range == (500.0, 1003.0)
+        assert np.array_equal(log.read(1000, 1003), runs[0])
+        assert np.array_equal(log.read(502, 505)['t'], np.repeat([502.0, 503.0, 504.0, 505.0], 3))
+        log.close()
+        # Replay keeps the recorded pace across the step instead of waiting for it
+        replay = LogReplaySource(path, rate=100.0, restamp=False)
+        replay.open()
+        got, deadline = [], time.monotonic() + 2.0
+        while not replay.finished:
+            assert time.monotonic() < deadline
+            got.append(replay.read(0.01).copy())
+        replay.close()
+        assert np.array_equal(np.concatenate(got), np.concatenate(runs))
+
+
+def test_history_queries_raw_bucketed_and_summarised():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(tmp, chunk_samples=500, flush_interval=float('inf'))
+        # Three hours at 10 Hz, straddling partitions, value = minutes since start
+        t = 7200.0 + np.arange(3 * 36000) / 10.0
+        v = ((t - 7200.0) / 60.0).astype(np.float32)
+        for i in range(0, len(t), 777):
+            store.append('speed', t[i:i + 777], v[i:i + 777])
+        assert len(os.listdir(os.path.join(tmp, 'speed'))) == 2 * 3 + 1
+
+        # Short window: the samples themselves
+        qt, qv = store.query('speed', 9000.0, 9010.0)
+        assert np.array_equal(qt, t[(t >= 9000) & (t <= 9010)])
+
+        # Longer window: bucket means from raw samples
+        qt, qv = store.query('speed', 7200.0, 7200.0 + 3600, max_points=60)
+        assert len(qt) == 60 and np.allclose(qv, np.arange(60) + 0.5, atol=0.01)
+
+        # Whole trip: answered from chunk summaries, still close to the truth
+        qt, qv = store.query('speed', 0.0, 7200.0 + 3 * 3600, max_points=20)
+        assert np.allclose(qv, (qt - 7200.0) / 60.0, atol=1.0)
+
+        # Unflushed samples are visible and survive a flush
+        last = t[-1] + 0.1
+        store.append('speed', np.array([last]), np.array([42.0], np.float32))
+        assert store.query('speed', last - 1, last)[1][-1] == 42.0
+        store.flush()
+        assert store.query('speed', last - 1, last)[1][-1] == 42.0
+        assert store.summaries('speed')['count'].sum() == len(t) + 1
+
+
+def test_lttb_keeps_spikes_and_endpoints():
+    x = np.arange(10000.0)
+    y = np.sin(x / 500.0)
+    y[1234], y[8765] = 25.0, -25.0
+    for n_out in (100, 2000):  # with and without min/max preselection
+        keep = lttb(x, y, n_out)
+        assert len(keep) == n_out and keep[0] == 0 and keep[-1] == len(x) - 1
+        assert np.all(np.diff(keep) > 0)
+        assert 1234 in keep and 8765 in keep
+    assert list(lttb(x[:5], y[:5], 10)) == [0, 1, 2, 3, 4]
+
+
+def test_running_stats_match_numpy():
+    values = np.random.default_rng(1).normal(40, 12, 5000)
+    stats = RunningStats()
+    for batch in np.array_split(values, 37):
+        stats.update(batch)
+    assert np.isclose(stats.mean, values.mean()) and np.isclose(stats.variance, values.var(ddof=1))
+    assert stats.max == values.max()
+
+
+def test_windowed_sum_drops_old_bins():
+    window = WindowedSum(seconds=60, bin_seconds=5)
+    window.add(np.arange(0.0, 60.0), np.ones(60))
+    assert window.total == 60
+    window.add(np.array([90.0]), np.array([1.0]))
+    # Twelve 5 s bins ending with the one holding t=90: t >= 35 is kept
+    assert window.total == 1 + 25
+
+
+def test_trip_computer_integrates_in_batches():
+    trip = TripComputer(battery_kwh=50)
+    t = np.arange(0.0, 3600.0, 0.1)
+    speed = np.where(t < 600, 0.0, 60.0).astype(np.float32)
+    power = np.where(t < 600, 500.0, 15000.0).astype(np.float32)
+    for lo in range(0, len(t), 250):
+        trip.on_samples('speed', t[lo:lo + 250], speed[lo:lo + 250])
+        trip.on_samples('power', t[lo:lo + 250], power[lo:lo + 250])
+    trip.on_samples('soc', t[-1:], np.array([80.0], np.float32))
+    snap = trip.snapshot()
+    assert abs(snap['distance_mi'] - 50.0) < 0.01
+    assert abs(snap['idle_s'] - 600) < 0.2 and abs(snap['avg_speed'] - 60) < 0.1
+    assert abs(snap['recent_wh_per_mi'] - 250) < 0.1
+    assert abs(snap['range_mi'] - 0.8 * 50000 / 250) < 1
+
+
+def test_alert_hysteresis_and_debounce_across_batches():
+    rules = AlertRules([AlertRule.from_dict(
+        {"name": "over", "channel": "speed", "above": 70, "clear_below": 65,
+         "raise_after": 1.0, "clear_after": 0.5})])
+    t = np.arange(0, 6, 0.25)
+    # Up past 70 at t=1, dips to 68 (inside the hysteresis band) at t=3, drops below 65 at t=4
+    v = np.where(t < 1, 60, np.where(t < 3, 75, np.where(t < 4, 68, 50))).astype(np.float32)
+    events = []
+    for i in range(0, len(t), 5):
+        events += rules.evaluate("speed", t[i:i + 5], v[i:i + 5])
+    assert [(e.active, e.t) for e in events] == [(True, 2.0), (False, 4.5)]
+    assert rules.active == {}
+    # A spike shorter than the debounce window never raises
+    assert rules.evaluate("speed", np.array([10.0, 10.5, 11.0]), np.array([90, 90, 60], np.float32)) == []
+
+
+def test_alert_monitor_reads_rings_and_flags_stale_channels():
+    rules = [AlertRule.from_dict(d) for d in (
+        {"name": "low", "channel": "soc", "below": 15, "clear_above": 17},
+        {"name": "stale", "channel": "soc", "stale_after": 2.0})]
+    engine = TelemetryEngine(ReplaySource(simulate_frames(np.zeros(1))))
+    monitor = AlertMonitor(engine, rules)
+    seen = []
+    monitor.changed.connect(seen.append)
+    ring = engine.channel("soc")
+    ring.push_columns(t=np.array([100.0, 101.0]), v=np.array([20, 14], np.float32))
+    events = monitor.evaluate(now=101.5)
+    assert [(e.rule.name, e.active) for e in events] == [("low", True)]
+    assert seen == [events]
+    assert monitor.evaluate(now=104.0)[0].rule.name == "stale"
+    assert sorted(e.rule.name for e in monitor.active) == ["low", "stale"]
+    ring.push_columns(t=np.array([104.5]), v=np.array([18], np.float32))
+    assert {(e.rule.name, e.active) for e in monitor.evaluate(now=104.6)} == {("low", False), ("stale", False)}
+    # The bundled rules load and compile
+    assert AlertRules(load_rules()).channels
+
+
+def test_shared_snapshot_reads_are_consistent():
+    import subprocess
+    writer = SharedSnapshot(f"puddle-test-{os.getpid()}", create=True)
+    reader = SharedSnapshot(writer.name)
+    try:
+        assert np.isnan(reader.read()['soc'])
+        # A writer in another process, as with the cluster
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        code = ("from src.telemetry.shared import SharedSnapshot\n"
+                f"s = SharedSnapshot({writer.name!r})\n"
+                "for i in range(1, 50001): s.write(t=float(i), speed=float(i), power=float(i))\n"
+                "s.close()\n")
+        proc = subprocess.Popen([sys.executable, "-c", code], cwd=root)
+        reads = 0
+        while proc.poll() is None:
+            record = reader.read()
+            if record is not None:
+                # Never a mix of two writes
+                assert record['speed'] == record['power'] == record['t']
+                reads += 1
+        assert proc.returncode == 0
+        assert reads and reader.read()['updates'] == 50000
+    finally:
+        reader.close()
+        writer.close()
+
+def _nmea(body):
+    checksum = 0
+    for ch in body:
+        checksum ^= ord(ch)
+    return f"${body}*{checksum:02X}"
+
+
+def test_nmea_rmc_gga_and_checksums():
+    parser = NMEAParser()
+    gga = _nmea("GPGGA,123519.00,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,")
+    rmc = _nmea("GPRMC,123519.00,A,4807.038,N,01131.000,E,022.4,084.4,230394,003.1,W")
+    # A receiver without RMC still gets fixes from GGA
+    fix = parser.feed(gga)
+    assert abs(fix.lat - 48.1173) < 1e-6 and abs(fix.lng - 11.516667) < 1e-6 and fix.hdop == 0.9
+    fix = parser.feed(rmc)
+    assert abs(fix.speed - 22.4 * 0.514444) < 1e-6 and fix.course == 84.4 and fix.hdop == 0.9
+    assert fix.t % 86400 == 12 * 3600 + 35 * 60 + 19
+    # Once RMC is seen GGA only updates the HDOP
+    assert parser.feed(gga) is None
+    assert parser.feed(rmc[:-1] + "0") is None
+    assert parser.feed(_nmea("GPRMC,123520.00,V,,,,,,,230394,,")) is None
+
+
+def test_position_filter_smooths_and_dead_reckons():
+    rng = np.random.default_rng(1)
+    kf = PositionFilter()
+    # 15 m/s due east, 1 Hz fixes with ~4 m of noise
+    lat0, lng0 = 40.758, -73.9855
+    m_per_deg_lng = 111195.0 * np.cos(np.radians(lat0))
+    errors = []
+    for i in range(30):
+        x = 15.0 * i
+        noise = rng.normal(0, 4.0, 2)
+        kf.update(Fix(float(i), lat0 + noise[1] / 111195.0, lng0 + (x + noise[0]) / m_per_deg_lng,
+                      15.0 + rng.normal(0, 0.3), 90.0 + rng.normal(0, 2)))
+        lat, lng, _ = kf.predict(float(i))
+        errors.append(np.hypot((lat - lat0) * 111195.0, (lng - lng0) * m_per_deg_lng - x))
+    assert np.mean(errors[10:]) < 3.0
+    assert abs(kf.heading - 90) < 2 and abs(kf.speed - 15) < 0.5
+    # Half a second after the last fix the car is 7.5 m further on
+    _, lng_now, _ = kf.predict(29.0)
+    _, lng_later, _ = kf.predict(29.5)
+    assert abs((lng_later - lng_now) * m_per_deg_lng - 7.5) < 0.5
+    # ...but not forever
+    assert kf.predict(60.0) == kf.predict(40.0)
+
+
+def test_nmea_replay_drives_position_feed():
+    fixes = [Fix(100.0 + i, 40.758, -73.9855 + i * 1e-4, 8.4, 90.0, 1.0) for i in range(3)]
+    tracker = GpsTracker(NMEAReplaySource(fixes, rate=0))
+    tracker.source.open()
+    tracker.process(tracker.source.read())
+    assert tracker.fixes == 3
+    pushed = []
+    feed = PositionFeed(tracker)
+    feed.bind(lambda lat, lng, heading: pushed.append((lat, lng, heading)))
+    t = tracker.last_fix_at
+    feed.poll(t)
+    feed.poll(t + 0.001)     # a millimetre: not worth a call
+    feed.poll(t + 0.1)
+    assert len(pushed) == 2 and pushed[1][1] > pushed[0][1]
+    assert abs(pushed[1][2] - 90) < 1
+
+
+if __name__ == "__main__":
+    test_ring_wraps_and_reader_catches_up()
+    test_decoder_round_trips_simulated_frames()
+    test_dbc_intel_motorola_signed_and_multiplexed()
+    test_slcan_lines()
+    test_udp_keeps_frames_that_overflow_a_batch()
+    test_candump_replay_feeds_engine()
+    test_recorder_round_trip_and_replay()
+    test_recorder_survives_clock_steps()
+    test_history_queries_raw_bucketed_and_summarised()
+    test_lttb_keeps_spikes_and_endpoints()
+    test_running_stats_match_numpy()
+    test_windowed_sum_drops_old_bins()
+    test_trip_computer_integrates_in_batches()
+    test_alert_hysteresis_and_debounce_across_batches()
+    test_alert_monitor_reads_rings_and_flags_stale_channels()
+    test_shared_snapshot_reads_are_consistent()
+    test_nmea_rmc_gga_and_checksums()
+    test_position_filter_smooths_and_dead_reckons()
+    test_nmea_replay_drives_position_feed()
+    print("telemetry tests passed")
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+
+import sys, os, sqlite3, tempfile, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from src.tile_store import MBTiles, TileCache, TileStore
+from src.tile_prefetch import TilePrefetcher, corridor_tiles, prefetch_allowed, tile_xy
+
+
+def _write_mbtiles(path, tiles):
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE metadata (name TEXT, value TEXT)")
+    db.execute("CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB)")
+    db.executemany("INSERT INTO metadata VALUES (?, ?)", [("format", "png"), ("minzoom", "0"), ("maxzoom", "16")])
+    db.executemany("INSERT INTO tiles VALUES (?, ?, ?, ?)", tiles)
+    db.commit()
+    db.close()
+
+
+def test_mbtiles_rows_are_flipped():
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "city.mbtiles")
+        # z=2, x=1, XYZ y=0 is TMS row 3
+        _write_mbtiles(path, [(2, 1, 3, b"top")])
+        tiles = MBTiles(path)
+        assert tiles.get(2, 1, 0) == b"top"
+        assert tiles.get(2, 1, 3) is None
+        assert tiles.get(17, 1, 0) is None
+        tiles.close()
+
+
+def test_cache_is_write_back_lru():
+    with tempfile.TemporaryDirectory() as root:
+        cache = TileCache(root, max_bytes=30, flush_interval=60)
+        cache.put("osm/1/0/0", b"a" * 10)
+        cache.put("osm/1/0/1", b"b" * 10)
+        # Served from memory before anything is on disk
+        assert cache.get("osm/1/0/0") == b"a" * 10
+        assert not os.path.exists(os.path.join(root, "osm/1/0/0"))
+        cache.flush()
+        assert open(os.path.join(root, "osm/1/0/0"), "rb").read() == b"a" * 10
+        # 0/0 was read last, so 0/1 is the one to go
+        cache.put("osm/1/1/0", b"c" * 10)
+        cache.put("osm/1/1/1", b"d" * 10)
+        assert "osm/1/0/1" not in cache and "osm/1/0/0" in cache
+        assert not os.path.exists(os.path.join(root, "osm/1/0/1"))
+        assert cache.total_bytes == 30
+        cache.close()
+        # The LRU order comes back from the file times
+        os.utime(os.path.join(root, "osm/1/1/0"), (time.time() - 100,) * 2)
+        reopened = TileCache(root, max_bytes=30)
+        assert len(reopened) == 3 and next(iter(reopened._index)) == "osm/1/1/0"
+
+
+def test_store_prefers_mbtiles_then_cache_then_network():
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "city.mbtiles")
+        _write_mbtiles(path, [(3, 2, 7 - 4, b"offline")])
+        fetched = []
+
+        def fetch(url):
+            fetched.append(url)
+            return b"online"
+
+        store = TileStore(TileCache(os.path.join(root, "cache"), 1 << 20), {"osm": [MBTiles(path)]}, fetch=fetch)
+        assert store.tile("osm", 3, 2, 4) == (b"offline", "image/png")
+        assert store.local_tile("osm", 3, 2, 5) is None
+        assert store.tile("osm", 3, 2, 5) == (b"online", "image/png")
+        assert fetched == ["https://tile.openstreetmap.org/3/2/5.png"]
+        # Second time it is a local read
+        assert store.tile("osm", 3, 2, 5) == (b"online", "image/png")
+        assert len(fetched) == 1 and store.stats["cache"] == 1
+        store.online = False
+        assert store.tile("osm", 3, 2, 6) is None
+        store.close()
+
+
+def test_corridor_covers_route_nearest_first():
+    # About 3 km due east in Manhattan
+    route = [(40.758, -73.9855), (40.758, -73.95)]
+    tiles = corridor_tiles(route, zooms=(16,), buffer_m=0)
+    assert len(tiles) == len(set(tiles))
+    fx, fy = tile_xy([40.758, 40.758], [-73.9855, -73.95], 16)
+    xs = [x for _, x, _ in tiles]
+    # Every column between the ends, in driving order, on one row
+    assert xs == list(range(int(fx[0]), int(fx[1]) + 1))
+    assert {y for _, _, y in tiles} == {int(fy[0])}
+    wide = corridor_tiles(route, zooms=(15, 16), buffer_m=300)
+    assert set(tiles) < set(wide) and wide[0][0] == 15
+    assert corridor_tiles([]) == []
+
+
+def test_prefetcher_skips_present_tiles_and_yields_to_the_map():
+    with tempfile.TemporaryDirectory() as root:
+        fetched = []
+        store = TileStore(TileCache(root, 1 << 20), fetch=lambda url: fetched.append(url) or b"tile")
+        route = [(40.758, -73.9855), (40.758, -73.97)]
+        tiles = corridor_tiles(route, zooms=(16,), buffer_m=0)
+        z, x, y = tiles[0]
+        store.cache.put(store.tile_key("osm", z, x, y), b"old")
+        # The map is busy: nothing happens until it has been quiet for a while
+        store.foreground_at = time.monotonic()
+        prefetcher = TilePrefetcher(store, zooms=(16,), metered=lambda: False, enabled=True)
+        assert prefetcher.set_route(route) >= len(tiles)
+        time.sleep(0.3)
+        assert fetched == []
+        deadline = time.monotonic() + 5
+        while prefetcher.pending or sum(prefetcher.stats[k] for k in ("fetched", "present", "failed")) < prefetcher.stats["queued"]:
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        assert prefetcher.stats["present"] >= 1 and prefetcher.stats["failed"] == 0
+        assert len(fetched) == prefetcher.stats["fetched"]
+        assert f"https://tile.openstreetmap.org/{z}/{x}/{y}.png" not in fetched
+        prefetcher.stop()
+        store.close()
+
+
+def _settled(read, timeout=5.0, quiet=0.3):
+    """``read()`` once it has stopped changing for ``quiet`` seconds."""
+    deadline = time.monotonic() + timeout
+    value, since = read(), time.monotonic()
+    while time.monotonic() - since < quiet:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+        if read() != value:
+            value, since = read(), time.monotonic()
+    return value
+
+
+def test_prefetcher_limits_metered_downloads():
+    with tempfile.TemporaryDirectory() as root:
+        store = TileStore(TileCache(root, 1 << 24), fetch=lambda url: b"tile")
+        metered = [True]
+        prefetcher = TilePrefetcher(store, zooms=(15, 16), metered=lambda: metered[0], enabled=True)
+        queued = prefetcher.set_route([(40.6, -74.1), (40.9, -73.7)])
+        assert queued > 150 and _settled(lambda: prefetcher.stats["fetched"]) == 150
+        # Once the connection is unmetered the rest of the route follows
+        metered[0] = False
+        prefetcher.refresh_metered()
+        assert _settled(lambda: prefetcher.stats["fetched"]) == queued
+        prefetcher.stop()
+        store.close()
+
+
+def test_prefetch_is_off_for_the_public_osm_servers():
+    with tempfile.TemporaryDirectory() as root:
+        store = TileStore(TileCache(root, 1 << 20), fetch=lambda url: b"tile")
+        saved = os.environ.pop("PUDDLE_PREFETCH_TILES", None)
+        try:
+            assert not prefetch_allowed("osm")
+            assert TilePrefetcher(store).set_route([(40.758, -73.9855), (40.758, -73.97)]) == 0
+            # Asking for it does not change the OSM tile usage policy
+            os.environ["PUDDLE_PREFETCH_TILES"] = "1"
+            assert not prefetch_allowed("osm") and not prefetch_allowed("unknown")
+        finally:
+            os.environ.pop("PUDDLE_PREFETCH_TILES", None)
+            if saved is not None:
+                os.environ["PUDDLE_PREFETCH_TILES"] = saved
+        store.close()
+
+
+if __name__ == "__main__":
+    test_mbtiles_rows_are_flipped()
+    test_cache_is_write_back_lru()
+    test_store_prefers_mbtiles_then_cache_then_network()
+    test_corridor_covers_route_nearest_first()
+    test_prefetcher_skips_present_tiles_and_yields_to_the_map()
+    test_prefetcher_limits_metered_downloads()
+    test_prefetch_is_off_for_the_public_osm_servers()
+    print("tile store OK")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from PyQt5.QtCore import QPointF, QUrl
+from src.web_embed.manager import WebEmbedManager
+
+
+class _Signal:
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+    def disconnect(self, slot):
+        self.slots.remove(slot)
+
+    def emit(self, *args):
+        for slot in list(self.slots):
+            slot(*args)
+
+
+class FakePage:
+    """Just the QWebEnginePage calls the manager makes."""
+
+    class LifecycleState:
+        Active, Frozen, Discarded = "active", "frozen", "discarded"
+
+    def __init__(self, widget, url):
+        self.widget = widget
+        self._url = QUrl(url)
+        self.state = self.LifecycleState.Active
+        self.muted = False
+        self.loads = []
+        self.scripts = []
+
+    def url(self):
+        return self._url
+
+    def setUrl(self, url):
+        self._url = url
+        self.loads.append(url.toString())
+
+    def setAudioMuted(self, muted):
+        self.muted = muted
+
+    def isVisible(self):
+        return self.widget.visible
+
+    def setLifecycleState(self, state):
+        self.state = state
+
+    def scrollPosition(self):
+        return QPointF(0, 640)
+
+    def renderProcessPid(self):
+        return 0
+
+    def runJavaScript(self, script):
+        self.scripts.append(script)
+
+
+class FakeView:
+    def __init__(self, page):
+        self._page = page
+        self.loadFinished = _Signal()
+
+    def page(self):
+        return self._page
+
+
+class FakeEmbed:
+    def __init__(self, url):
+        self.visible = False
+        self.web_view = FakeView(FakePage(self, url))
+
+    @property
+    def page(self):
+        return self.web_view.page()
+
+    def show(self):
+        self.visible = True
+
+    def hide(self):
+        self.visible = False
+
+
+def _open_all(manager, names):
+    embeds = {name: FakeEmbed(f"https://{name}.example/") for name in names}
+    for name in names:
+        manager.open(name, embeds[name])
+    return embeds
+
+
+def _states(embeds):
+    return {name: e.page.state for name, e in embeds.items()}
+
+
+def test_least_recently_used_embeds_are_discarded_first():
+    manager = WebEmbedManager(max_live=3)
+    embeds = _open_all(manager, "abcd")
+    assert _states(embeds) == {"a": "discarded", "b": "frozen", "c": "frozen", "d": "active"}
+    assert all(e.page.muted for name, e in embeds.items() if name != "d")
+    # Using b again makes c the oldest live one
+    manager.open("b", embeds["b"])
+    embeds.update(_open_all(manager, "e"))
+    assert _states(embeds) == {"a": "discarded", "b": "frozen", "c": "discarded",
+                               "d": "frozen", "e": "active"}
+    assert manager.current() == "e" and manager.is_suspended("c")
+
+
+def test_max_live_counts_the_open_embed():
+    manager = WebEmbedManager(max_live=2)
+    embeds = _open_all(manager, "ab")
+    assert _states(embeds) == {"a": "frozen", "b": "active"}
+    embeds.update(_open_all(manager, "c"))
+    assert _states(embeds) == {"a": "discarded", "b": "frozen", "c": "active"}
+    # With one renderer allowed, only the open embed keeps its page
+    manager.configure(max_live=1)
+    assert _states(embeds) == {"a": "discarded", "b": "discarded", "c": "active"}
+
+
+def test_resuming_a_discarded_embed_restores_url_and_scroll():
+    manager = WebEmbedManager(max_live=1)
+    embeds = _open_all(manager, "ab")
+    a = embeds["a"]
+    assert a.page.state == "discarded" and not a.visible
+    # The page was moved on while discarded; the saved URL wins
+    a.page._url = QUrl("about:blank")
+    manager.open("a", a)
+    assert a.visible and a.page.state == "active" and not a.page.muted
+    assert a.page.loads == ["https://a.example/"]
+    a.web_view.loadFinished.emit(True)
+    assert a.page.scripts == ["window.scrollTo(0.0, 640.0);"] and not a.web_view.loadFinished.slots
+    # A page that reloads its own URL is not loaded twice
+    b = embeds["b"]
+    manager.open("b", b)
+    assert b.page.state == "active" and b.page.loads == []
+
+
+def test_suspend_survives_a_deleted_page():
+    manager = WebEmbedManager()
+    embeds = _open_all(manager, "a")
+
+    def deleted(state):
+        raise RuntimeError("wrapped C/C++ object of type QWebEnginePage has been deleted")
+
+    embeds["a"].page.setLifecycleState = deleted
+    manager.close_current()
+    assert manager.is_suspended("a") and not embeds["a"].visible
+    manager.open("a", embeds["a"])
+    assert embeds["a"].visible and manager.current() == "a"
+
+
+if __name__ == "__main__":
+    test_least_recently_used_embeds_are_discarded_first()
+    test_max_live_counts_the_open_embed()
+    test_resuming_a_discarded_embed_restores_url_and_scroll()
+    test_suspend_survives_a_deleted_page()
+    print("web embed manager tests passed")